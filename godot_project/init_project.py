@@ -4,11 +4,33 @@ MazeMaster3D Godot项目初始化脚本
 自动设置开发环境和验证项目配置
 """
 
+import argparse
+import hashlib
+import json
 import os
+import shutil
 import sys
 import subprocess
 import platform
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 环境检查结果缓存（指纹不变的步骤在下次运行时跳过）
+CACHE_FILE = Path(".init_project_cache.json")
+CACHE_VERSION = 1
+REQUIREMENTS_FILE = Path("requirements_godot.txt")
+BRIDGE_TEST_FILE = Path("test_python_bridge.py")
+
+# 常见的Godot安装路径
+GODOT_PATHS = [
+    "godot",
+    "C:\\Program Files\\Godot\\Godot_v4.3.2-stable_win64.exe",
+    "/usr/bin/godot",
+    "/usr/local/bin/godot",
+    "/Applications/Godot.app/Contents/MacOS/Godot"
+]
 
 
 def print_header():
@@ -19,6 +41,74 @@ def print_header():
     print()
 
 
+def _fingerprint(*parts: Any) -> str:
+    """将若干可JSON序列化的值组合为指纹"""
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _file_stat(path: Path) -> Optional[List[int]]:
+    """文件的修改时间和大小（不存在时返回None）"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    """文件内容哈希（不存在时返回None）"""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _interpreter() -> List[str]:
+    """解释器标识"""
+    return [sys.executable, sys.version]
+
+
+class CheckCache:
+    """环境检查结果缓存 - 步骤名 -> (指纹, 结果)"""
+
+    def __init__(self, path: Path = CACHE_FILE, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        if enabled:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION:
+                    self.steps = data.get("steps", {})
+            except (OSError, ValueError):
+                pass
+
+    def get(self, step: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """指纹一致时返回缓存的结果"""
+        entry = self.steps.get(step)
+        if not self.enabled or entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        return entry.get("result")
+
+    def put(self, step: str, fingerprint: str, result: Dict[str, Any]):
+        """记录步骤结果"""
+        self.steps[step] = {"fingerprint": fingerprint, "result": result}
+
+    def discard(self, step: str):
+        """删除步骤结果（失败的步骤下次重新运行）"""
+        self.steps.pop(step, None)
+
+    def save(self):
+        """写回缓存文件"""
+        try:
+            self.path.write_text(
+                json.dumps({"version": CACHE_VERSION, "steps": self.steps}, indent=2),
+                encoding="utf-8")
+        except OSError as e:
+            print(f"⚠️  无法写入检查缓存: {e}")
+
+
 def check_python_version():
     """检查Python版本"""
     print("1. 检查Python版本...")
@@ -32,83 +122,152 @@ def check_python_version():
         return True
 
 
-def check_godot_installation():
-    """检查Godot安装"""
-    print("\n2. 检查Godot安装...")
+def _godot_candidates() -> List[Tuple[str, str, List[int]]]:
+    """存在的Godot候选路径: (候选, 实际路径, [修改时间, 大小])"""
+    candidates = []
+    for path in GODOT_PATHS:
+        resolved = shutil.which(path) or (path if os.path.isfile(path) else None)
+        if resolved is None:
+            continue
+        stat = _file_stat(Path(resolved))
+        if stat is not None:
+            candidates.append((path, os.path.realpath(resolved), stat))
+    return candidates
 
-    # 常见的Godot安装路径
-    godot_paths = [
-        "godot",
-        "C:\\Program Files\\Godot\\Godot_v4.3.2-stable_win64.exe",
-        "/usr/bin/godot",
-        "/usr/local/bin/godot",
-        "/Applications/Godot.app/Contents/MacOS/Godot"
-    ]
 
-    for path in godot_paths:
-        try:
-            result = subprocess.run([path, "--version"],
-                                    capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                version = result.stdout.strip()
-                print(f"✅ Godot版本: {version}")
-                return True
-        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-            continue
+def _probe_godot(path: str) -> Optional[str]:
+    """运行 godot --version，成功时返回版本号"""
+    try:
+        result = subprocess.run([path, "--version"],
+                                capture_output=True, text=True, timeout=5)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        pass
+    return None
+
+
+def probe_godot_installation(cache: CheckCache, pool: ThreadPoolExecutor) -> Dict[str, Any]:
+    """探测Godot安装（候选路径并行探测，按候选顺序取第一个可用的）
+
+    指纹为存在的候选路径及其修改时间和大小，可执行文件未变化时直接使用缓存。
+    """
+    candidates = _godot_candidates()
+    fingerprint = _fingerprint(candidates)
+    cached = cache.get("godot", fingerprint)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    versions = list(pool.map(_probe_godot, [path for path, _, _ in candidates]))
+    for (path, _, _), version in zip(candidates, versions):
+        if version is not None:
+            result = {"path": path, "version": version}
+            cache.put("godot", fingerprint, result)
+            return {**result, "cached": False}
+    # 未找到（或 --version 超时）不缓存，下次重新探测
+    cache.discard("godot")
+    return {"path": None, "version": None, "cached": False}
+
+
+def check_godot_installation(result: Dict[str, Any]):
+    """检查Godot安装"""
+    print("\n2. 检查Godot安装...")
+    suffix = " (缓存)" if result.get("cached") else ""
+    if result["version"] is not None:
+        print(f"✅ Godot版本: {result['version']}{suffix}")
+        return True
 
     print("❌ 未找到Godot引擎")
     print("   请从 https://godotengine.org/download/ 下载并安装Godot 4.3+")
     return False
 
 
-def install_python_dependencies():
-    """安装Python依赖"""
-    print("\n3. 安装Python依赖...")
+def probe_python_dependencies(cache: CheckCache) -> Dict[str, Any]:
+    """安装Python依赖（解释器和依赖文件未变化时跳过）"""
+    if not REQUIREMENTS_FILE.exists():
+        return {"ok": False, "error": "未找到requirements_godot.txt文件"}
 
-    requirements_file = Path("requirements_godot.txt")
-    if not requirements_file.exists():
-        print("❌ 未找到requirements_godot.txt文件")
-        return False
+    fingerprint = _fingerprint(_interpreter(), _file_hash(REQUIREMENTS_FILE))
+    cached = cache.get("dependencies", fingerprint)
+    if cached is not None:
+        return {**cached, "cached": True}
 
     try:
         result = subprocess.run([
             sys.executable, "-m", "pip", "install", "-r", str(
-                requirements_file)
+                REQUIREMENTS_FILE)
         ], capture_output=True, text=True)
-
-        if result.returncode == 0:
-            print("✅ Python依赖安装成功")
-            return True
-        else:
-            print(f"❌ Python依赖安装失败: {result.stderr}")
-            return False
     except Exception as e:
-        print(f"❌ 安装过程中发生错误: {e}")
-        return False
+        cache.discard("dependencies")
+        return {"ok": False, "error": f"安装过程中发生错误: {e}"}
 
+    if result.returncode != 0:
+        cache.discard("dependencies")
+        return {"ok": False, "error": f"Python依赖安装失败: {result.stderr}"}
+    cache.put("dependencies", fingerprint, {"ok": True})
+    return {"ok": True, "cached": False}
+
+
+def install_python_dependencies(result: Dict[str, Any]):
+    """安装Python依赖"""
+    print("\n3. 安装Python依赖...")
+    if result["ok"]:
+        suffix = " (依赖未变化，已跳过)" if result.get("cached") else ""
+        print(f"✅ Python依赖安装成功{suffix}")
+        return True
+    print(f"❌ {result['error']}")
+    return False
+
+
+def _bridge_sources() -> List[Any]:
+    """桥接测试的输入: 测试脚本和桥接模块源码的修改时间/大小"""
+    sources = [[str(BRIDGE_TEST_FILE), _file_stat(BRIDGE_TEST_FILE)]]
+    for path in sorted(Path("python_bridge").glob("*.py")):
+        sources.append([str(path), _file_stat(path)])
+    return sources
 
-def test_python_bridge():
-    """测试Python桥接"""
-    print("\n4. 测试Python桥接...")
+
+def probe_python_bridge(cache: CheckCache) -> Dict[str, Any]:
+    """测试Python桥接（解释器、依赖文件和源码未变化时跳过）"""
+    fingerprint = _fingerprint(
+        _interpreter(), _file_hash(REQUIREMENTS_FILE), _bridge_sources())
+    cached = cache.get("bridge_test", fingerprint)
+    if cached is not None:
+        return {**cached, "cached": True}
 
     try:
         result = subprocess.run([
-            sys.executable, "test_python_bridge.py"
+            sys.executable, str(BRIDGE_TEST_FILE)
         ], capture_output=True, text=True, timeout=30)
-
-        if result.returncode == 0:
-            print("✅ Python桥接测试通过")
-            return True
-        else:
-            print(f"❌ Python桥接测试失败:")
-            print(result.stderr)
-            return False
     except subprocess.TimeoutExpired:
-        print("❌ Python桥接测试超时")
-        return False
+        cache.discard("bridge_test")
+        return {"ok": False, "error": "Python桥接测试超时"}
     except Exception as e:
-        print(f"❌ 测试过程中发生错误: {e}")
-        return False
+        cache.discard("bridge_test")
+        return {"ok": False, "error": f"测试过程中发生错误: {e}"}
+
+    if result.returncode != 0:
+        cache.discard("bridge_test")
+        return {"ok": False, "error": f"Python桥接测试失败:\n{result.stderr}"}
+    cache.put("bridge_test", fingerprint, {"ok": True})
+    return {"ok": True, "cached": False}
+
+
+def _run_after(dependency: Future, func, *args):
+    """等待前置步骤完成后运行"""
+    dependency.result()
+    return func(*args)
+
+
+def test_python_bridge(result: Dict[str, Any]):
+    """测试Python桥接"""
+    print("\n4. 测试Python桥接...")
+    if result["ok"]:
+        suffix = " (未变化，已跳过)" if result.get("cached") else ""
+        print(f"✅ Python桥接测试通过{suffix}")
+        return True
+    print(f"❌ {result['error']}")
+    return False
 
 
 def create_directories():
@@ -216,25 +375,38 @@ def print_next_steps():
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="MazeMaster3D Godot项目初始化")
+    parser.add_argument("--force", action="store_true", help="忽略检查缓存，重新运行所有步骤")
+    args = parser.parse_args()
+
     print_header()
 
     # 检查系统要求
     if not check_python_version():
         sys.exit(1)
 
-    if not check_godot_installation():
-        print("\n⚠️  警告: Godot未安装，但可以继续初始化项目")
+    cache = CheckCache(enabled=not args.force)
+    with ThreadPoolExecutor(max_workers=len(GODOT_PATHS) + 3) as pool:
+        # Godot探测与依赖安装互不依赖，并行运行；桥接测试需等依赖安装完成
+        godot = pool.submit(probe_godot_installation, cache, pool)
+        dependencies = pool.submit(probe_python_dependencies, cache)
+        bridge_test = pool.submit(_run_after, dependencies, probe_python_bridge, cache)
+
+        if not check_godot_installation(godot.result()):
+            print("\n⚠️  警告: Godot未安装，但可以继续初始化项目")
 
-    # 安装依赖
-    if not install_python_dependencies():
-        print("\n⚠️  警告: Python依赖安装失败，请手动安装")
+        # 安装依赖
+        if not install_python_dependencies(dependencies.result()):
+            print("\n⚠️  警告: Python依赖安装失败，请手动安装")
 
-    # 创建项目结构
-    create_directories()
-    create_gitignore()
+        # 创建项目结构
+        create_directories()
+        create_gitignore()
 
-    # 测试Python桥接
-    if not test_python_bridge():
+        # 测试Python桥接
+        bridge_ok = test_python_bridge(bridge_test.result())
+    cache.save()
+    if not bridge_ok:
         print("\n⚠️  警告: Python桥接测试失败，请检查代码")
 
     # 打印后续步骤
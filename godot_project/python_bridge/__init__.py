@@ -1,33 +1,118 @@
 """
 Python桥接模块
 连接Python游戏逻辑和Godot 3D引擎
+
+导入本包不加载任何子模块，导出名在首次访问时才导入所在子模块；
+默认世界和全局桥接实例也在首次使用时创建（get_world() / get_bridge()），
+包属性 game_logic / bridge 分别是这两个实例。
+冷启动耗时检查: python -m python_bridge.coldstart
 """
 
-from .game_logic import *
-from .bridge import *
+import importlib
+import sys
+import types
 
 __version__ = "1.0.0"
 __author__ = "MazeMaster3D Team"
 
+# 导出名 -> 所在子模块
+_EXPORTS = {
+    "GameLogic": "game_logic",
+    "GodotBridge": "bridge",
+    "Vector3": "game_logic",
+    "ResourceType": "game_logic",
+    "BuildingType": "game_logic",
+    "CharacterType": "game_logic",
+    "ResourceData": "game_logic",
+    "BuildingData": "game_logic",
+    "CharacterData": "game_logic",
+    "OverflowPolicy": "storage",
+    "StorageLedger": "storage",
+    "JobType": "jobs",
+    "JobBoard": "jobs",
+    "TileType": "tile_grid",
+    "TileGrid": "tile_grid",
+    "LogisticsPlanner": "logistics",
+    "StatRegistry": "stats",
+    "EntityPool": "entities",
+    "EntityIndex": "query",
+    "EventBus": "events",
+    "VisibilityMap": "visibility",
+    "RegionConnectivity": "connectivity",
+    "PlacementGrid": "placement",
+    "ChunkMeshBaker": "meshing",
+    "SnapshotTracker": "snapshot",
+    "SaveWriter": "snapshot",
+    "TickScheduler": "scheduler",
+    "DEFAULT_WORLD_ID": "game_logic",
+    "create_world": "game_logic",
+    "get_world": "game_logic",
+    "destroy_world": "game_logic",
+    "list_worlds": "game_logic",
+    "get_bridge": "bridge",
+    "configure_bridge": "bridge",
+    "initialize_bridge": "bridge",
+    "shutdown_bridge": "bridge",
+    "update_bridge": "bridge",
+    "process_input": "bridge",
+    "protocol_handshake": "bridge",
+    "execute_commands": "bridge",
+    "get_game_data": "bridge",
+    "get_all_resources": "bridge",
+    "get_all_buildings": "bridge",
+    "get_all_characters": "bridge",
+    "get_character": "bridge",
+    "query_characters": "bridge",
+    "count_characters": "bridge",
+    "query_buildings": "bridge",
+    "count_buildings": "bridge",
+    "get_valid_placements": "bridge",
+    "get_packed_characters": "bridge",
+    "get_visibility_changes": "bridge",
+    "get_visibility_bits": "bridge",
+    "get_storage_capacity": "bridge",
+    "get_job_assignments": "bridge",
+    "get_haul_plan": "bridge",
+    "get_game_statistics": "bridge",
+    "get_perf_metrics": "bridge"
+}
+
+# 全局实例名 -> (所在子模块, 获取函数)，默认世界可能被销毁重建，每次访问都重新获取
+_INSTANCES = {
+    "game_logic": ("game_logic", "get_world"),
+    "bridge": ("bridge", "get_bridge")
+}
+
 # 导出主要类和函数
-__all__ = [
-    "GameLogic",
-    "GodotBridge",
-    "Vector3",
-    "ResourceType",
-    "BuildingType",
-    "CharacterType",
-    "ResourceData",
-    "BuildingData",
-    "CharacterData",
-    "game_logic",
-    "bridge",
-    "initialize_bridge",
-    "update_bridge",
-    "process_input",
-    "get_game_data",
-    "get_all_resources",
-    "get_all_buildings",
-    "get_all_characters",
-    "get_game_statistics"
-]
+__all__ = list(_EXPORTS) + list(_INSTANCES)
+
+
+class _Package(types.ModuleType):
+    """包模块类型 - 导入同名子模块时不覆盖全局实例名"""
+
+    def __setattr__(self, name, value):
+        # 导入系统加载子模块后会把它设为包的同名属性，game_logic / bridge 保留给全局实例
+        if name in _INSTANCES and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name: str):
+    instance = _INSTANCES.get(name)
+    if instance is not None:
+        module_name, getter = instance
+        return getattr(importlib.import_module(f".{module_name}", __name__), getter)()
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # 缓存到包命名空间，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_INSTANCES))
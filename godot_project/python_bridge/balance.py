@@ -0,0 +1,500 @@
+"""
+Python桥接模块 - 蒙特卡洛平衡模拟
+直接读取 GameLogic 的成本表和属性表，按脚本化建造顺序批量运行
+无界面经济与战斗推演。同一参数组的推演在 NumPy 中向量化，
+参数网格和推演分块在多进程间并行。
+
+用法:
+    python -m python_bridge.balance --rollouts 2000 \\
+        --grid building_cost.orc_lair.gold=200,250,300 --grid model.mining_rate=1.5,2.5
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .game_logic import (
+    GameLogic,
+    BuildingData,
+    CharacterData,
+    BuildingType,
+    CharacterType,
+    ResourceType,
+    Vector3
+)
+
+
+# 模拟的资源列（其余资源不参与经济）
+RESOURCES = (ResourceType.GOLD, ResourceType.MANA, ResourceType.FOOD)
+GOLD, MANA, FOOD = range(len(RESOURCES))
+BUILDINGS = tuple(BuildingType)
+CHARACTERS = tuple(CharacterType)
+# 英雄方单位（不可召唤）
+HERO_TYPES = (CharacterType.KNIGHT, CharacterType.ARCHER)
+
+# 默认脚本化建造顺序，完成后持续召唤兽人战士
+DEFAULT_BUILD_ORDER = (
+    "goblin_worker", "goblin_worker", "goblin_worker", "goblin_worker",
+    "treasury", "demon_lair", "goblin_worker", "goblin_worker",
+    "orc_lair", "orc_warrior", "orc_warrior", "arrow_tower", "orc_warrior"
+)
+DEFAULT_REPEAT = "orc_warrior"
+
+# 游戏逻辑之外的模型参数（金矿产出、英雄波次等）
+DEFAULT_MODEL = {
+    "dt": 1.0,                  # 模拟步长（秒）
+    "duration": 1200.0,         # 模拟时长（秒）
+    "sample_interval": 10.0,    # 资源曲线采样间隔（秒）
+    "mining_rate": 2.0,         # 每个哥布林苦工每秒带回的金币
+    "mining_noise": 0.25,       # 每次推演的采矿效率波动（变异系数）
+    "first_wave": 300.0,        # 第一波英雄到达时间（秒）
+    "wave_interval": 180.0,     # 英雄波次间隔（秒）
+    "wave_jitter": 0.25,        # 波次间隔随机波动比例
+    "wave_size": 2.0,           # 第一波英雄数量
+    "wave_growth": 1.3,         # 每波英雄数量增长倍数
+    "knight_share": 0.5,        # 骑士在英雄中的比例
+    "arrow_tower_dps": 15.0,    # 箭塔每秒伤害
+    "arcane_tower_dps": 25.0,   # 奥术塔每秒伤害
+    "siege_seconds": 20.0       # 英雄突破后攻击地牢之心的时长
+}
+
+
+@dataclass
+class EconomyTables:
+    """从 GameLogic 提取的经济与属性表（按枚举顺序排列的数组）"""
+    initial_resources: np.ndarray
+    building_cost: np.ndarray
+    building_health: np.ndarray
+    building_production: np.ndarray
+    building_capacity: np.ndarray
+    character_cost: np.ndarray
+    character_health: np.ndarray
+    character_attack: np.ndarray
+    character_defense: np.ndarray
+    model: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MODEL))
+
+    @classmethod
+    def from_game_logic(cls) -> 'EconomyTables':
+        """用一个私有的 GameLogic 实例读取当前成本表和属性表"""
+        logic = GameLogic("balance")
+        with contextlib.redirect_stdout(io.StringIO()):
+            logic.initialize()
+
+        resource_count = len(RESOURCES)
+        initial = np.array([logic.get_resource(rt) for rt in RESOURCES], dtype=np.float64)
+
+        building_cost = np.zeros((len(BUILDINGS), resource_count))
+        building_health = np.zeros(len(BUILDINGS))
+        building_production = np.zeros((len(BUILDINGS), resource_count))
+        # 没有容量的资源不受限制
+        building_capacity = np.zeros((len(BUILDINGS), resource_count))
+        heart = next(b for b in logic.buildings if b.type == BuildingType.DUNGEON_HEART)
+        for i, bt in enumerate(BUILDINGS):
+            if bt == BuildingType.DUNGEON_HEART:
+                building = heart
+            else:
+                building = BuildingData(type=bt, position=Vector3())
+                logic._setup_building_properties(building)
+            building_health[i] = building.max_health
+            for j, rt in enumerate(RESOURCES):
+                building_cost[i, j] = logic.building_costs.get(bt, {}).get(rt, 0)
+                building_production[i, j] = building.production_rates.get(rt, 0.0)
+                building_capacity[i, j] = building.storage_capacity.get(rt, 0)
+
+        character_cost = np.zeros((len(CHARACTERS), resource_count))
+        character_health = np.zeros(len(CHARACTERS))
+        character_attack = np.zeros(len(CHARACTERS))
+        character_defense = np.zeros(len(CHARACTERS))
+        for i, ct in enumerate(CHARACTERS):
+            character = CharacterData(type=ct, position=Vector3())
+            logic._setup_character_properties(character)
+            character_health[i] = character.max_health
+            character_attack[i] = character.attack_damage
+            character_defense[i] = character.defense
+            for j, rt in enumerate(RESOURCES):
+                character_cost[i, j] = logic.character_costs.get(ct, {}).get(rt, 0)
+
+        return cls(initial, building_cost, building_health, building_production,
+                   building_capacity, character_cost, character_health,
+                   character_attack, character_defense)
+
+    def with_overrides(self, overrides: Dict[str, float]) -> 'EconomyTables':
+        """应用参数覆盖，返回新表
+
+        键格式:
+            building_cost.<建筑>.<资源>      character_cost.<角色>.<资源>
+            building_stat.<建筑>.health      building_stat.<建筑>.production.<资源>
+            building_stat.<建筑>.capacity.<资源>
+            character_stat.<角色>.health|attack|defense
+            model.<模型参数>
+        """
+        tables = copy.deepcopy(self)
+        for key, value in overrides.items():
+            parts = key.split(".")
+            try:
+                if parts[0] == "model" and len(parts) == 2 and parts[1] in tables.model:
+                    tables.model[parts[1]] = float(value)
+                elif parts[0] == "building_cost" and len(parts) == 3:
+                    tables.building_cost[_building(parts[1]), _resource(parts[2])] = value
+                elif parts[0] == "character_cost" and len(parts) == 3:
+                    tables.character_cost[_character(parts[1]), _resource(parts[2])] = value
+                elif parts[0] == "building_stat" and len(parts) == 3 and parts[2] == "health":
+                    tables.building_health[_building(parts[1])] = value
+                elif parts[0] == "building_stat" and len(parts) == 4 and parts[2] == "production":
+                    tables.building_production[_building(parts[1]), _resource(parts[3])] = value
+                elif parts[0] == "building_stat" and len(parts) == 4 and parts[2] == "capacity":
+                    tables.building_capacity[_building(parts[1]), _resource(parts[3])] = value
+                elif parts[0] == "character_stat" and len(parts) == 3 and parts[2] in ("health", "attack", "defense"):
+                    getattr(tables, f"character_{parts[2]}")[_character(parts[1])] = value
+                else:
+                    raise ValueError(f"未知参数: {key}")
+            except ValueError as e:
+                raise ValueError(f"无效参数 {key}: {e}") from None
+        return tables
+
+
+def _building(name: str) -> int:
+    return BUILDINGS.index(BuildingType(name))
+
+
+def _character(name: str) -> int:
+    return CHARACTERS.index(CharacterType(name))
+
+
+def _resource(name: str) -> int:
+    return RESOURCES.index(ResourceType(name))
+
+
+def _compile_order(tables: EconomyTables, order: Tuple[str, ...],
+                   repeat: Optional[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """将建造顺序编译为 (成本, 是否建筑, 类型下标) 数组，末尾一行为重复项或不可达项"""
+    items = list(order) + [repeat]
+    costs = np.full((len(items), len(RESOURCES)), np.inf)
+    is_building = np.zeros(len(items), dtype=bool)
+    type_index = np.zeros(len(items), dtype=np.intp)
+    building_names = {bt.value for bt in BUILDINGS}
+    character_names = {ct.value for ct in CHARACTERS if ct not in HERO_TYPES}
+    for i, name in enumerate(items):
+        if name is None:
+            continue
+        if name in building_names:
+            is_building[i] = True
+            type_index[i] = _building(name)
+            costs[i] = tables.building_cost[type_index[i]]
+        elif name in character_names:
+            type_index[i] = _character(name)
+            costs[i] = tables.character_cost[type_index[i]]
+        else:
+            raise ValueError(f"建造顺序中的未知项: {name}")
+    return costs, is_building, type_index
+
+
+def simulate(tables: EconomyTables, rollouts: int, seed: int,
+             order: Tuple[str, ...] = DEFAULT_BUILD_ORDER,
+             repeat: Optional[str] = DEFAULT_REPEAT) -> Dict[str, np.ndarray]:
+    """向量化运行一组推演，返回每次推演的原始结果
+
+    所有推演共享同一时间轴，状态为 (推演数, ...) 数组，
+    每一步对全部推演同时结算收入、购买和英雄波次。
+    """
+    model = tables.model
+    rng = np.random.default_rng(seed)
+    dt = model["dt"]
+    steps = int(model["duration"] / dt)
+    sample_every = max(1, int(model["sample_interval"] / dt))
+    rows = np.arange(rollouts)
+
+    order_cost, order_is_building, order_type = _compile_order(tables, order, repeat)
+    order_length = len(order)
+
+    resources = np.tile(tables.initial_resources, (rollouts, 1))
+    buildings = np.zeros((rollouts, len(BUILDINGS)))
+    buildings[:, _building("dungeon_heart")] = 1
+    characters = np.zeros((rollouts, len(CHARACTERS)))
+    pointer = np.zeros(rollouts, dtype=np.intp)
+    alive = np.ones(rollouts, dtype=bool)
+    heart_health = np.full(rollouts, tables.building_health[_building("dungeon_heart")])
+
+    # 每次推演的随机因素
+    mining_rate = model["mining_rate"] * np.clip(
+        rng.normal(1.0, model["mining_noise"], rollouts), 0.1, None)
+    next_wave = np.full(rollouts, model["first_wave"])
+    wave_number = np.zeros(rollouts)
+
+    first_orc_lair = np.full(rollouts, np.nan)
+    order_done = np.full(rollouts, np.nan)
+    defeated_at = np.full(rollouts, np.nan)
+    waves_won = np.zeros(rollouts)
+    samples = []
+
+    worker = _character("goblin_worker")
+    orc_lair = _building("orc_lair")
+    arrow_tower = _building("arrow_tower")
+    arcane_tower = _building("arcane_tower")
+    knight = _character("knight")
+    archer = _character("archer")
+    limited = tables.building_capacity.any(axis=0)
+
+    for step in range(steps):
+        now = step * dt
+        live = alive[:, None]
+
+        # 收入: 建筑产出 + 苦工采矿，受存储容量限制
+        income = buildings @ tables.building_production
+        income[:, GOLD] += characters[:, worker] * mining_rate
+        capacity = np.where(limited, buildings @ tables.building_capacity, np.inf)
+        resources = np.where(live, np.minimum(resources + income * dt, capacity), resources)
+
+        # 购买建造顺序中的下一项（每步每次推演最多一项）
+        cost = order_cost[pointer]
+        buy = alive & np.all(resources >= cost, axis=1)
+        if buy.any():
+            idx = rows[buy]
+            item = pointer[buy]
+            resources[idx] -= cost[buy]
+            building_item = order_is_building[item]
+            buildings[idx[building_item], order_type[item[building_item]]] += 1
+            characters[idx[~building_item], order_type[item[~building_item]]] += 1
+            lair = building_item & (order_type[item] == orc_lair)
+            hit = idx[lair]
+            first_orc_lair[hit] = np.where(np.isnan(first_orc_lair[hit]), now, first_orc_lair[hit])
+            pointer[idx] = np.minimum(item + 1, order_length)
+            finished = idx[(item + 1 >= order_length)]
+            order_done[finished] = np.where(np.isnan(order_done[finished]), now, order_done[finished])
+
+        # 英雄波次
+        attacked = alive & (next_wave <= now)
+        if attacked.any():
+            idx = rows[attacked]
+            count = model["wave_size"] * model["wave_growth"] ** wave_number[idx]
+            knights = rng.binomial(np.round(count).astype(np.int64), model["knight_share"])
+            heroes = np.zeros((len(idx), len(CHARACTERS)))
+            heroes[:, knight] = knights
+            heroes[:, archer] = np.round(count) - knights
+            outcome = _resolve_wave(tables, model, rng, buildings[idx], characters[idx],
+                                    heroes, arrow_tower, arcane_tower)
+            characters[idx], damage, won = outcome
+            heart_health[idx] -= damage
+            waves_won[idx] += won
+            lost = heart_health[idx] <= 0
+            defeated_at[idx[lost]] = now
+            alive[idx[lost]] = False
+            wave_number[idx] += 1
+            next_wave[idx] = now + model["wave_interval"] * rng.uniform(
+                1 - model["wave_jitter"], 1 + model["wave_jitter"], len(idx))
+
+        if step % sample_every == 0:
+            army = characters.sum(axis=1)
+            samples.append(np.column_stack((resources, army)).astype(np.float32))
+
+    return {
+        "first_orc_lair": first_orc_lair,
+        "order_done": order_done,
+        "defeated_at": defeated_at,
+        "waves_won": waves_won,
+        "final_army": characters.sum(axis=1),
+        "curves": np.stack(samples, axis=1),
+        "sample_times": np.arange(len(samples)) * sample_every * dt
+    }
+
+
+def _resolve_wave(tables: EconomyTables, model: Dict[str, float], rng: np.random.Generator,
+                  buildings: np.ndarray, defenders: np.ndarray, heroes: np.ndarray,
+                  arrow_tower: int, arcane_tower: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """结算一波英雄进攻（线性消耗模型，向量化）
+
+    双方伤害为 攻击力 - 对方平均防御（至少为1），先打空对方生命池的一方获胜。
+    防守方获胜时按承受伤害比例随机阵亡；失败时防守单位全灭，
+    剩余英雄攻击地牢之心 siege_seconds 秒。
+    """
+    health, attack, defense = tables.character_health, tables.character_attack, tables.character_defense
+
+    defender_hp = defenders @ health
+    defender_count = defenders.sum(axis=1)
+    hero_hp = heroes @ health
+    hero_count = heroes.sum(axis=1)
+    defender_armor = np.divide(defenders @ defense, defender_count,
+                               out=np.zeros_like(defender_hp), where=defender_count > 0)
+    hero_armor = np.divide(heroes @ defense, hero_count,
+                           out=np.zeros_like(hero_hp), where=hero_count > 0)
+
+    tower_dps = (buildings[:, arrow_tower] * model["arrow_tower_dps"]
+                 + buildings[:, arcane_tower] * model["arcane_tower_dps"])
+    defender_dps = (defenders * np.maximum(1.0, attack[None, :] - hero_armor[:, None])).sum(axis=1) + tower_dps
+    hero_dps = (heroes * np.maximum(1.0, attack[None, :] - defender_armor[:, None])).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_to_kill_heroes = np.where(defender_dps > 0, hero_hp / defender_dps, np.inf)
+        time_to_kill_defenders = np.where(hero_dps > 0, defender_hp / hero_dps, np.inf)
+    won = time_to_kill_heroes <= time_to_kill_defenders
+
+    # 防守方获胜: 承受伤害比例即阵亡概率
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loss = np.where(defender_hp > 0, hero_dps * time_to_kill_heroes / defender_hp, 0.0)
+    loss = np.clip(np.nan_to_num(loss), 0.0, 1.0)
+    survivors = rng.binomial(defenders.astype(np.int64), (1.0 - loss)[:, None]).astype(np.float64)
+    survivors[~won] = 0
+
+    # 防守方失败: 剩余英雄攻城
+    with np.errstate(divide="ignore", invalid="ignore"):
+        remaining = np.where(hero_hp > 0,
+                             1.0 - defender_dps * np.minimum(time_to_kill_defenders, time_to_kill_heroes) / hero_hp,
+                             0.0)
+    damage = np.where(won, 0.0, hero_dps * np.clip(remaining, 0.0, 1.0) * model["siege_seconds"])
+    return survivors, damage, won.astype(np.float64)
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, Any]:
+    """忽略未发生（NaN）的推演求分位数"""
+    reached = values[~np.isnan(values)]
+    if reached.size == 0:
+        return {"reached": 0.0, "mean": None, "p10": None, "p50": None, "p90": None}
+    p10, p50, p90 = np.percentile(reached, (10, 50, 90))
+    return {
+        "reached": reached.size / values.size,
+        "mean": float(reached.mean()),
+        "p10": float(p10),
+        "p50": float(p50),
+        "p90": float(p90)
+    }
+
+
+def summarize(raw: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """汇总原始推演结果"""
+    curves = raw["curves"]
+    p10, p50, p90 = np.percentile(curves, (10, 50, 90), axis=0)
+    mean = curves.mean(axis=0)
+    names = [rt.value for rt in RESOURCES] + ["army"]
+    return {
+        "rollouts": int(curves.shape[0]),
+        "time_to_first_orc_lair": _percentiles(raw["first_orc_lair"]),
+        "build_order_complete": _percentiles(raw["order_done"]),
+        "defeat_time": _percentiles(raw["defeated_at"]),
+        "survival_rate": float(np.isnan(raw["defeated_at"]).mean()),
+        "waves_won_mean": float(raw["waves_won"].mean()),
+        "final_army_mean": float(raw["final_army"].mean()),
+        "curves": {
+            "time": raw["sample_times"].tolist(),
+            **{name: {"mean": mean[:, i].tolist(), "p10": p10[:, i].tolist(),
+                      "p50": p50[:, i].tolist(), "p90": p90[:, i].tolist()}
+               for i, name in enumerate(names)}
+        }
+    }
+
+
+def _run_chunk(overrides: Dict[str, float], rollouts: int, seed: int,
+               order: Tuple[str, ...], repeat: Optional[str]) -> Dict[str, np.ndarray]:
+    """工作进程: 运行一个推演分块"""
+    tables = EconomyTables.from_game_logic().with_overrides(overrides)
+    return simulate(tables, rollouts, seed, order, repeat)
+
+
+def expand_grid(grid: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    """展开参数网格为参数组合列表"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_sweep(grid: Dict[str, List[float]], rollouts: int = 1000, seed: int = 0,
+              workers: Optional[int] = None, chunk_size: int = 500,
+              order: Tuple[str, ...] = DEFAULT_BUILD_ORDER,
+              repeat: Optional[str] = DEFAULT_REPEAT) -> List[Dict[str, Any]]:
+    """对参数网格的每个组合运行 rollouts 次推演
+
+    每个组合拆成若干分块分发到进程池，分块种子由 SeedSequence 派生，
+    结果与工作进程数量无关。
+    """
+    configs = expand_grid(grid) if grid else [{}]
+    # 先在主进程校验参数，避免在工作进程中才报错
+    base = EconomyTables.from_game_logic()
+    for overrides in configs:
+        _compile_order(base.with_overrides(overrides), order, repeat)
+
+    chunks_per_config = max(1, -(-rollouts // chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(len(configs) * chunks_per_config)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+        futures = []
+        for c, overrides in enumerate(configs):
+            config_futures = []
+            for k in range(chunks_per_config):
+                size = min(chunk_size, rollouts - k * chunk_size)
+                chunk_seed = int(seeds[c * chunks_per_config + k].generate_state(1)[0])
+                config_futures.append(pool.submit(
+                    _run_chunk, overrides, size, chunk_seed, order, repeat))
+            futures.append(config_futures)
+
+        for overrides, config_futures in zip(configs, futures):
+            parts = [f.result() for f in config_futures]
+            raw = {key: np.concatenate([p[key] for p in parts])
+                   for key in parts[0] if key != "sample_times"}
+            raw["sample_times"] = parts[0]["sample_times"]
+            results.append({"parameters": overrides, **summarize(raw)})
+    return results
+
+
+def _parse_grid(specs: List[str]) -> Dict[str, List[float]]:
+    """解析 key=v1,v2,... 形式的网格参数"""
+    grid = {}
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"网格参数格式错误: {spec}")
+        grid[key.strip()] = [float(v) for v in values.split(",")]
+    return grid
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="蒙特卡洛平衡模拟")
+    parser.add_argument("--rollouts", type=int, default=1000, help="每个参数组合的推演次数")
+    parser.add_argument("--grid", action="append", default=[],
+                        help="参数网格，如 building_cost.orc_lair.gold=200,250,300（可重复）")
+    parser.add_argument("--order", default=",".join(DEFAULT_BUILD_ORDER), help="建造顺序（逗号分隔）")
+    parser.add_argument("--repeat", default=DEFAULT_REPEAT, help="建造顺序完成后重复召唤的项（空为不重复）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数量")
+    parser.add_argument("--output", default="", help="完整结果（含资源曲线）输出的JSON文件")
+    args = parser.parse_args(argv)
+
+    try:
+        grid = _parse_grid(args.grid)
+        start = time.perf_counter()
+        results = run_sweep(grid, args.rollouts, args.seed, args.workers,
+                            order=tuple(s.strip() for s in args.order.split(",") if s.strip()),
+                            repeat=args.repeat or None)
+    except ValueError as e:
+        print(f"参数错误: {e}")
+        return 2
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        lair = result["time_to_first_orc_lair"]
+        print(f"{result['parameters'] or '默认参数'}: "
+              f"首个兽人巢穴 p50={lair['p50']} p90={lair['p90']} (达成 {lair['reached']:.0%}), "
+              f"存活率 {result['survival_rate']:.1%}, 平均胜利波次 {result['waves_won_mean']:.1f}")
+    total = len(results) * args.rollouts
+    print(f"共 {total} 次推演，耗时 {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果保存到: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,105 +3,349 @@ Python桥接接口 - 连接Python游戏逻辑和Godot引擎
 提供Python和GDScript之间的数据交换接口
 """
 
+import base64
+import functools
 import json
-from typing import Dict, List, Any, Optional
+import os
+from typing import Callable, Dict, List, Any, Optional, TYPE_CHECKING
 from .game_logic import (
-    game_logic,
+    GameLogic,
+    DEFAULT_WORLD_ID,
+    create_world,
+    get_world,
+    list_worlds,
     Vector3,
     ResourceType,
-    BuildingType,
-    CharacterType,
     initialize,
     update,
     get_game_state,
     build_building,
     summon_character,
     get_resource,
+    get_storage_info,
+    set_overflow_policy,
+    post_job,
+    complete_job,
+    set_tile,
+    set_mine_supply,
+    plan_gold_hauls,
     save_game,
     load_game
 )
+from .sim_host import MODE_IN_PROCESS, MODE_OUT_OF_PROCESS
+from .sampler import StackSampler, DEFAULT_DURATION
+from .entities import INVALID_HANDLE
+from .events import (
+    EventBus,
+    EVENT_BUILDING_CREATED,
+    EVENT_CHARACTER_CREATED,
+    EVENT_CHARACTER_HEALTH_CHANGED,
+    EVENT_CHARACTER_DIED,
+    EVENT_GAME_SAVED,
+    EVENT_GAME_SAVE_FAILED,
+    EVENT_GAME_LOADED
+)
+from .protocol import (
+    BUILDINGS_BY_NAME,
+    CHARACTERS_BY_NAME,
+    handshake,
+    run_commands
+)
+
+if TYPE_CHECKING:
+    from .replay import TraceRecorder
+    from .sim_host import SimulationHost
+
+
+# 模拟模式配置，可通过环境变量切换到独立进程模式
+DEFAULT_SIMULATION_MODE = os.environ.get(
+    "MAZEMASTER_SIMULATION_MODE", MODE_IN_PROCESS)
+
+
+def _forwarded(method):
+    """独立进程模式下将调用转发到模拟进程"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.host is not None:
+            return self.host.call(method.__name__, *args, **kwargs)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _from_snapshot(key: str, default: Callable[[], Any] = dict):
+    """独立进程模式下从最近完成的状态帧读取数据（尚无状态帧时返回 default()）"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.host is not None:
+                state = self.host.read_state()
+                return state[key] if key in state else default()
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 class GodotBridge:
     """Godot桥接类 - 处理Python和Godot之间的通信"""
 
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None, world_id: str = DEFAULT_WORLD_ID):
         self.is_initialized = False
-        self.callbacks: Dict[str, callable] = {}
+        self.world_id = world_id
+        if world_id not in list_worlds():
+            create_world(world_id)
+        # Godot回调通过事件总线每帧批量派发
+        self.events = EventBus()
+        self.mode = mode or DEFAULT_SIMULATION_MODE
+        self.python_executable: Optional[str] = None
+        self.host: Optional['SimulationHost'] = None
+        self.sampler = StackSampler()
+        self.recorder: Optional['TraceRecorder'] = None
+
+    @property
+    def logic(self) -> GameLogic:
+        """桥接绑定的世界"""
+        return get_world(self.world_id)
+
+    def configure(self, mode: str = MODE_IN_PROCESS, python_executable: Optional[str] = None):
+        """配置模拟模式（需在初始化前调用）"""
+        if self.is_initialized:
+            print("桥接已初始化，无法切换模拟模式")
+            return False
+        if mode not in (MODE_IN_PROCESS, MODE_OUT_OF_PROCESS):
+            print(f"未知模拟模式: {mode}")
+            return False
+        self.mode = mode
+        self.python_executable = python_executable
+        return True
 
     def initialize(self):
         """初始化桥接"""
         if self.is_initialized:
             return
 
-        # 初始化Python游戏逻辑
-        initialize()
+        if self.mode == MODE_OUT_OF_PROCESS:
+            # 游戏逻辑在独立进程中运行（进程间通信模块只在此模式下导入）
+            from .sim_host import SimulationHost
+            self.host = SimulationHost(
+                python_executable=self.python_executable)
+            self.host.start()
+            self.host.call("initialize")
+            for pattern in self.events.patterns():
+                self.host.call("register_callback", pattern)
+        else:
+            # 初始化Python游戏逻辑
+            initialize(self.world_id)
 
         self.is_initialized = True
-        print("Godot桥接初始化完成")
+        print(f"Godot桥接初始化完成 ({self.mode})")
+
+    def shutdown(self):
+        """关闭桥接，停止模拟进程"""
+        if self.host is not None:
+            self.host.stop()
+            self.host = None
+        self.is_initialized = False
 
     def register_callback(self, event_name: str, callback: callable):
-        """注册回调函数"""
-        self.callbacks[event_name] = callback
+        """注册回调函数（同一事件可注册多个，事件名支持通配符，如 "on_character_*"）"""
+        self.events.subscribe(event_name, callback)
+        if self.host is not None:
+            self.host.call("register_callback", event_name)
         print(f"注册回调: {event_name}")
 
-    def call_godot_function(self, function_name: str, *args, **kwargs):
-        """调用Godot函数"""
-        if function_name in self.callbacks:
-            try:
-                return self.callbacks[function_name](*args, **kwargs)
-            except Exception as e:
-                print(f"调用Godot函数 {function_name} 时发生错误: {e}")
-                return None
-        else:
-            print(f"未找到Godot函数: {function_name}")
-            return None
+    def unregister_callback(self, event_name: str, callback: Optional[callable] = None) -> bool:
+        """取消注册回调（不指定回调时取消该事件名的全部回调）"""
+        return self.events.unsubscribe(event_name, callback) > 0
+
+    def call_godot_function(self, function_name: str, *args, key=None, **kwargs):
+        """通知Godot（事件入队，在本帧更新结束时批量派发）
+
+        指定 key 时同一帧内同名同键的事件只派发最后一条。
+        """
+        self.events.publish(function_name, *args, key=key, **kwargs)
+
+    def flush_events(self) -> int:
+        """立即派发已入队的事件，返回派发数量"""
+        return self.events.flush()
+
+    @_forwarded
+    def get_event_statistics(self) -> Dict[str, int]:
+        """获取事件总线统计（发布/合并/派发/丢弃数量）"""
+        return self.events.get_statistics()
 
     def update_game(self, delta: float):
         """更新游戏"""
         if not self.is_initialized:
             return
 
-        update(delta)
+        if self.host is not None:
+            self.host.send_update(delta)
+            self.host.poll()
+            self.dispatch_host_events()
+            self.events.flush()
+            return
+
+        if self.recorder is not None:
+            self.recorder.record_update(delta)
+        update(delta, self.world_id)
+        self.dispatch_completed_saves()
+        # 每帧统一派发本帧（含两帧之间的调用）产生的事件
+        self.events.flush()
+
+    def dispatch_completed_saves(self):
+        """后台存档完成后通知Godot端: on_game_saved(文件名) / on_game_save_failed(文件名, 错误)"""
+        for result in self.logic.poll_saves():
+            if result["ok"]:
+                self.call_godot_function(EVENT_GAME_SAVED, result["filename"])
+            else:
+                self.call_godot_function(EVENT_GAME_SAVE_FAILED, result["filename"], result["error"])
+
+    def dispatch_host_events(self):
+        """将模拟进程转发来的事件放入本进程的事件总线"""
+        for event_name, args, kwargs in self.host.take_events():
+            self.call_godot_function(event_name, *args, **kwargs)
+
+    def build_state_snapshot(self, include_characters: bool = True) -> Dict[str, Any]:
+        """构建供渲染端读取的状态帧
+
+        独立进程模式下角色以打包数组单独发布，状态帧不含角色字典（include_characters=False）。
+        """
+        snapshot = {
+            "game_data": self.get_game_data(),
+            "resources": self.get_all_resources(),
+            "buildings": self.get_all_buildings(),
+            "statistics": self.get_game_statistics()
+        }
+        if include_characters:
+            snapshot["characters"] = self.get_all_characters()
+        return snapshot
 
+    @_from_snapshot("game_data")
     def get_game_data(self) -> Dict[str, Any]:
         """获取游戏数据"""
-        return get_game_state()
+        return get_game_state(self.world_id)
 
+    @_forwarded
     def execute_build_building(self, building_type: str, x: float, y: float, z: float) -> bool:
         """执行建造建筑"""
-        result = build_building(building_type, x, y, z)
+        result = build_building(building_type, x, y, z, self.world_id)
         if result:
             # 通知Godot建筑创建成功
             self.call_godot_function(
-                "on_building_created", building_type, x, y, z)
+                EVENT_BUILDING_CREATED, building_type, x, y, z)
         return result
 
+    @_forwarded
     def execute_summon_character(self, character_type: str, x: float, y: float, z: float) -> bool:
         """执行召唤角色"""
-        result = summon_character(character_type, x, y, z)
+        result = summon_character(character_type, x, y, z, self.world_id)
         if result:
             # 通知Godot角色创建成功
             self.call_godot_function(
-                "on_character_created", character_type, x, y, z)
+                EVENT_CHARACTER_CREATED, character_type, x, y, z)
         return result
 
+    @_forwarded
+    def execute_spawn_character(self, character_type: str, x: float, y: float, z: float) -> int:
+        """执行召唤角色，返回角色句柄（失败返回0）"""
+        ct = CHARACTERS_BY_NAME.get(character_type)
+        if ct is None:
+            print(f"未知角色类型: {character_type}")
+            return INVALID_HANDLE
+        handle = self.logic.spawn_character(ct, Vector3(x, y, z))
+        if handle != INVALID_HANDLE:
+            self.call_godot_function(
+                EVENT_CHARACTER_CREATED, character_type, x, y, z)
+        return handle
+
+    @_forwarded
     def get_resource_amount(self, resource_type: str) -> int:
         """获取资源数量"""
-        return get_resource(resource_type)
+        return get_resource(resource_type, self.world_id)
+
+    @_forwarded
+    def get_storage_capacity(self, resource_type: str) -> Dict[str, Any]:
+        """获取资源存储容量（增量维护，不遍历建筑列表）"""
+        return get_storage_info(resource_type, self.world_id)
+
+    @_forwarded
+    def set_storage_overflow_policy(self, policy: str) -> bool:
+        """设置存储溢出策略: drop / queue / spill"""
+        return set_overflow_policy(policy, self.world_id)
+
+    @_forwarded
+    def execute_post_job(self, job_type: str, x: float, y: float, z: float,
+                         priority: int = 0, target_id: str = "") -> int:
+        """发布工作任务（挖掘/采矿/搬运/建造）"""
+        return post_job(job_type, x, y, z, priority, target_id, self.world_id)
+
+    @_forwarded
+    def execute_complete_job(self, job_id: int) -> bool:
+        """完成工作任务"""
+        return complete_job(job_id, self.world_id)
+
+    @_forwarded
+    def get_job_assignments(self) -> List[Dict[str, Any]]:
+        """获取当前任务分配"""
+        return self.logic.get_job_assignments()
+
+    @_forwarded
+    def set_tile_type(self, x: int, z: int, tile_type: int) -> bool:
+        """同步单个瓦片类型（瓦片坐标）"""
+        return set_tile(x, z, tile_type, self.world_id)
+
+    @_forwarded
+    def load_tile_data(self, data: bytes) -> bool:
+        """整体同步瓦片数据（PackedByteArray，行优先）"""
+        try:
+            self.logic.tile_grid.load_tiles(bytes(data))
+            return True
+        except ValueError as e:
+            print(f"瓦片数据同步失败: {e}")
+            return False
+
+    @_forwarded
+    def update_mine_supply(self, mine_id: str, x: float, y: float, z: float, amount: int):
+        """更新金矿可搬运的原金数量"""
+        set_mine_supply(mine_id, x, y, z, amount, self.world_id)
+
+    @_forwarded
+    def get_haul_plan(self) -> List[Dict[str, Any]]:
+        """获取金币搬运规划"""
+        return plan_gold_hauls(self.world_id)
 
+    @_forwarded
     def save_game_data(self, filename: str):
-        """保存游戏数据"""
-        save_game(filename)
-        self.call_godot_function("on_game_saved", filename)
+        """保存游戏数据（阻塞直到写盘完成）"""
+        save_game(filename, self.world_id)
+        self.call_godot_function(EVENT_GAME_SAVED, filename)
+
+    @_forwarded
+    def save_game_async(self, filename: str) -> int:
+        """后台保存游戏，返回存档ID
+
+        主线程只拍写时复制快照，编码和写盘在后台进行；
+        完成后在之后某帧的 update_game 中回调 on_game_saved / on_game_save_failed。
+        """
+        return self.logic.save_game_async(filename)
 
+    @_forwarded
+    def get_save_status(self) -> Dict[str, int]:
+        """后台存档状态"""
+        return {"pending": self.logic.saves.pending, **self.logic.snapshots.get_statistics()}
+
+    @_forwarded
     def load_game_data(self, filename: str):
         """加载游戏数据"""
-        load_game(filename)
-        self.call_godot_function("on_game_loaded", filename)
+        load_game(filename, self.world_id)
+        self.call_godot_function(EVENT_GAME_LOADED, filename)
 
+    @_forwarded
     def process_input(self, input_data: Dict[str, Any]):
         """处理输入数据"""
+        if self.recorder is not None:
+            self.recorder.record_command(input_data)
+
         input_type = input_data.get("type", "")
 
         if input_type == "build_building":
@@ -118,12 +362,86 @@ class GodotBridge:
             z = input_data.get("z", 0.0)
             return self.execute_summon_character(character_type, x, y, z)
 
+        elif input_type == "spawn_character":
+            character_type = input_data.get("character_type", "")
+            x = input_data.get("x", 0.0)
+            y = input_data.get("y", 0.0)
+            z = input_data.get("z", 0.0)
+            return self.execute_spawn_character(character_type, x, y, z)
+
+        elif input_type == "move_character":
+            handle = input_data.get("handle", 0)
+            x = input_data.get("x", 0.0)
+            y = input_data.get("y", 0.0)
+            z = input_data.get("z", 0.0)
+            return self.move_character(handle, x, y, z)
+
+        elif input_type == "damage_character":
+            handle = input_data.get("handle", 0)
+            damage = input_data.get("damage", 0)
+            return self.damage_character(handle, damage)
+
         elif input_type == "get_resource":
             resource_type = input_data.get("resource_type", "")
             return self.get_resource_amount(resource_type)
 
+        elif input_type == "get_storage_capacity":
+            resource_type = input_data.get("resource_type", "")
+            return self.get_storage_capacity(resource_type)
+
+        elif input_type == "set_overflow_policy":
+            policy = input_data.get("policy", "")
+            return self.set_storage_overflow_policy(policy)
+
+        elif input_type == "post_job":
+            job_type = input_data.get("job_type", "")
+            x = input_data.get("x", 0.0)
+            y = input_data.get("y", 0.0)
+            z = input_data.get("z", 0.0)
+            priority = input_data.get("priority", 0)
+            target_id = input_data.get("target_id", "")
+            return self.execute_post_job(job_type, x, y, z, priority, target_id)
+
+        elif input_type == "complete_job":
+            job_id = input_data.get("job_id", 0)
+            return self.execute_complete_job(job_id)
+
+        elif input_type == "set_tile":
+            x = input_data.get("x", 0)
+            z = input_data.get("z", 0)
+            tile_type = input_data.get("tile_type", 0)
+            return self.set_tile_type(x, z, tile_type)
+
+        elif input_type == "set_mine_supply":
+            mine_id = input_data.get("mine_id", "")
+            x = input_data.get("x", 0.0)
+            y = input_data.get("y", 0.0)
+            z = input_data.get("z", 0.0)
+            amount = input_data.get("amount", 0)
+            self.update_mine_supply(mine_id, x, y, z, amount)
+            return True
+
+        elif input_type == "start_profiling":
+            interval_ms = input_data.get("interval_ms", 5.0)
+            duration_s = input_data.get("duration_s", DEFAULT_DURATION)
+            return self.start_profiling(interval_ms, duration_s)
+
+        elif input_type == "stop_profiling":
+            path = input_data.get("path", "")
+            return self.stop_profiling(path)
+
+        elif input_type == "commands":
+            # 整数ID命令缓冲区（base64），已在上方录制
+            data = base64.b64decode(input_data.get("data", ""))
+            return run_commands(self, data)
+
+        elif input_type == "reload_stats":
+            return self.reload_stat_tables()
+
         elif input_type == "save_game":
             filename = input_data.get("filename", "save.json")
+            if input_data.get("background", True):
+                return self.save_game_async(filename)
             self.save_game_data(filename)
             return True
 
@@ -136,50 +454,318 @@ class GodotBridge:
             print(f"未知输入类型: {input_type}")
             return False
 
+    @_from_snapshot("resources")
     def get_all_resources(self) -> Dict[str, int]:
         """获取所有资源"""
         resources = {}
         for resource_type in ResourceType:
-            resources[resource_type.value] = game_logic.get_resource(
+            resources[resource_type.value] = self.logic.get_resource(
                 resource_type)
         return resources
 
+    @staticmethod
+    def _building_data(building) -> Dict[str, Any]:
+        """建筑数据字典"""
+        return {
+            "type": building.type.value,
+            "position": {
+                "x": building.position.x,
+                "y": building.position.y,
+                "z": building.position.z
+            },
+            "health": building.health,
+            "max_health": building.max_health,
+            "is_built": building.is_built
+        }
+
+    @_from_snapshot("buildings", list)
     def get_all_buildings(self) -> List[Dict[str, Any]]:
         """获取所有建筑"""
-        buildings = []
-        for building in game_logic.buildings:
-            building_data = {
-                "type": building.type.value,
-                "position": {
-                    "x": building.position.x,
-                    "y": building.position.y,
-                    "z": building.position.z
-                },
-                "health": building.health,
-                "max_health": building.max_health,
-                "is_built": building.is_built
-            }
-            buildings.append(building_data)
-        return buildings
+        return [self._building_data(building) for building in self.logic.buildings]
+
+    @staticmethod
+    def _character_data(character) -> Dict[str, Any]:
+        """角色数据字典"""
+        return {
+            "handle": character.handle,
+            "type": character.type.value,
+            "position": {
+                "x": character.position.x,
+                "y": character.position.y,
+                "z": character.position.z
+            },
+            "health": character.health,
+            "max_health": character.max_health,
+            "is_alive": character.is_alive,
+            "current_action": character.current_action
+        }
 
+    @_forwarded
     def get_all_characters(self) -> List[Dict[str, Any]]:
-        """获取所有角色"""
-        characters = []
-        for character in game_logic.characters:
-            character_data = {
-                "type": character.type.value,
-                "position": {
-                    "x": character.position.x,
-                    "y": character.position.y,
-                    "z": character.position.z
-                },
-                "health": character.health,
-                "max_health": character.max_health,
-                "is_alive": character.is_alive,
-                "current_action": character.current_action
-            }
-            characters.append(character_data)
-        return characters
+        """获取所有存活角色（死亡角色已移除）"""
+        return [self._character_data(character) for character in self.logic.characters]
+
+    @_forwarded
+    def get_character(self, handle: int) -> Dict[str, Any]:
+        """按句柄获取角色（句柄失效时返回空字典）"""
+        character = self.logic.get_character(handle)
+        return self._character_data(character) if character is not None else {}
+
+    @_forwarded
+    def query_characters(self, character_type: str = "", action: str = "") -> List[Dict[str, Any]]:
+        """按类型和/或当前动作查询存活角色（空字符串表示不限）"""
+        ct = CHARACTERS_BY_NAME.get(character_type) if character_type else None
+        if character_type and ct is None:
+            return []
+        return [self._character_data(character)
+                for character in self.logic.find_characters(ct, action or None)]
+
+    @_forwarded
+    def count_characters(self, character_type: str = "", action: str = "") -> int:
+        """按类型和/或当前动作统计存活角色数量（空字符串表示不限）"""
+        ct = CHARACTERS_BY_NAME.get(character_type) if character_type else None
+        if character_type and ct is None:
+            return 0
+        return self.logic.count_characters(ct, action or None)
+
+    @_forwarded
+    def query_buildings(self, building_type: str = "", built: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """按类型和/或建造状态查询建筑（空字符串/None表示不限）"""
+        bt = BUILDINGS_BY_NAME.get(building_type) if building_type else None
+        if building_type and bt is None:
+            return []
+        return [self._building_data(building)
+                for building in self.logic.find_buildings(bt, built)]
+
+    @_forwarded
+    def count_buildings(self, building_type: str = "", built: Optional[bool] = None) -> int:
+        """按类型和/或建造状态统计建筑数量（空字符串/None表示不限）"""
+        bt = BUILDINGS_BY_NAME.get(building_type) if building_type else None
+        if building_type and bt is None:
+            return 0
+        return self.logic.count_buildings(bt, built)
+
+    @_forwarded
+    def can_place_building(self, building_type: str, x: float, z: float) -> bool:
+        """建筑占地是否可放置（占地内瓦片均可建造且未被其他建筑占用，不检查资源）"""
+        bt = BUILDINGS_BY_NAME.get(building_type)
+        if bt is None:
+            return False
+        return self.logic.can_place_building(bt, Vector3(x, 0, z))
+
+    @_forwarded
+    def get_valid_placements(self, building_type: str) -> Dict[str, Any]:
+        """整张地图的可放置掩码，供建筑预览一次性高亮
+
+        mask 按建筑位置所在瓦片索引（行优先，z * width + x），1为可放置，
+        可直接转换为 PackedByteArray；version 不变时掩码不变，可跳过重绘。
+        """
+        bt = BUILDINGS_BY_NAME.get(building_type)
+        if bt is None:
+            print(f"未知建筑类型: {building_type}")
+            return {}
+        return self.logic.get_valid_placements(bt)
+
+    @_forwarded
+    def move_character(self, handle: int, x: float, y: float, z: float) -> bool:
+        """按句柄移动角色"""
+        character = self.logic.get_character(handle)
+        if character is None:
+            return False
+        self.logic.move_character(character, Vector3(x, y, z))
+        return True
+
+    @_forwarded
+    def damage_character(self, handle: int, damage: int) -> bool:
+        """按句柄对角色造成伤害"""
+        character = self.logic.get_character(handle)
+        if character is None:
+            return False
+        if damage <= 0:
+            return True
+        self.logic.damage_character(character, damage)
+        if character.is_alive:
+            # 同一帧内多次受伤只通知最终生命值
+            self.call_godot_function(EVENT_CHARACTER_HEALTH_CHANGED, handle,
+                                     character.health, character.max_health, key=handle)
+        else:
+            self.call_godot_function(EVENT_CHARACTER_DIED, handle, key=handle)
+        return True
+
+    def get_packed_characters(self) -> Dict[str, Any]:
+        """获取角色打包数组
+
+        positions/transforms/health_ratios 为 float32，type_ids 为 int32，
+        小端字节序，可直接转换为 PackedFloat32Array/PackedInt32Array；
+        transforms 每实例12个浮点数，可直接赋给 MultiMesh.buffer。
+        独立进程模式下从最近完成的状态帧拷贝（零拷贝读取见 SimulationHost.read_entities）。
+        """
+        if self.host is not None:
+            return self._read_packed_characters()
+        return self.logic.get_packed_characters()
+
+    def _read_packed_characters(self) -> Dict[str, Any]:
+        """从状态帧拷贝角色打包数组，帧在拷贝期间被覆盖时重读"""
+        for _ in range(3):
+            entities, token = self.host.read_entities()
+            if entities is None:
+                break
+            packed = {"count": entities["count"], "version": entities["version"]}
+            for key in ("positions", "transforms", "health_ratios", "type_ids"):
+                view = entities[key]
+                packed[key] = view.tobytes()
+                view.release()
+            if self.host.state.is_valid(token):
+                return packed
+        # 尚未发布状态帧或帧一直在覆盖，直接向模拟进程查询
+        return self.host.call("get_packed_characters")
+
+    @_forwarded
+    def get_visibility_changes(self) -> Dict[str, Any]:
+        """取出可见性变化的迷雾瓦片
+
+        tiles 为 int32 瓦片索引（行优先，z * width + x），visible 为对应的 0/1 字节，
+        可直接转换为 PackedInt32Array/PackedByteArray。每次调用后清空。
+        """
+        return self.logic.get_visibility_changes()
+
+    @_forwarded
+    def get_visibility_bits(self) -> Dict[str, Any]:
+        """完整的可见/已探索位数组（瓦片 i 对应字节 i >> 3 的第 i & 7 位）"""
+        return self.logic.get_visibility_bits()
+
+    @_forwarded
+    def is_tile_visible(self, x: int, z: int) -> bool:
+        """瓦片当前是否在角色视野内（瓦片坐标）"""
+        return self.logic.visibility.is_visible(x, z)
+
+    @_forwarded
+    def get_dirty_terrain_chunks(self) -> Dict[str, Any]:
+        """取出需要重建的静态地形区块网格
+
+        chunks 为 "区块x_区块z" -> 区块网格二进制（格式见 meshing.py），
+        首次调用返回全部区块，之后只返回瓦片发生变化的区块。
+        """
+        return self.logic.get_dirty_terrain_chunks()
+
+    @_forwarded
+    def are_tiles_connected(self, x1: int, z1: int, x2: int, z2: int) -> bool:
+        """两个瓦片是否在同一可行走区域（瓦片坐标）"""
+        return self.logic.are_tiles_connected(x1, z1, x2, z2)
+
+    @_forwarded
+    def get_region(self, x: int, z: int) -> Dict[str, int]:
+        """瓦片所在可行走区域编号和大小（瓦片坐标，不可行走为 -1 / 0）"""
+        return self.logic.get_region(x, z)
+
+    @_forwarded
+    def set_hero_threats(self, data: bytes) -> bool:
+        """上报英雄威胁来源: float32 小端 (x, z, 强度) * N（PackedFloat32Array，世界坐标）"""
+        try:
+            self.logic.influence.set_threats(data)
+            return True
+        except ValueError as e:
+            print(f"威胁数据无效: {e}")
+            return False
+
+    @_forwarded
+    def get_influence(self, layer: str, x: int, z: int) -> float:
+        """读取瓦片影响力（friendly / threat / resource，瓦片坐标）"""
+        from .influence import InfluenceLayer
+        try:
+            return self.logic.influence.sample(InfluenceLayer(layer), x, z)
+        except ValueError:
+            print(f"未知影响力图层: {layer}")
+            return 0.0
+
+    @_forwarded
+    def get_influence_layer(self, layer: str) -> Dict[str, Any]:
+        """导出整层影响力（float32 行优先，可用于调试叠加显示）"""
+        from .influence import InfluenceLayer
+        try:
+            influence_layer = InfluenceLayer(layer)
+        except ValueError:
+            print(f"未知影响力图层: {layer}")
+            return {}
+        influence = self.logic.influence
+        return {
+            "width": self.logic.tile_grid.width,
+            "height": self.logic.tile_grid.height,
+            "version": influence.version,
+            "data": influence.export(influence_layer)
+        }
+
+    @_forwarded
+    def get_perf_metrics(self) -> Dict[str, Any]:
+        """获取各子系统每帧耗时的 p50/p95/p99（毫秒）、调用次数和分配块数"""
+        return self.logic.get_perf_metrics()
+
+    @_forwarded
+    def set_perf_metrics_enabled(self, enabled: bool, reset: bool = False) -> bool:
+        """开关帧性能统计"""
+        self.logic.set_profiling_enabled(enabled)
+        if reset:
+            self.logic.profiler.reset()
+        return True
+
+    @_forwarded
+    def set_tick_workers(self, workers: int) -> bool:
+        """设置帧更新并行线程数（0或1切回串行）"""
+        self.logic.set_tick_workers(workers)
+        return True
+
+    @_forwarded
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """获取帧更新调度的批次划分和上一帧各阶段耗时"""
+        return self.logic.get_scheduler_stats()
+
+    @_forwarded
+    def start_profiling(self, interval_ms: float = 5.0,
+                        duration_s: float = DEFAULT_DURATION) -> bool:
+        """开始调用栈采样（有时长上限，超时自动停止）"""
+        return self.sampler.start(interval_ms / 1000.0, duration_s)
+
+    @_forwarded
+    def stop_profiling(self, path: str = "", top_n: int = 20) -> Dict[str, Any]:
+        """停止采样，写出折叠栈文件并返回热点函数摘要"""
+        self.sampler.stop()
+        summary = self.sampler.get_summary(top_n)
+        if path:
+            try:
+                self.sampler.write_collapsed(path)
+                summary["path"] = path
+                print(f"采样结果保存到: {path}")
+            except OSError as e:
+                print(f"保存采样结果失败: {e}")
+        return summary
+
+    @_forwarded
+    def start_recording(self, path: str) -> bool:
+        """开始录制输入轨迹（必须从新游戏开始）"""
+        if self.recorder is not None:
+            print("已在录制中")
+            return False
+        if self.logic.game_time > 0 or self.logic.characters:
+            print("录制必须在游戏开始前启动")
+            return False
+        # 回放模块可独立运行（python -m），录制时再导入
+        from .replay import TraceRecorder
+        try:
+            self.recorder = TraceRecorder(path)
+        except OSError as e:
+            print(f"无法创建轨迹文件: {e}")
+            return False
+        print(f"开始录制轨迹: {path}")
+        return True
+
+    @_forwarded
+    def stop_recording(self) -> str:
+        """停止录制，返回最终状态哈希"""
+        if self.recorder is None:
+            return ""
+        digest = self.recorder.close(self.logic)
+        self.recorder = None
+        return digest
 
     def validate_position(self, x: float, y: float, z: float) -> bool:
         """验证位置是否有效"""
@@ -193,96 +779,207 @@ class GodotBridge:
 
         return True
 
+    @_forwarded
+    def protocol_handshake(self, client_hash: str = "") -> Dict[str, Any]:
+        """整数ID协议握手，返回ID表和命令布局"""
+        return handshake(client_hash)
+
+    @_forwarded
+    def execute_commands(self, data: bytes) -> bytes:
+        """执行整数ID命令缓冲区（PackedByteArray），返回 int32 结果数组"""
+        data = bytes(data)
+        if self.recorder is not None:
+            self.recorder.record_command(
+                {"type": "commands", "data": base64.b64encode(data).decode("ascii")})
+        return run_commands(self, data)
+
+    @_forwarded
     def get_building_cost(self, building_type: str) -> Dict[str, int]:
         """获取建筑成本"""
-        try:
-            bt = BuildingType(building_type)
-            costs = game_logic.building_costs.get(bt, {})
-            return {rt.value: amount for rt, amount in costs.items()}
-        except ValueError:
+        bt = BUILDINGS_BY_NAME.get(building_type)
+        if bt is None:
             return {}
+        costs = self.logic.building_costs.get(bt, {})
+        return {rt.value: amount for rt, amount in costs.items()}
 
+    @_forwarded
     def get_character_cost(self, character_type: str) -> Dict[str, int]:
         """获取角色成本"""
-        try:
-            ct = CharacterType(character_type)
-            costs = game_logic.character_costs.get(ct, {})
-            return {rt.value: amount for rt, amount in costs.items()}
-        except ValueError:
+        ct = CHARACTERS_BY_NAME.get(character_type)
+        if ct is None:
             return {}
+        costs = self.logic.character_costs.get(ct, {})
+        return {rt.value: amount for rt, amount in costs.items()}
 
+    @_forwarded
+    def reload_stat_tables(self) -> bool:
+        """立即重新加载属性与成本配置（通常无需调用，修改文件后会自动重载）"""
+        return self.logic.stats.reload()
+
+    @_forwarded
     def can_afford_building(self, building_type: str) -> bool:
         """检查是否能建造建筑"""
-        try:
-            bt = BuildingType(building_type)
-            return game_logic.can_afford_building(bt)
-        except ValueError:
-            return False
+        bt = BUILDINGS_BY_NAME.get(building_type)
+        return bt is not None and self.logic.can_afford_building(bt)
 
+    @_forwarded
     def can_afford_character(self, character_type: str) -> bool:
         """检查是否能召唤角色"""
-        try:
-            ct = CharacterType(character_type)
-            return game_logic.can_afford_character(ct)
-        except ValueError:
-            return False
+        ct = CHARACTERS_BY_NAME.get(character_type)
+        return ct is not None and self.logic.can_afford_character(ct)
 
+    @_from_snapshot("statistics")
     def get_game_statistics(self) -> Dict[str, Any]:
-        """获取游戏统计信息"""
+        """获取游戏统计信息（计数来自增量索引，不遍历实体）"""
+        logic = self.logic
         return {
-            "game_time": game_logic.game_time,
-            "total_resources": sum(game_logic.get_resource(rt) for rt in ResourceType),
-            "buildings_count": len(game_logic.buildings),
-            "characters_count": len(game_logic.characters),
-            "alive_characters": len([c for c in game_logic.characters if c.is_alive]),
-            "built_buildings": len([b for b in game_logic.buildings if b.is_built])
+            "game_time": logic.game_time,
+            "total_resources": sum(logic.get_resource(rt) for rt in ResourceType),
+            "buildings_count": logic.count_buildings(),
+            "characters_count": logic.count_characters(),
+            "alive_characters": logic.count_characters(),
+            "built_buildings": logic.count_buildings(built=True)
         }
 
 
-# 全局桥接实例
-bridge = GodotBridge()
+# 全局桥接实例（延迟创建，导入本模块时不构建游戏世界）
+_bridge: Optional[GodotBridge] = None
 
 
 def get_bridge() -> GodotBridge:
-    """获取桥接实例"""
-    return bridge
+    """获取桥接实例（首次调用时创建）"""
+    global _bridge
+    if _bridge is None:
+        _bridge = GodotBridge()
+    return _bridge
+
+
+def __getattr__(name: str):
+    if name == "bridge":
+        return get_bridge()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def configure_bridge(mode: str = MODE_IN_PROCESS, python_executable: Optional[str] = None) -> bool:
+    """配置模拟模式: in_process / out_of_process"""
+    return get_bridge().configure(mode, python_executable)
 
 
 def initialize_bridge():
     """初始化桥接"""
-    bridge.initialize()
+    get_bridge().initialize()
+
+
+def shutdown_bridge():
+    """关闭桥接"""
+    get_bridge().shutdown()
 
 
 def update_bridge(delta: float):
     """更新桥接"""
-    bridge.update_game(delta)
+    get_bridge().update_game(delta)
 
 
 def process_input(input_data: Dict[str, Any]):
     """处理输入"""
-    return bridge.process_input(input_data)
+    return get_bridge().process_input(input_data)
 
 
 def get_game_data() -> Dict[str, Any]:
     """获取游戏数据"""
-    return bridge.get_game_data()
+    return get_bridge().get_game_data()
 
 
 def get_all_resources() -> Dict[str, int]:
     """获取所有资源"""
-    return bridge.get_all_resources()
+    return get_bridge().get_all_resources()
 
 
 def get_all_buildings() -> List[Dict[str, Any]]:
     """获取所有建筑"""
-    return bridge.get_all_buildings()
+    return get_bridge().get_all_buildings()
 
 
 def get_all_characters() -> List[Dict[str, Any]]:
     """获取所有角色"""
-    return bridge.get_all_characters()
+    return get_bridge().get_all_characters()
+
+
+def get_character(handle: int) -> Dict[str, Any]:
+    """按句柄获取角色"""
+    return get_bridge().get_character(handle)
+
+
+def query_characters(character_type: str = "", action: str = "") -> List[Dict[str, Any]]:
+    """按类型/动作查询角色"""
+    return get_bridge().query_characters(character_type, action)
+
+
+def count_characters(character_type: str = "", action: str = "") -> int:
+    """按类型/动作统计角色数量"""
+    return get_bridge().count_characters(character_type, action)
+
+
+def query_buildings(building_type: str = "", built: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """按类型/建造状态查询建筑"""
+    return get_bridge().query_buildings(building_type, built)
+
+
+def count_buildings(building_type: str = "", built: Optional[bool] = None) -> int:
+    """按类型/建造状态统计建筑数量"""
+    return get_bridge().count_buildings(building_type, built)
+
+
+def get_valid_placements(building_type: str) -> Dict[str, Any]:
+    """建筑可放置掩码"""
+    return get_bridge().get_valid_placements(building_type)
+
+
+def get_packed_characters() -> Dict[str, Any]:
+    """获取角色打包数组"""
+    return get_bridge().get_packed_characters()
+
+
+def get_visibility_changes() -> Dict[str, Any]:
+    """获取可见性变化的迷雾瓦片"""
+    return get_bridge().get_visibility_changes()
+
+
+def get_visibility_bits() -> Dict[str, Any]:
+    """获取完整的可见/已探索位数组"""
+    return get_bridge().get_visibility_bits()
+
+
+def protocol_handshake(client_hash: str = "") -> Dict[str, Any]:
+    """整数ID协议握手"""
+    return get_bridge().protocol_handshake(client_hash)
+
+
+def execute_commands(data: bytes) -> bytes:
+    """执行整数ID命令缓冲区"""
+    return get_bridge().execute_commands(data)
+
+
+def get_storage_capacity(resource_type: str) -> Dict[str, Any]:
+    """获取资源存储容量"""
+    return get_bridge().get_storage_capacity(resource_type)
+
+
+def get_job_assignments() -> List[Dict[str, Any]]:
+    """获取当前任务分配"""
+    return get_bridge().get_job_assignments()
+
+
+def get_haul_plan() -> List[Dict[str, Any]]:
+    """获取金币搬运规划"""
+    return get_bridge().get_haul_plan()
+
+
+def get_perf_metrics() -> Dict[str, Any]:
+    """获取帧性能统计"""
+    return get_bridge().get_perf_metrics()
 
 
 def get_game_statistics() -> Dict[str, Any]:
     """获取游戏统计信息"""
-    return bridge.get_game_statistics()
+    return get_bridge().get_game_statistics()
@@ -0,0 +1,109 @@
+"""
+Python桥接模块 - 冷启动耗时检查
+每个探测在全新的解释器中运行，测量导入/首帧耗时，
+超出预算或提前加载了重量级依赖时返回非零退出码，可放在CI或发布前检查中运行。
+
+用法: python -m python_bridge.coldstart [--runs 5] [--scale 1.0] [--importtime]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Any, Tuple
+
+
+# 探测名 -> (语句, 耗时预算毫秒)
+PROBES: Dict[str, Tuple[str, float]] = {
+    "package": ("import python_bridge", 10.0),
+    "bridge": ("import python_bridge.bridge", 150.0),
+    "first_frame": ("import python_bridge as pb\n"
+                    "pb.initialize_bridge()\n"
+                    "pb.update_bridge(1.0 / 60.0)", 300.0),
+}
+
+# 启动阶段不应加载的模块（只在对应功能首次使用时加载）
+HEAVY_MODULES = ("numpy", "multiprocessing", "concurrent.futures")
+
+_CHILD = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    exec(compile(sys.argv[1], "<probe>", "exec"), {})
+elapsed = time.perf_counter() - start
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+print(json.dumps({"ms": elapsed * 1000.0, "heavy": heavy}))
+"""
+
+
+def _package_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_probe(statement: str, runs: int = 5) -> Dict[str, Any]:
+    """在全新解释器中运行语句若干次，返回耗时中位数和提前加载的重量级模块"""
+    root = _package_root()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+    # 保留字节码缓存，测量的是正常冷启动而不是首次编译
+    timings: List[float] = []
+    heavy: List[str] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _CHILD, statement, *HEAVY_MODULES],
+            cwd=root, env=env, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(f"探测失败: {result.stderr.strip()}")
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(data["ms"])
+        heavy = data["heavy"]
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "heavy": heavy}
+
+
+def import_profile(statement: str, top_n: int = 10) -> List[Tuple[str, int]]:
+    """用 -X importtime 列出累计耗时最多的模块（微秒）"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=_package_root(), capture_output=True, text=True, timeout=60)
+    entries = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        entries.append((parts[2].strip(), int(parts[1])))
+    entries.sort(key=lambda entry: entry[1], reverse=True)
+    return entries[:top_n]
+
+
+def check(runs: int = 5, scale: float = 1.0, show_profile: bool = False) -> bool:
+    """运行所有探测，全部在预算内且未提前加载重量级模块时返回True"""
+    ok = True
+    for name, (statement, budget) in PROBES.items():
+        result = run_probe(statement, runs)
+        limit = budget * scale
+        passed = result["median_ms"] <= limit and not result["heavy"]
+        ok = ok and passed
+        mark = "✅" if passed else "❌"
+        print(f"{mark} {name}: {result['median_ms']:.1f} ms (最小 {result['min_ms']:.1f} ms, 预算 {limit:.0f} ms)")
+        if result["heavy"]:
+            print(f"   提前加载了: {', '.join(result['heavy'])}")
+        if show_profile or not passed:
+            for module, micros in import_profile(statement):
+                print(f"   {micros / 1000.0:8.1f} ms  {module}")
+    return ok
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="检查 python_bridge 冷启动耗时")
+    parser.add_argument("--runs", type=int, default=5, help="每个探测的运行次数（取中位数）")
+    parser.add_argument("--scale", type=float, default=1.0, help="预算倍率（慢速机器上放宽）")
+    parser.add_argument("--importtime", action="store_true", help="总是输出导入耗时明细")
+    args = parser.parse_args(argv)
+    return 0 if check(args.runs, args.scale, args.importtime) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Python桥接模块 - 区域连通性
+维护可行走瓦片的连通区域，挖掘（瓦片变为可行走）时用并查集合并，近似 O(1)；
+建墙（瓦片变为不可行走）可能把区域分裂，此时从墙的各个相邻瓦片交替广搜，
+只给分裂出去的较小区域重新编号，大区域保持不动。
+任意两瓦片是否连通的查询为 O(α(n))，可供任务分配过滤不可达的工作。
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, List, Tuple
+
+from .tile_grid import TileGrid
+
+
+# 不可行走瓦片的区域编号
+NO_REGION = -1
+
+
+class RegionConnectivity:
+    """动态区域连通性
+
+    每个可行走瓦片记录一个区域编号，区域编号之间用并查集合并。
+    分裂时被切出的瓦片直接写入新编号，因此不需要从并查集中删除元素。
+    """
+
+    def __init__(self, grid: TileGrid):
+        self.grid = grid
+        size = grid.width * grid.height
+        self._labels = array('i', [NO_REGION]) * size
+        # 并查集（按区域编号）
+        self._parent: List[int] = []
+        self._size: List[int] = []
+        self.merges = 0
+        self.splits = 0
+        self.relabeled_tiles = 0
+        self.rebuild()
+        grid.add_listener(self._on_tile_changed)
+
+    # ------------------------------------------------------------------
+    # 并查集
+    # ------------------------------------------------------------------
+
+    def _new_label(self, size: int = 0) -> int:
+        label = len(self._parent)
+        self._parent.append(label)
+        self._size.append(size)
+        return label
+
+    def _find(self, label: int) -> int:
+        parent = self._parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        # 路径压缩
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def _union(self, a: int, b: int) -> int:
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return ra
+        # 按大小合并
+        if self._size[ra] < self._size[rb]:
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        self._size[ra] += self._size[rb]
+        self.merges += 1
+        return ra
+
+    # ------------------------------------------------------------------
+    # 构建与更新
+    # ------------------------------------------------------------------
+
+    def rebuild(self):
+        """整体重新标记（整体载入地图时使用）"""
+        width, size = self.grid.width, self.grid.width * self.grid.height
+        walkable = self.grid.walkable
+        labels = array('i', [NO_REGION]) * size
+        self._parent = []
+        self._size = []
+        for start in range(size):
+            if not walkable[start] or labels[start] != NO_REGION:
+                continue
+            label = self._new_label()
+            labels[start] = label
+            queue = deque([start])
+            count = 0
+            while queue:
+                i = queue.popleft()
+                count += 1
+                for j in self._neighbors(i, width, size):
+                    if walkable[j] and labels[j] == NO_REGION:
+                        labels[j] = label
+                        queue.append(j)
+            self._size[label] = count
+        self._labels = labels
+
+    @staticmethod
+    def _neighbors(i: int, width: int, size: int):
+        x = i % width
+        if x + 1 < width:
+            yield i + 1
+        if x > 0:
+            yield i - 1
+        if i + width < size:
+            yield i + width
+        if i >= width:
+            yield i - width
+
+    def _on_tile_changed(self, x: int, z: int, old: int, new: int):
+        if x < 0:
+            self.rebuild()
+            return
+        width = self.grid.width
+        i = z * width + x
+        walkable = self.grid.walkable[i] == 1
+        had_region = self._labels[i] != NO_REGION
+        if walkable and not had_region:
+            self._dig(i)
+        elif not walkable and had_region:
+            self._wall(i)
+
+    def _dig(self, i: int):
+        """瓦片变为可行走: 新建单瓦片区域并与相邻区域合并"""
+        width, size = self.grid.width, len(self._labels)
+        label = self._new_label(1)
+        self._labels[i] = label
+        for j in self._neighbors(i, width, size):
+            if self._labels[j] != NO_REGION:
+                self._union(label, self._labels[j])
+
+    def _wall(self, i: int):
+        """瓦片变为不可行走: 检查相邻瓦片是否仍然连通，只给分裂出的小区域重新编号"""
+        width, size = self.grid.width, len(self._labels)
+        labels = self._labels
+        root = self._find(labels[i])
+        labels[i] = NO_REGION
+        self._size[root] -= 1
+        starts = [j for j in self._neighbors(i, width, size) if labels[j] != NO_REGION]
+        if len(starts) < 2:
+            return
+
+        # 每个相邻瓦片一组搜索，交替各扩展一个瓦片；两组相遇即合并。
+        # 队列耗尽的组已走完整个区域且未遇到其他组，即被切出的区域；
+        # 只剩一组仍在扩展时停止，这一组是原区域，不需要遍历。
+        queues: Dict[int, deque] = {}
+        members: Dict[int, List[int]] = {}
+        owner: Dict[int, int] = {}
+        alias: Dict[int, int] = {}
+        for g, j in enumerate(starts):
+            owner[j] = g
+            queues[g] = deque([j])
+            members[g] = [j]
+
+        def resolve(g: int) -> int:
+            while g in alias:
+                g = alias[g]
+            return g
+
+        while len(queues) > 1:
+            running = [g for g in queues if queues[g]]
+            if len(running) <= 1:
+                break
+            for g in running:
+                if g not in queues:
+                    continue
+                current = queues[g].popleft()
+                for j in self._neighbors(current, width, size):
+                    if labels[j] == NO_REGION:
+                        continue
+                    other = owner.get(j)
+                    if other is None:
+                        owner[j] = g
+                        queues[g].append(j)
+                        members[g].append(j)
+                        continue
+                    other = resolve(other)
+                    if other == g:
+                        continue
+                    # 两组相遇: 成员少的一组并入成员多的一组
+                    if len(members[g]) < len(members[other]):
+                        g, other = other, g
+                    alias[other] = g
+                    queues[g].extend(queues.pop(other))
+                    members[g].extend(members.pop(other))
+
+        if len(queues) <= 1:
+            return
+        separated = [g for g in queues if not queues[g]]
+        if len(separated) == len(queues):
+            # 所有组都已搜索完毕: 最大的一组沿用原编号
+            separated.sort(key=lambda g: len(members[g]), reverse=True)
+            separated = separated[1:]
+        self.splits += 1
+        for g in separated:
+            tiles = members[g]
+            label = self._new_label(len(tiles))
+            for j in tiles:
+                labels[j] = label
+            self._size[root] -= len(tiles)
+            self.relabeled_tiles += len(tiles)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def region_of(self, x: int, z: int) -> int:
+        """瓦片所在区域（不可行走或地图外为 NO_REGION）"""
+        if not self.grid.in_bounds(x, z):
+            return NO_REGION
+        label = self._labels[z * self.grid.width + x]
+        return self._find(label) if label != NO_REGION else NO_REGION
+
+    def region_size(self, x: int, z: int) -> int:
+        """瓦片所在区域的瓦片数"""
+        region = self.region_of(x, z)
+        return self._size[region] if region != NO_REGION else 0
+
+    def connected(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """两个可行走瓦片是否连通"""
+        region = self.region_of(*a)
+        return region != NO_REGION and region == self.region_of(*b)
+
+    def can_reach(self, start: Tuple[int, int], target: Tuple[int, int]) -> bool:
+        """从 start 能否走到 target 或其相邻瓦片（目标可以是墙，如挖掘/采矿任务）"""
+        region = self.region_of(*start)
+        if region == NO_REGION:
+            return False
+        x, z = target
+        for tx, tz in ((x, z), (x + 1, z), (x - 1, z), (x, z + 1), (x, z - 1)):
+            if self.region_of(tx, tz) == region:
+                return True
+        return False
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取连通性统计"""
+        regions = sum(1 for label, parent in enumerate(self._parent)
+                      if label == parent and self._size[label] > 0)
+        return {
+            "regions": regions,
+            "merges": self.merges,
+            "splits": self.splits,
+            "relabeled_tiles": self.relabeled_tiles
+        }
@@ -0,0 +1,115 @@
+"""
+Python桥接模块 - 实体管理
+实体句柄由槽位下标和代数组成，空闲槽位链表实现 O(1) 生成/销毁，
+销毁后槽位被复用，长时间运行时内存不随生成次数增长
+"""
+
+from array import array
+from typing import Generic, Iterator, List, Optional, Tuple, TypeVar
+
+
+# 句柄布局: 高位为代数，低 INDEX_BITS 位为槽位下标（64位整数，可直接作为Godot int）
+INDEX_BITS = 24
+INDEX_MASK = (1 << INDEX_BITS) - 1
+GENERATION_MASK = 0xFFFFFFFF
+# 代数从1开始，0永远不是有效句柄
+INVALID_HANDLE = 0
+
+T = TypeVar("T")
+
+
+def make_handle(index: int, generation: int) -> int:
+    """组合句柄"""
+    return (generation << INDEX_BITS) | index
+
+
+def handle_index(handle: int) -> int:
+    """句柄的槽位下标"""
+    return handle & INDEX_MASK
+
+
+def handle_generation(handle: int) -> int:
+    """句柄的代数"""
+    return handle >> INDEX_BITS
+
+
+class EntityPool(Generic[T]):
+    """带代数句柄的实体池
+
+    槽位销毁时代数加一，旧句柄随即失效；空闲槽位按后进先出复用，
+    结果与运行环境无关（回放确定）。迭代按槽位顺序跳过空槽，
+    空槽数量不超过历史同时存活的峰值。
+    """
+
+    def __init__(self):
+        self._slots: List[Optional[T]] = []
+        self._generations = array('I')
+        self._free: List[int] = []
+        self._count = 0
+
+    def spawn(self, entity: T) -> int:
+        """加入实体，返回句柄"""
+        if self._free:
+            index = self._free.pop()
+            self._slots[index] = entity
+        else:
+            index = len(self._slots)
+            if index > INDEX_MASK:
+                raise OverflowError("实体数量超过句柄下标上限")
+            self._slots.append(entity)
+            self._generations.append(1)
+        self._count += 1
+        return make_handle(index, self._generations[index])
+
+    def despawn(self, handle: int) -> Optional[T]:
+        """移除实体，返回被移除的实体（句柄无效时返回None）"""
+        entity = self.get(handle)
+        if entity is None:
+            return None
+        index = handle & INDEX_MASK
+        self._slots[index] = None
+        # 代数回绕时跳过0，保证句柄永不为 INVALID_HANDLE
+        self._generations[index] = (self._generations[index] + 1) & GENERATION_MASK or 1
+        self._free.append(index)
+        self._count -= 1
+        return entity
+
+    def get(self, handle: int) -> Optional[T]:
+        """按句柄获取实体（已销毁或过期的句柄返回None）"""
+        index = handle & INDEX_MASK
+        if index >= len(self._slots) or self._generations[index] != handle >> INDEX_BITS:
+            return None
+        return self._slots[index]
+
+    def is_alive(self, handle: int) -> bool:
+        """句柄是否仍指向存活实体"""
+        return self.get(handle) is not None
+
+    @property
+    def capacity(self) -> int:
+        """已分配的槽位数（含空闲槽位）"""
+        return len(self._slots)
+
+    def items(self) -> Iterator[Tuple[int, T]]:
+        """按槽位顺序迭代 (句柄, 实体)"""
+        generations = self._generations
+        for index, entity in enumerate(self._slots):
+            if entity is not None:
+                yield make_handle(index, generations[index]), entity
+
+    def clear(self):
+        """清空所有实体（已发出的句柄全部失效）"""
+        for index, entity in enumerate(self._slots):
+            if entity is not None:
+                self.despawn(make_handle(index, self._generations[index]))
+
+    def __iter__(self) -> Iterator[T]:
+        for entity in self._slots:
+            if entity is not None:
+                yield entity
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
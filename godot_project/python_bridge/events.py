@@ -0,0 +1,134 @@
+"""
+Python桥接模块 - 事件总线
+修改游戏状态时只把事件放入队列，每帧统一派发一次。
+带合并键的事件在同一帧内只保留最新一条（例如同一角色的多次生命变化），
+每个主题可有多个订阅者，订阅模式支持通配符（fnmatch 语法，如 "on_character_*"）。
+"""
+
+import fnmatch
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+# 事件主题（与Godot端的回调名一致）
+EVENT_BUILDING_CREATED = "on_building_created"
+EVENT_CHARACTER_CREATED = "on_character_created"
+EVENT_CHARACTER_HEALTH_CHANGED = "on_character_health_changed"
+EVENT_CHARACTER_DIED = "on_character_died"
+EVENT_GAME_SAVED = "on_game_saved"
+EVENT_GAME_SAVE_FAILED = "on_game_save_failed"
+EVENT_GAME_LOADED = "on_game_loaded"
+
+
+@dataclass
+class Event:
+    """事件数据类"""
+    topic: str
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    key: Optional[Hashable] = None
+
+
+@dataclass
+class _Subscription:
+    pattern: str
+    callback: Callable
+    with_topic: bool
+
+
+class EventBus:
+    """事件总线
+
+    publish 只入队，flush 按发布顺序派发（合并的事件保留首次发布的位置，
+    使用最后一次的参数）。派发期间新发布的事件留到下一次 flush。
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Event] = {}
+        self._seq = itertools.count()
+        self._subscriptions: List[_Subscription] = []
+        # 主题 -> 匹配的订阅（订阅变化时清空）
+        self._resolved: Dict[str, List[_Subscription]] = {}
+        self.published = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, pattern: str, callback: Callable, with_topic: bool = False):
+        """订阅主题（支持通配符），with_topic 时回调第一个参数为主题名"""
+        self._subscriptions.append(_Subscription(pattern, callback, with_topic))
+        self._resolved.clear()
+
+    def unsubscribe(self, pattern: str, callback: Optional[Callable] = None) -> int:
+        """取消订阅（不指定回调时取消该模式的全部订阅），返回取消的数量"""
+        before = len(self._subscriptions)
+        self._subscriptions = [
+            s for s in self._subscriptions
+            if not (s.pattern == pattern and (callback is None or s.callback == callback))
+        ]
+        self._resolved.clear()
+        return before - len(self._subscriptions)
+
+    def patterns(self) -> List[str]:
+        """已订阅的模式（去重，按订阅顺序）"""
+        return list(dict.fromkeys(s.pattern for s in self._subscriptions))
+
+    def publish(self, topic: str, *args, key: Optional[Hashable] = None, **kwargs):
+        """发布事件（只入队），指定 key 时同一帧内同主题同键的事件合并为一条"""
+        self.published += 1
+        if key is None:
+            self._pending[(None, next(self._seq))] = Event(topic, args, kwargs)
+            return
+        slot = (topic, key)
+        event = self._pending.get(slot)
+        if event is None:
+            self._pending[slot] = Event(topic, args, kwargs, key)
+        else:
+            event.args = args
+            event.kwargs = kwargs
+            self.coalesced += 1
+
+    def _match(self, topic: str) -> List[_Subscription]:
+        subscriptions = self._resolved.get(topic)
+        if subscriptions is None:
+            subscriptions = [s for s in self._subscriptions
+                             if s.pattern == topic or fnmatch.fnmatchcase(topic, s.pattern)]
+            self._resolved[topic] = subscriptions
+        return subscriptions
+
+    def flush(self) -> int:
+        """派发本帧所有事件（无订阅者的事件丢弃），返回处理的事件数"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        for event in pending.values():
+            subscriptions = self._match(event.topic)
+            if not subscriptions:
+                self.dropped += 1
+                continue
+            self.delivered += 1
+            for subscription in subscriptions:
+                try:
+                    if subscription.with_topic:
+                        subscription.callback(event.topic, *event.args, **event.kwargs)
+                    else:
+                        subscription.callback(*event.args, **event.kwargs)
+                except Exception as e:
+                    print(f"事件 {event.topic} 回调时发生错误: {e}")
+        return len(pending)
+
+    def clear(self):
+        """丢弃所有未派发的事件"""
+        self._pending.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取事件统计"""
+        return {
+            "pending": len(self._pending),
+            "subscriptions": len(self._subscriptions),
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
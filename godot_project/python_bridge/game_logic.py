@@ -3,11 +3,35 @@ Python桥接模块 - 游戏逻辑
 将2D版本的游戏逻辑集成到Godot 3D版本中
 """
 
+import itertools
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
 
+from .storage import StorageLedger, OverflowPolicy
+from .jobs import JobBoard, JobType, Job
+from .tile_grid import TileGrid, TileType
+from .logistics import LogisticsPlanner
+from .packed import TransformBuffer, HIDDEN_TYPE_ID
+from .perf import TickProfiler
+from .stats import StatRegistry, get_stat_registry
+from .entities import EntityPool, INVALID_HANDLE, handle_index
+from .query import EntityIndex
+from .visibility import VisibilityMap
+from .connectivity import RegionConnectivity, NO_REGION
+from .placement import PlacementGrid, footprint_size
+from .snapshot import SnapshotTracker, SaveWriter, WorldSnapshot, write_save
+from .scheduler import TickScheduler
+
+if TYPE_CHECKING:
+    from .influence import InfluenceMaps
+    from .meshing import ChunkMeshBaker
+
+
+# 默认世界ID（Godot客户端使用的世界）
+DEFAULT_WORLD_ID = "default"
+
 
 class ResourceType(Enum):
     """资源类型枚举"""
@@ -38,6 +62,18 @@ class CharacterType(Enum):
     KNIGHT = "knight"
 
 
+# 可接受任务的角色及其任务类型
+WORKER_CAPABILITIES = {
+    CharacterType.GOBLIN_WORKER: (JobType.DIG, JobType.MINE, JobType.HAUL),
+    CharacterType.GOBLIN_ENGINEER: (JobType.BUILD, JobType.HAUL),
+}
+
+
+# 打包导出和属性表使用的类型ID（枚举定义顺序）
+CHARACTER_TYPE_IDS = {ct: i for i, ct in enumerate(CharacterType)}
+BUILDING_TYPE_IDS = {bt: i for i, bt in enumerate(BuildingType)}
+
+
 @dataclass
 class Vector3:
     """3D向量类"""
@@ -75,12 +111,17 @@ class BuildingData:
     is_built: bool = False
     production_rates: Dict[ResourceType, float] = None
     storage_capacity: Dict[ResourceType, int] = None
+    stored_resources: Dict[ResourceType, int] = None
+    # 建筑ID（由游戏逻辑分配，序列化后不变）
+    id: int = 0
 
     def __post_init__(self):
         if self.production_rates is None:
             self.production_rates = {}
         if self.storage_capacity is None:
             self.storage_capacity = {}
+        if self.stored_resources is None:
+            self.stored_resources = {}
 
 
 @dataclass
@@ -95,75 +136,110 @@ class CharacterData:
     defense: int = 5
     is_alive: bool = True
     current_action: str = "idle"
+    handle: int = INVALID_HANDLE
 
 
 class GameLogic:
     """游戏逻辑类 - 核心游戏逻辑实现"""
 
-    def __init__(self):
+    def __init__(self, world_id: str = DEFAULT_WORLD_ID):
+        self.world_id = world_id
         self.resources: Dict[ResourceType, ResourceData] = {}
         self.buildings: List[BuildingData] = []
-        self.characters: List[CharacterData] = []
+        self._building_ids = itertools.count(1)
+        # 角色按句柄存放，死亡后移除并复用槽位
+        self.characters: EntityPool[CharacterData] = EntityPool()
         self.game_time: float = 0.0
         self.is_initialized: bool = False
 
-        # 建筑和角色成本配置
-        self.building_costs = self._init_building_costs()
-        self.character_costs = self._init_character_costs()
-
-    def _init_building_costs(self) -> Dict[BuildingType, Dict[ResourceType, int]]:
-        """初始化建筑成本"""
-        return {
-            BuildingType.DUNGEON_HEART: {
-                ResourceType.GOLD: 0,
-                ResourceType.MANA: 0
-            },
-            BuildingType.TREASURY: {
-                ResourceType.GOLD: 200,
-                ResourceType.MANA: 50
-            },
-            BuildingType.DEMON_LAIR: {
-                ResourceType.GOLD: 300,
-                ResourceType.MANA: 100
-            },
-            BuildingType.ORC_LAIR: {
-                ResourceType.GOLD: 250,
-                ResourceType.MANA: 75
-            },
-            BuildingType.ARCANE_TOWER: {
-                ResourceType.GOLD: 400,
-                ResourceType.MANA: 150
-            },
-            BuildingType.ARROW_TOWER: {
-                ResourceType.GOLD: 150,
-                ResourceType.MANA: 25
-            }
-        }
-
-    def _init_character_costs(self) -> Dict[CharacterType, Dict[ResourceType, int]]:
-        """初始化角色成本"""
-        return {
-            CharacterType.GOBLIN_ENGINEER: {
-                ResourceType.GOLD: 150,
-                ResourceType.MANA: 50,
-                ResourceType.FOOD: 20
-            },
-            CharacterType.GOBLIN_WORKER: {
-                ResourceType.GOLD: 100,
-                ResourceType.MANA: 25,
-                ResourceType.FOOD: 15
-            },
-            CharacterType.ORC_WARRIOR: {
-                ResourceType.GOLD: 200,
-                ResourceType.MANA: 75,
-                ResourceType.FOOD: 30
-            },
-            CharacterType.IMP: {
-                ResourceType.GOLD: 80,
-                ResourceType.MANA: 30,
-                ResourceType.FOOD: 10
-            }
-        }
+        # 帧性能统计（默认关闭）
+        self.profiler = TickProfiler()
+
+        # 存储容量账本
+        self.storage = StorageLedger()
+
+        # 按类型/动作/建造状态的二级索引
+        self.index = EntityIndex()
+
+        # 工作任务板（工人动作变化同步到索引，走不到的任务不分配）
+        self.jobs = JobBoard(set_action=self.index.set_character_action,
+                             can_reach=self._can_reach)
+
+        # 角色变换打包缓冲（槽位即角色句柄的下标）
+        self.character_transforms = TransformBuffer()
+
+        # 瓦片网格和金币运输规划
+        self.tile_grid = TileGrid()
+        self.logistics = LogisticsPlanner(
+            self.tile_grid, self.storage, ResourceType.GOLD)
+
+        # 角色视野（战争迷雾），角色跨越瓦片边界时增量更新
+        self.visibility = VisibilityMap(self.tile_grid)
+
+        # 可行走区域连通性，挖掘/建墙时增量更新
+        self.connectivity = RegionConnectivity(self.tile_grid)
+        self.tile_grid.add_listener(self._on_tile_changed)
+
+        # 建筑占地和可建造瓦片（放置检查为 O(1)）
+        self.placement = PlacementGrid(self.tile_grid)
+
+        # AI影响力图（依赖NumPy，首次访问 influence 时创建）
+        self._influence: Optional['InfluenceMaps'] = None
+
+        # 静态地形区块网格烘焙（首次请求时创建，之后只烘焙瓦片变化的区块）
+        self._terrain_baker: Optional['ChunkMeshBaker'] = None
+
+        # 存档记录（写时复制快照）和后台存档
+        self.snapshots = SnapshotTracker()
+        self.saves = SaveWriter()
+
+        # 建筑和角色属性/成本表（所有实例共享，配置文件修改后自动重载）
+        self.stats: StatRegistry = get_stat_registry()
+
+        # 帧更新阶段及其读写的状态（无冲突的阶段在并行模式下同时执行）
+        self.scheduler = TickScheduler()
+        self.scheduler.add_phase("resource_generation", self._update_resource_generation,
+                                 reads=["resources", "storage"], writes=["resources", "storage"])
+        self.scheduler.add_phase("building_production", self._update_building_production,
+                                 reads=["buildings", "resources", "storage"],
+                                 writes=["resources", "storage"])
+        self.scheduler.add_phase("character_ai", self._update_character_ai,
+                                 reads=["characters", "jobs", "connectivity"],
+                                 writes=["characters", "jobs", "index"])
+        self.scheduler.add_phase("visibility", self._update_visibility,
+                                 reads=["visibility"], writes=["visibility"])
+        self.scheduler.add_phase("influence", self._update_influence,
+                                 reads=["character_transforms", "mines"], writes=["influence"])
+
+    @property
+    def influence(self) -> 'InfluenceMaps':
+        """AI影响力图（首次访问时创建并立即重建，之后按固定间隔重建）"""
+        if self._influence is None:
+            from .influence import InfluenceMaps
+            self._influence = InfluenceMaps(self.tile_grid)
+            self._rebuild_influence()
+        return self._influence
+
+    def _rebuild_influence(self):
+        """从角色打包缓冲和金矿供给重建影响力图"""
+        strength = [row[3] for row in self.stats.character_rows]
+        self._influence.rebuild(
+            self.character_transforms, strength, self.logistics.mines.values())
+
+    def _update_influence(self, delta: float):
+        """到达重建间隔时重建影响力图（未启用时不做任何事）"""
+        if self._influence is not None and self._influence.advance(delta):
+            self._rebuild_influence()
+
+    @property
+    def building_costs(self) -> Dict[BuildingType, Dict[ResourceType, int]]:
+        """建筑成本"""
+        return self.stats.building_costs
+
+    @property
+    def character_costs(self) -> Dict[CharacterType, Dict[ResourceType, int]]:
+        """角色成本"""
+        return self.stats.character_costs
 
     def initialize(self):
         """初始化游戏逻辑"""
@@ -181,13 +257,15 @@ class GameLogic:
 
     def _init_resources(self):
         """初始化资源"""
+        # 金币和魔力存放在建筑中，由地牢之心创建时入库
         self.resources = {
-            ResourceType.GOLD: ResourceData(ResourceType.GOLD, 1000),
-            ResourceType.MANA: ResourceData(ResourceType.MANA, 500),
+            ResourceType.GOLD: ResourceData(ResourceType.GOLD, 0),
+            ResourceType.MANA: ResourceData(ResourceType.MANA, 0),
             ResourceType.FOOD: ResourceData(ResourceType.FOOD, 200),
             ResourceType.RAW_GOLD: ResourceData(ResourceType.RAW_GOLD, 0),
             ResourceType.CREATURES: ResourceData(ResourceType.CREATURES, 0)
         }
+        self.storage.bind(self.resources)
         print("资源系统初始化完成")
 
     def _create_dungeon_heart(self):
@@ -195,12 +273,19 @@ class GameLogic:
         heart = BuildingData(
             type=BuildingType.DUNGEON_HEART,
             position=Vector3(0, 0, 0),
-            health=1000,
-            max_health=1000,
-            is_built=True
+            is_built=True,
+            id=next(self._building_ids)
         )
-        heart.production_rates[ResourceType.MANA] = 2.0
+        self._setup_building_properties(heart)
         self.buildings.append(heart)
+        self.index.add_building(heart)
+        self.placement.occupy(heart)
+        self.snapshots.mark_building(heart)
+        self.storage.register_building(heart)
+
+        # 初始资源存入地牢之心
+        self.storage.deposit(ResourceType.GOLD, 1000, heart.position)
+        self.storage.deposit(ResourceType.MANA, 500, heart.position)
         print("地牢之心创建完成")
 
     def update(self, delta: float):
@@ -209,15 +294,10 @@ class GameLogic:
             return
 
         self.game_time += delta
+        self.stats.poll()
 
-        # 更新资源生成
-        self._update_resource_generation(delta)
-
-        # 更新建筑生产
-        self._update_building_production(delta)
-
-        # 更新角色AI
-        self._update_character_ai(delta)
+        # 资源生成、建筑生产、角色AI、视野、影响力图（低频）
+        self.scheduler.run(delta, self.profiler if self.profiler.enabled else None)
 
     def _update_resource_generation(self, delta: float):
         """更新资源生成"""
@@ -225,7 +305,8 @@ class GameLogic:
             if resource_data.generation_rate > 0:
                 amount = int(resource_data.generation_rate * delta)
                 if amount > 0:
-                    resource_data.amount += amount
+                    # 经存储账本入库，受建筑容量和溢出策略限制
+                    self.add_resource(resource_type, amount)
 
     def _update_building_production(self, delta: float):
         """更新建筑生产"""
@@ -234,28 +315,43 @@ class GameLogic:
                 for resource_type, rate in building.production_rates.items():
                     amount = int(rate * delta)
                     if amount > 0:
-                        self.add_resource(resource_type, amount)
+                        self.add_resource(
+                            resource_type, amount, building.position)
 
     def _update_character_ai(self, delta: float):
         """更新角色AI"""
+        # 增量分配工作任务，只处理新空闲的工人和新任务
+        self.jobs.assign()
+
         for character in self.characters:
             if character.is_alive:
                 # 这里将实现角色AI逻辑
                 pass
 
+    def _update_visibility(self, delta: float):
+        """更新视野"""
+        self.visibility.update()
+
     def get_resource(self, resource_type: ResourceType) -> int:
         """获取资源数量"""
         if resource_type in self.resources:
             return self.resources[resource_type].amount
         return 0
 
-    def add_resource(self, resource_type: ResourceType, amount: int):
-        """增加资源"""
+    def add_resource(self, resource_type: ResourceType, amount: int,
+                     position: Optional[Vector3] = None) -> int:
+        """增加资源，返回实际入库数量"""
         if resource_type not in self.resources:
             self.resources[resource_type] = ResourceData(resource_type)
 
-        self.resources[resource_type].amount += amount
-        print(f"增加资源 {resource_type.value}: +{amount}")
+        if self.storage.is_limited(resource_type):
+            # 受容量限制的资源存入最近的存储建筑
+            amount = self.storage.deposit(resource_type, amount, position)
+        else:
+            self.resources[resource_type].amount += amount
+        if amount > 0:
+            print(f"增加资源 {resource_type.value}: +{amount}")
+        return amount
 
     def consume_resource(self, resource_type: ResourceType, amount: int) -> bool:
         """消耗资源"""
@@ -264,7 +360,10 @@ class GameLogic:
 
         current = self.resources[resource_type].amount
         if current >= amount:
-            self.resources[resource_type].amount -= amount
+            if self.storage.is_limited(resource_type):
+                self.storage.withdraw(resource_type, amount)
+            else:
+                self.resources[resource_type].amount -= amount
             print(f"消耗资源 {resource_type.value}: -{amount}")
             return True
         else:
@@ -292,7 +391,9 @@ class GameLogic:
         return self.get_resource(resource_type) >= amount
 
     def build_building(self, building_type: BuildingType, position: Vector3) -> bool:
-        """建造建筑"""
+        """建造建筑（占地被阻挡或资源不足时失败）"""
+        if not self.placement.can_place(building_type, position):
+            return False
         if not self.can_afford_building(building_type):
             return False
 
@@ -306,45 +407,78 @@ class GameLogic:
         building = BuildingData(
             type=building_type,
             position=position,
-            is_built=True
+            is_built=True,
+            id=next(self._building_ids)
         )
         self._setup_building_properties(building)
         self.buildings.append(building)
+        self.index.add_building(building)
+        self.placement.occupy(building)
+        self.snapshots.mark_building(building)
+        self.storage.register_building(building)
 
         print(f"建造建筑 {building_type.value} 在位置 {position}")
         return True
 
+    def damage_building(self, building: BuildingData, damage: int):
+        """建筑受到伤害"""
+        if not building.is_built or damage <= 0:
+            return
+        building.health = max(0, building.health - damage)
+        self.snapshots.mark_building(building)
+        if building.health <= 0:
+            self.destroy_building(building)
+        else:
+            self.storage.update_building_health(building)
+
+    def repair_building(self, building: BuildingData, amount: int):
+        """修复建筑"""
+        if not building.is_built or amount <= 0:
+            return
+        building.health = min(building.max_health, building.health + amount)
+        self.snapshots.mark_building(building)
+        self.storage.update_building_health(building)
+
+    def destroy_building(self, building: BuildingData):
+        """摧毁建筑"""
+        if not building.is_built:
+            return
+        building.health = 0
+        self.index.set_building_built(building, False)
+        self.snapshots.mark_building(building)
+        self.storage.unregister_building(building)
+        self.placement.release(building)
+        print(f"建筑 {building.type.value} 被摧毁")
+
+    def set_overflow_policy(self, policy: OverflowPolicy):
+        """设置存储溢出策略"""
+        self.storage.policy = policy
+
+    def get_storage_info(self, resource_type: ResourceType) -> Dict[str, Any]:
+        """获取资源存储信息（不遍历建筑列表）"""
+        return self.storage.get_storage_info(resource_type)
+
     def _setup_building_properties(self, building: BuildingData):
-        """设置建筑属性"""
-        if building.type == BuildingType.TREASURY:
-            building.health = 500
-            building.max_health = 500
-            building.storage_capacity[ResourceType.GOLD] = 10000
-        elif building.type == BuildingType.DEMON_LAIR:
-            building.health = 800
-            building.max_health = 800
-            building.production_rates[ResourceType.FOOD] = 1.0
-        elif building.type == BuildingType.ORC_LAIR:
-            building.health = 600
-            building.max_health = 600
-            building.production_rates[ResourceType.FOOD] = 0.5
-        elif building.type == BuildingType.ARCANE_TOWER:
-            building.health = 400
-            building.max_health = 400
-        elif building.type == BuildingType.ARROW_TOWER:
-            building.health = 300
-            building.max_health = 300
+        """设置建筑属性（从属性表整行拷贝）"""
+        (building.health, building.max_health, production,
+         storage) = self.stats.building_rows[BUILDING_TYPE_IDS[building.type]]
+        building.production_rates = dict(production)
+        building.storage_capacity = dict(storage)
 
     def summon_character(self, character_type: CharacterType, position: Vector3) -> bool:
         """召唤角色"""
+        return self.spawn_character(character_type, position) != INVALID_HANDLE
+
+    def spawn_character(self, character_type: CharacterType, position: Vector3) -> int:
+        """召唤角色，返回角色句柄（失败返回 INVALID_HANDLE）"""
         if not self.can_afford_character(character_type):
-            return False
+            return INVALID_HANDLE
 
         # 消耗资源
         costs = self.character_costs.get(character_type, {})
         for resource_type, amount in costs.items():
             if not self.consume_resource(resource_type, amount):
-                return False
+                return INVALID_HANDLE
 
         # 创建角色
         character = CharacterData(
@@ -352,40 +486,242 @@ class GameLogic:
             position=position
         )
         self._setup_character_properties(character)
-        self.characters.append(character)
+        character.handle = self.characters.spawn(character)
+        self.snapshots.mark_character(character.handle)
+        self.index.add_character(character)
+        self.visibility.add_unit(character.handle, *self.tile_grid.world_to_tile(position))
+        self.character_transforms.assign(
+            handle_index(character.handle), character.position, 1.0,
+            CHARACTER_TYPE_IDS[character_type])
+        if character_type in WORKER_CAPABILITIES:
+            self.jobs.add_worker(
+                character, WORKER_CAPABILITIES[character_type])
 
         # 更新生物数量
         self.add_resource(ResourceType.CREATURES, 1)
 
         print(f"召唤角色 {character_type.value} 在位置 {position}")
-        return True
+        return character.handle
+
+    def get_character(self, handle: int) -> Optional[CharacterData]:
+        """按句柄获取角色（已死亡移除或句柄过期时返回None）"""
+        return self.characters.get(handle)
+
+    def despawn_character(self, character: CharacterData):
+        """移除角色，释放句柄和打包槽位"""
+        if self.characters.despawn(character.handle) is None:
+            return
+        self.snapshots.mark_character(character.handle)
+        self.index.remove_character(character)
+        self.visibility.remove_unit(character.handle)
+        self.jobs.remove_worker(character)
+        slot = handle_index(character.handle)
+        self.character_transforms.set_health_ratio(slot, 0.0)
+        self.character_transforms.set_type_id(slot, HIDDEN_TYPE_ID)
 
     def _setup_character_properties(self, character: CharacterData):
-        """设置角色属性"""
-        if character.type == CharacterType.GOBLIN_ENGINEER:
-            character.health = 80
-            character.max_health = 80
-            character.speed = 3.0
-            character.attack_damage = 15
-            character.defense = 5
-        elif character.type == CharacterType.GOBLIN_WORKER:
-            character.health = 60
-            character.max_health = 60
-            character.speed = 2.5
-            character.attack_damage = 10
-            character.defense = 3
-        elif character.type == CharacterType.ORC_WARRIOR:
-            character.health = 120
-            character.max_health = 120
-            character.speed = 2.0
-            character.attack_damage = 25
-            character.defense = 8
-        elif character.type == CharacterType.IMP:
-            character.health = 40
-            character.max_health = 40
-            character.speed = 4.0
-            character.attack_damage = 12
-            character.defense = 2
+        """设置角色属性（从属性表整行拷贝）"""
+        (character.health, character.max_health, character.speed,
+         character.attack_damage, character.defense) = self.stats.character_rows[CHARACTER_TYPE_IDS[character.type]]
+
+    def count_characters(self, character_type: Optional[CharacterType] = None,
+                         action: Optional[str] = None) -> int:
+        """按类型/动作统计存活角色数量"""
+        return self.index.count_characters(character_type, action)
+
+    def find_characters(self, character_type: Optional[CharacterType] = None,
+                        action: Optional[str] = None) -> List[CharacterData]:
+        """按类型/动作查找存活角色"""
+        return self.index.find_characters(character_type, action)
+
+    def count_buildings(self, building_type: Optional[BuildingType] = None,
+                        built: Optional[bool] = None) -> int:
+        """按类型/建造状态统计建筑数量"""
+        return self.index.count_buildings(building_type, built)
+
+    def find_buildings(self, building_type: Optional[BuildingType] = None,
+                       built: Optional[bool] = None) -> List[BuildingData]:
+        """按类型/建造状态查找建筑"""
+        return self.index.find_buildings(building_type, built)
+
+    def post_job(self, job_type: JobType, position: Vector3, priority: int = 0,
+                 target: Optional[tuple] = None) -> int:
+        """发布工作任务"""
+        return self.jobs.post_job(job_type, position, priority, target)
+
+    def complete_job(self, job_id: int) -> bool:
+        """完成工作任务"""
+        return self.jobs.complete_job(job_id)
+
+    def get_job_assignments(self) -> List[Dict[str, Any]]:
+        """获取当前已领取的任务"""
+        assignments = []
+        for job in self.jobs.jobs.values():
+            if job.worker is None:
+                continue
+            worker = self.jobs.workers.get(job.worker)
+            handle = worker.handle if worker is not None else INVALID_HANDLE
+            assignments.append({
+                "job_id": job.id,
+                "type": job.type.value,
+                "position": {"x": job.position.x, "y": job.position.y, "z": job.position.z},
+                "priority": job.priority,
+                "worker_handle": handle,
+                "worker_index": handle_index(handle) if handle != INVALID_HANDLE else -1
+            })
+        return assignments
+
+    def set_tile(self, x: int, z: int, tile_type: TileType) -> bool:
+        """设置瓦片类型（瓦片坐标）"""
+        return self.tile_grid.set_tile(x, z, tile_type)
+
+    def set_mine_supply(self, mine_id: str, position: Vector3, amount: int):
+        """更新金矿可搬运的原金数量"""
+        self.logistics.set_mine_supply(
+            mine_id, self.tile_grid.world_to_tile(position), amount)
+
+    def plan_gold_hauls(self) -> List[Dict[str, Any]]:
+        """规划金矿到存储建筑的搬运（最小总行程）"""
+        indices = {id(b): i for i, b in enumerate(self.buildings)}
+        return [
+            {
+                "mine_id": haul.mine_id,
+                "building_index": indices.get(id(haul.building), -1),
+                "building_type": haul.building.type.value,
+                "amount": haul.amount,
+                "distance": haul.distance,
+                "trips": haul.trips
+            }
+            for haul in self.logistics.plan()
+        ]
+
+    def move_character(self, character: CharacterData, position: Vector3):
+        """移动角色"""
+        character.position = position
+        if self.characters.get(character.handle) is character:
+            self.snapshots.mark_character(character.handle)
+            self.character_transforms.set_position(handle_index(character.handle), position)
+            self.visibility.move_unit(character.handle, *self.tile_grid.world_to_tile(position))
+
+    def damage_character(self, character: CharacterData, damage: int):
+        """角色受到伤害"""
+        if not character.is_alive or damage <= 0:
+            return
+        character.health = max(0, character.health - damage)
+        if character.health <= 0:
+            # 先移除（注销工人会把动作重置为空闲），再标记死亡
+            self.despawn_character(character)
+            character.is_alive = False
+            character.current_action = "dead"
+            return
+        self.sync_character(character)
+
+    def sync_character(self, character: CharacterData):
+        """角色数据被直接修改后同步到打包缓冲"""
+        if self.characters.get(character.handle) is not character:
+            return
+        self.snapshots.mark_character(character.handle)
+        slot = handle_index(character.handle)
+        buffer = self.character_transforms
+        buffer.set_position(slot, character.position)
+        self.visibility.move_unit(character.handle, *self.tile_grid.world_to_tile(character.position))
+        if character.is_alive:
+            ratio = character.health / character.max_health if character.max_health > 0 else 0.0
+            buffer.set_health_ratio(slot, ratio)
+            buffer.set_type_id(slot, CHARACTER_TYPE_IDS[character.type])
+        else:
+            buffer.set_health_ratio(slot, 0.0)
+            buffer.set_type_id(slot, HIDDEN_TYPE_ID)
+
+    def _can_reach(self, character: CharacterData, job: Job) -> bool:
+        """工人能否走到任务位置（工人不在可行走瓦片上时不过滤，如正在挖掘中）"""
+        start = self.tile_grid.world_to_tile(character.position)
+        if self.connectivity.region_of(*start) == NO_REGION:
+            return True
+        target = self.tile_grid.world_to_tile(job.position)
+        if not self.tile_grid.in_bounds(*target):
+            return True
+        return self.connectivity.can_reach(start, target)
+
+    def _on_tile_changed(self, x: int, z: int, old: int, new: int):
+        """地形变化后，等待中的工人重新找任务"""
+        self.jobs.wake_waiting()
+
+    def are_tiles_connected(self, x1: int, z1: int, x2: int, z2: int) -> bool:
+        """两个瓦片是否在同一可行走区域"""
+        return self.connectivity.connected((x1, z1), (x2, z2))
+
+    def get_region(self, x: int, z: int) -> Dict[str, int]:
+        """瓦片所在区域编号和大小（不可行走为 -1 / 0）"""
+        return {
+            "region": self.connectivity.region_of(x, z),
+            "size": self.connectivity.region_size(x, z)
+        }
+
+    def can_place_building(self, building_type: BuildingType, position: Vector3) -> bool:
+        """建筑占地是否可放置（不检查资源）"""
+        return self.placement.can_place(building_type, position)
+
+    def get_valid_placements(self, building_type: BuildingType) -> Dict[str, Any]:
+        """整张地图的可放置掩码（按建筑位置所在瓦片索引，行优先，1为可放置）"""
+        return {
+            "width": self.tile_grid.width,
+            "height": self.tile_grid.height,
+            "size": footprint_size(building_type),
+            "version": self.placement.version,
+            "mask": self.placement.anchor_mask(building_type)
+        }
+
+    def get_dirty_terrain_chunks(self) -> Dict[str, Any]:
+        """烘焙上次以来瓦片发生变化的地形区块（首次调用时为全部区块）"""
+        if self._terrain_baker is None:
+            from .meshing import ChunkMeshBaker
+            self._terrain_baker = ChunkMeshBaker(self.tile_grid)
+        baker = self._terrain_baker
+        return {
+            "chunk_size": baker.chunk_size,
+            "chunks": {f"{cx}_{cz}": mesh.encode(baker.chunk_size)
+                       for (cx, cz), mesh in baker.bake_dirty().items()}
+        }
+
+    def get_visibility_changes(self) -> Dict[str, Any]:
+        """取出本次以来可见性变化的瓦片（Godot端只重绘这些迷雾瓦片）"""
+        indices, states = self.visibility.take_dirty_tiles()
+        return {
+            "count": len(indices),
+            "tiles": indices.tobytes(),
+            "visible": bytes(states)
+        }
+
+    def get_visibility_bits(self) -> Dict[str, Any]:
+        """完整的可见/已探索位数组（初次同步或重连时使用）"""
+        return {
+            "width": self.tile_grid.width,
+            "height": self.tile_grid.height,
+            "visible": bytes(self.visibility.visible_bits),
+            "explored": bytes(self.visibility.explored_bits)
+        }
+
+    def get_packed_characters(self, zero_copy: bool = False) -> Dict[str, Any]:
+        """导出角色位置/生命比例/类型ID打包数组"""
+        return self.character_transforms.export(zero_copy)
+
+    def set_profiling_enabled(self, enabled: bool):
+        """开关帧性能统计"""
+        self.profiler.enabled = enabled
+
+    def get_perf_metrics(self) -> Dict[str, Any]:
+        """获取帧性能统计"""
+        return self.profiler.get_metrics()
+
+    def set_tick_workers(self, workers: int):
+        """设置帧更新并行线程数（0或1为串行）"""
+        self.scheduler.set_workers(workers)
+        print(f"帧更新调度: {'并行 ' + str(workers) + ' 线程' if self.scheduler.parallel else '串行'}")
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """获取帧更新调度统计"""
+        return self.scheduler.get_statistics()
 
     def get_game_state(self) -> Dict[str, Any]:
         """获取游戏状态"""
@@ -396,36 +732,36 @@ class GameLogic:
             "characters_count": len(self.characters)
         }
 
-    def save_game(self, filename: str):
-        """保存游戏"""
-        game_data = {
-            "game_time": self.game_time,
-            "resources": {rt.value: rd.amount for rt, rd in self.resources.items()},
-            "buildings": [
-                {
-                    "type": b.type.value,
-                    "position": {"x": b.position.x, "y": b.position.y, "z": b.position.z},
-                    "health": b.health,
-                    "is_built": b.is_built
-                }
-                for b in self.buildings
-            ],
-            "characters": [
-                {
-                    "type": c.type.value,
-                    "position": {"x": c.position.x, "y": c.position.y, "z": c.position.z},
-                    "health": c.health,
-                    "is_alive": c.is_alive
-                }
-                for c in self.characters
-            ]
-        }
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(game_data, f, indent=2, ensure_ascii=False)
+    def take_snapshot(self) -> WorldSnapshot:
+        """在帧边界拍存档快照（只重算上次以来变化的记录）"""
+        return self.snapshots.take(
+            self.game_time,
+            {rt.value: rd.amount for rt, rd in self.resources.items()},
+            self.characters)
 
+    def save_game(self, filename: str):
+        """保存游戏（在调用线程上写入）"""
+        write_save(self.take_snapshot().to_save_data(), filename)
         print(f"游戏保存到: {filename}")
 
+    def save_game_async(self, filename: str) -> int:
+        """后台保存游戏: 主线程只拍快照，编码和写盘在后台线程进行，返回存档ID"""
+        snapshot = self.take_snapshot()
+        save_id = self.saves.start(snapshot, filename)
+        print(f"开始后台保存 #{save_id} 到: {filename}"
+              f"（快照 {snapshot.dirty_rows} 条变化记录，{snapshot.stall_seconds * 1000:.2f} ms）")
+        return save_id
+
+    def poll_saves(self) -> List[Dict[str, Any]]:
+        """取回已完成的后台存档"""
+        results = self.saves.poll()
+        for result in results:
+            if result["ok"]:
+                print(f"游戏保存到: {result['filename']}（后台 {result['write_ms']:.1f} ms）")
+            else:
+                print(f"保存游戏失败: {result['filename']}: {result['error']}")
+        return results
+
     def load_game(self, filename: str):
         """加载游戏"""
         try:
@@ -443,7 +779,10 @@ class GameLogic:
                     if resource_type not in self.resources:
                         self.resources[resource_type] = ResourceData(
                             resource_type)
-                    self.resources[resource_type].amount = amount
+                    if self.storage.is_limited(resource_type):
+                        self.storage.reset_amount(resource_type, amount)
+                    else:
+                        self.resources[resource_type].amount = amount
                 except ValueError:
                     print(f"未知资源类型: {rt_name}")
 
@@ -457,62 +796,177 @@ class GameLogic:
             print(f"加载游戏时发生错误: {e}")
 
 
-# 全局游戏逻辑实例
-game_logic = GameLogic()
+# 世界注册表 - 每个世界是独立的 GameLogic 实例，按ID寻址
+_worlds: Dict[str, GameLogic] = {}
+_world_counter = itertools.count(1)
+
+
+def create_world(world_id: Optional[str] = None) -> GameLogic:
+    """创建新世界（不指定ID时自动分配）"""
+    if world_id is None:
+        world_id = f"world-{next(_world_counter)}"
+        while world_id in _worlds:
+            world_id = f"world-{next(_world_counter)}"
+    elif world_id in _worlds:
+        raise ValueError(f"世界已存在: {world_id}")
+    logic = GameLogic(world_id)
+    _worlds[world_id] = logic
+    return logic
+
+
+def get_world(world_id: str = DEFAULT_WORLD_ID) -> GameLogic:
+    """按ID获取世界（默认世界在首次获取时创建）"""
+    logic = _worlds.get(world_id)
+    if logic is None:
+        if world_id != DEFAULT_WORLD_ID:
+            raise KeyError(f"未知世界: {world_id}")
+        logic = create_world(DEFAULT_WORLD_ID)
+    return logic
+
+
+def attach_world(logic: GameLogic) -> GameLogic:
+    """注册一个已有的世界实例（例如从其他进程迁移来的世界）"""
+    if logic.world_id in _worlds:
+        raise ValueError(f"世界已存在: {logic.world_id}")
+    _worlds[logic.world_id] = logic
+    return logic
+
+
+def destroy_world(world_id: str) -> bool:
+    """销毁世界（默认世界不可销毁）"""
+    if world_id == DEFAULT_WORLD_ID:
+        print("默认世界不可销毁")
+        return False
+    world = _worlds.pop(world_id, None)
+    if world is None:
+        return False
+    world.scheduler.shutdown()
+    return True
+
+
+def list_worlds() -> List[str]:
+    """列出所有世界ID"""
+    return list(_worlds)
+
 
+def __getattr__(name: str):
+    # 全局游戏逻辑实例（默认世界）延迟到首次访问时创建，导入时不加载属性表
+    if name == "game_logic":
+        return get_world(DEFAULT_WORLD_ID)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def initialize():
+
+def initialize(world_id: str = DEFAULT_WORLD_ID):
     """初始化游戏逻辑"""
-    game_logic.initialize()
+    get_world(world_id).initialize()
 
 
-def update(delta: float):
+def update(delta: float, world_id: str = DEFAULT_WORLD_ID):
     """更新游戏逻辑"""
-    game_logic.update(delta)
+    get_world(world_id).update(delta)
 
 
-def get_game_state() -> Dict[str, Any]:
+def get_game_state(world_id: str = DEFAULT_WORLD_ID) -> Dict[str, Any]:
     """获取游戏状态"""
-    return game_logic.get_game_state()
+    return get_world(world_id).get_game_state()
 
 
-def build_building(building_type: str, x: float, y: float, z: float) -> bool:
+def build_building(building_type: str, x: float, y: float, z: float,
+                   world_id: str = DEFAULT_WORLD_ID) -> bool:
     """建造建筑"""
     try:
         bt = BuildingType(building_type)
         position = Vector3(x, y, z)
-        return game_logic.build_building(bt, position)
+        return get_world(world_id).build_building(bt, position)
     except ValueError:
         print(f"未知建筑类型: {building_type}")
         return False
 
 
-def summon_character(character_type: str, x: float, y: float, z: float) -> bool:
+def summon_character(character_type: str, x: float, y: float, z: float,
+                     world_id: str = DEFAULT_WORLD_ID) -> bool:
     """召唤角色"""
     try:
         ct = CharacterType(character_type)
         position = Vector3(x, y, z)
-        return game_logic.summon_character(ct, position)
+        return get_world(world_id).summon_character(ct, position)
     except ValueError:
         print(f"未知角色类型: {character_type}")
         return False
 
 
-def get_resource(resource_type: str) -> int:
+def get_resource(resource_type: str, world_id: str = DEFAULT_WORLD_ID) -> int:
     """获取资源数量"""
     try:
         rt = ResourceType(resource_type)
-        return game_logic.get_resource(rt)
+        return get_world(world_id).get_resource(rt)
     except ValueError:
         print(f"未知资源类型: {resource_type}")
         return 0
 
 
-def save_game(filename: str):
+def get_storage_info(resource_type: str, world_id: str = DEFAULT_WORLD_ID) -> Dict[str, Any]:
+    """获取资源存储容量信息"""
+    try:
+        rt = ResourceType(resource_type)
+        return get_world(world_id).get_storage_info(rt)
+    except ValueError:
+        print(f"未知资源类型: {resource_type}")
+        return {}
+
+
+def set_overflow_policy(policy: str, world_id: str = DEFAULT_WORLD_ID) -> bool:
+    """设置存储溢出策略"""
+    try:
+        get_world(world_id).set_overflow_policy(OverflowPolicy(policy))
+        return True
+    except ValueError:
+        print(f"未知溢出策略: {policy}")
+        return False
+
+
+def post_job(job_type: str, x: float, y: float, z: float, priority: int = 0,
+             target_id: str = "", world_id: str = DEFAULT_WORLD_ID) -> int:
+    """发布工作任务，返回任务ID（失败返回0）"""
+    try:
+        jt = JobType(job_type)
+        target = (jt.value, target_id) if target_id else None
+        return get_world(world_id).post_job(jt, Vector3(x, y, z), priority, target)
+    except ValueError:
+        print(f"未知任务类型: {job_type}")
+        return 0
+
+
+def complete_job(job_id: int, world_id: str = DEFAULT_WORLD_ID) -> bool:
+    """完成工作任务"""
+    return get_world(world_id).complete_job(job_id)
+
+
+def set_tile(x: int, z: int, tile_type: int, world_id: str = DEFAULT_WORLD_ID) -> bool:
+    """设置瓦片类型"""
+    try:
+        return get_world(world_id).set_tile(x, z, TileType(tile_type))
+    except ValueError:
+        print(f"未知瓦片类型: {tile_type}")
+        return False
+
+
+def set_mine_supply(mine_id: str, x: float, y: float, z: float, amount: int,
+                    world_id: str = DEFAULT_WORLD_ID):
+    """更新金矿可搬运的原金数量"""
+    get_world(world_id).set_mine_supply(mine_id, Vector3(x, y, z), amount)
+
+
+def plan_gold_hauls(world_id: str = DEFAULT_WORLD_ID) -> List[Dict[str, Any]]:
+    """规划金币搬运"""
+    return get_world(world_id).plan_gold_hauls()
+
+
+def save_game(filename: str, world_id: str = DEFAULT_WORLD_ID):
     """保存游戏"""
-    game_logic.save_game(filename)
+    get_world(world_id).save_game(filename)
 
 
-def load_game(filename: str):
+def load_game(filename: str, world_id: str = DEFAULT_WORLD_ID):
     """加载游戏"""
-    game_logic.load_game(filename)
+    get_world(world_id).load_game(filename)
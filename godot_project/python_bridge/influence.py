@@ -0,0 +1,218 @@
+"""
+Python桥接模块 - 影响力图
+在瓦片网格上维护友军实力、英雄威胁和资源价值三层影响力，
+以固定的低频率整体重建: 向量化叠加各来源后做可分离高斯模糊，
+AI查询任意瓦片为 O(1) 数组读取。重建耗时除叠加外与单位数量无关。
+
+本模块依赖 NumPy，由 GameLogic 在首次使用影响力图时才导入。
+"""
+
+from enum import Enum
+from typing import Dict, Iterable, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .tile_grid import TileGrid, TileType
+
+if TYPE_CHECKING:
+    from .logistics import MineSupply
+    from .packed import TransformBuffer
+
+
+class InfluenceLayer(Enum):
+    """影响力图层枚举"""
+    FRIENDLY = "friendly"
+    THREAT = "threat"
+    RESOURCE = "resource"
+
+
+LAYERS: Tuple[InfluenceLayer, ...] = tuple(InfluenceLayer)
+LAYER_IDS = {layer: i for i, layer in enumerate(LAYERS)}
+
+# 重建间隔（秒）
+UPDATE_INTERVAL = 0.5
+
+# 各图层的模糊半径（瓦片），高斯 sigma 取半径的一半
+BLUR_RADIUS = {
+    InfluenceLayer.FRIENDLY: 4,
+    InfluenceLayer.THREAT: 6,
+    InfluenceLayer.RESOURCE: 5,
+}
+
+# 资源瓦片的基础价值，金矿另加剩余可搬运数量
+RESOURCE_TILE_VALUES = {
+    TileType.GOLD_MINE: 100.0,
+    TileType.MANA_CRYSTAL: 80.0,
+}
+
+
+def _gaussian_kernel(radius: int) -> np.ndarray:
+    """归一化的一维高斯核（总和为1，叠加的总量在模糊后保持不变）"""
+    if radius <= 0:
+        return np.ones(1, dtype=np.float32)
+    sigma = radius / 2.0
+    offsets = np.arange(-radius, radius + 1, dtype=np.float32)
+    kernel = np.exp(-(offsets * offsets) / (2.0 * sigma * sigma))
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def separable_blur(field: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """可分离卷积: 先沿x再沿z，各为核长度次整行/整列的向量化累加（边界外视为0）"""
+    radius = len(kernel) // 2
+    if radius == 0:
+        return field * kernel[0]
+    height, width = field.shape
+    padded = np.pad(field, ((0, 0), (radius, radius)))
+    horizontal = np.zeros_like(field)
+    for i, weight in enumerate(kernel):
+        horizontal += weight * padded[:, i:i + width]
+    padded = np.pad(horizontal, ((radius, radius), (0, 0)))
+    result = np.zeros_like(field)
+    for i, weight in enumerate(kernel):
+        result += weight * padded[i:i + height, :]
+    return result
+
+
+class InfluenceMaps:
+    """影响力图
+
+    layers[图层ID, z, x] 为 float32；墙体等不可行走瓦片的影响力为0。
+    威胁来源（英雄）由Godot端上报，友军和资源来源在重建时从游戏状态读取。
+    """
+
+    def __init__(self, grid: TileGrid, interval: float = UPDATE_INTERVAL):
+        self.grid = grid
+        self.interval = interval
+        self.layers = np.zeros((len(LAYERS), grid.height, grid.width), dtype=np.float32)
+        self._kernels = {layer: _gaussian_kernel(BLUR_RADIUS[layer]) for layer in LAYERS}
+        # 威胁来源 (世界x, 世界z, 强度)
+        self._threats = np.zeros((0, 3), dtype=np.float32)
+        self._resource_lookup = np.zeros(256, dtype=np.float32)
+        for tile_type, value in RESOURCE_TILE_VALUES.items():
+            self._resource_lookup[int(tile_type)] = value
+        self._elapsed = 0.0
+        self.version = 0
+
+    def advance(self, delta: float) -> bool:
+        """累计时间，到达重建间隔时返回True"""
+        self._elapsed += delta
+        if self._elapsed < self.interval:
+            return False
+        self._elapsed %= self.interval
+        return True
+
+    # ------------------------------------------------------------------
+    # 来源
+    # ------------------------------------------------------------------
+
+    def set_threats(self, data: bytes):
+        """设置威胁来源: float32 小端 (x, z, 强度) * N，世界坐标"""
+        threats = np.frombuffer(bytes(data), dtype='<f4')
+        if len(threats) % 3 != 0:
+            raise ValueError(f"威胁数据长度不是3的倍数: {len(threats)}")
+        self._threats = threats.reshape(-1, 3).astype(np.float32)
+
+    def _stamp(self, field: np.ndarray, world_x: np.ndarray, world_z: np.ndarray,
+               weights: np.ndarray):
+        """把世界坐标的来源按权重累加到所在瓦片（向量化，越界的来源忽略）"""
+        tx = np.floor(world_x).astype(np.int64) + self.grid.width // 2
+        tz = np.floor(world_z).astype(np.int64) + self.grid.height // 2
+        inside = (tx >= 0) & (tx < self.grid.width) & (tz >= 0) & (tz < self.grid.height)
+        np.add.at(field, (tz[inside], tx[inside]), weights[inside])
+
+    # ------------------------------------------------------------------
+    # 重建
+    # ------------------------------------------------------------------
+
+    def rebuild(self, transforms: 'TransformBuffer', strength_by_type: Sequence[float],
+                mines: Iterable['MineSupply'] = ()):
+        """重建全部图层
+
+        transforms: 角色打包缓冲，隐藏槽位（类型ID为负）不计入
+        strength_by_type: 按角色类型ID索引的满血实力
+        mines: 金矿剩余可搬运数量（瓦片坐标）
+        """
+        height, width = self.grid.height, self.grid.width
+        sources = np.zeros_like(self.layers)
+
+        # 友军实力: 类型实力 * 生命比例
+        count = transforms.count
+        if count:
+            positions = np.frombuffer(transforms.positions, dtype=np.float32, count=count * 3).reshape(-1, 3)
+            type_ids = np.frombuffer(transforms.type_ids, dtype=np.int32, count=count)
+            ratios = np.frombuffer(transforms.health_ratios, dtype=np.float32, count=count)
+            alive = type_ids >= 0
+            strength = np.asarray(strength_by_type, dtype=np.float32)[type_ids[alive]] * ratios[alive]
+            self._stamp(sources[LAYER_IDS[InfluenceLayer.FRIENDLY]],
+                        positions[alive, 0], positions[alive, 2], strength)
+
+        # 英雄威胁
+        if len(self._threats):
+            self._stamp(sources[LAYER_IDS[InfluenceLayer.THREAT]],
+                        self._threats[:, 0], self._threats[:, 1], self._threats[:, 2])
+
+        # 资源价值: 资源瓦片 + 金矿剩余数量
+        tiles = np.frombuffer(self.grid.tiles, dtype=np.uint8).reshape(height, width)
+        resource = sources[LAYER_IDS[InfluenceLayer.RESOURCE]]
+        resource += self._resource_lookup[tiles]
+        for mine in mines:
+            x, z = mine.tile
+            if 0 <= x < width and 0 <= z < height:
+                resource[z, x] += mine.amount
+
+        walkable = np.frombuffer(self.grid.walkable, dtype=np.uint8).reshape(height, width)
+        for layer in LAYERS:
+            layer_id = LAYER_IDS[layer]
+            blurred = separable_blur(sources[layer_id], self._kernels[layer])
+            np.multiply(blurred, walkable, out=self.layers[layer_id])
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def sample(self, layer: InfluenceLayer, x: int, z: int) -> float:
+        """读取瓦片的影响力（瓦片坐标，地图外为0）"""
+        if not self.grid.in_bounds(x, z):
+            return 0.0
+        return float(self.layers[LAYER_IDS[layer], z, x])
+
+    def safety(self, x: int, z: int) -> float:
+        """安全度 = 友军实力 - 英雄威胁"""
+        if not self.grid.in_bounds(x, z):
+            return 0.0
+        return float(self.layers[LAYER_IDS[InfluenceLayer.FRIENDLY], z, x]
+                     - self.layers[LAYER_IDS[InfluenceLayer.THREAT], z, x])
+
+    def best_tile(self, x: int, z: int, radius: int,
+                  weights: Dict[InfluenceLayer, float]) -> Optional[Tuple[int, int]]:
+        """在 (x, z) 周围 radius 范围内找加权影响力最高的可行走瓦片
+
+        例如撤退: {FRIENDLY: 1, THREAT: -1}；选塔位: {THREAT: 1, RESOURCE: 0.5}
+        """
+        height, width = self.grid.height, self.grid.width
+        x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+        z0, z1 = max(0, z - radius), min(height, z + radius + 1)
+        if x0 >= x1 or z0 >= z1:
+            return None
+        score = np.zeros((z1 - z0, x1 - x0), dtype=np.float32)
+        for layer, weight in weights.items():
+            score += weight * self.layers[LAYER_IDS[layer], z0:z1, x0:x1]
+        walkable = np.frombuffer(self.grid.walkable, dtype=np.uint8).reshape(height, width)
+        score[walkable[z0:z1, x0:x1] == 0] = -np.inf
+        best = int(np.argmax(score))
+        if not np.isfinite(score.flat[best]):
+            return None
+        return (x0 + best % (x1 - x0), z0 + best // (x1 - x0))
+
+    def export(self, layer: InfluenceLayer) -> bytes:
+        """导出整层 float32（行优先），可直接转换为 PackedFloat32Array"""
+        return self.layers[LAYER_IDS[layer]].tobytes()
+
+    def get_statistics(self) -> Dict[str, float]:
+        """获取影响力图统计"""
+        return {
+            "version": self.version,
+            "threat_sources": len(self._threats),
+            **{f"{layer.value}_max": float(self.layers[LAYER_IDS[layer]].max()) for layer in LAYERS}
+        }
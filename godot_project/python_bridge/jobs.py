@@ -0,0 +1,329 @@
+"""
+Python桥接模块 - 工作任务系统
+为地精苦工和地精工程师分配挖掘、采矿、搬运和建造任务
+"""
+
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game_logic import CharacterData, Vector3
+
+
+class JobType(Enum):
+    """任务类型枚举"""
+    DIG = "dig"
+    MINE = "mine"
+    HAUL = "haul"
+    BUILD = "build"
+
+
+# 空间分桶大小（瓦片）
+BUCKET_SIZE = 8
+# 就近搜索的最大分桶环数，超出后回退到优先级堆
+MAX_SEARCH_RINGS = 4
+# 每级优先级折算的距离（瓦片）
+PRIORITY_DISTANCE_WEIGHT = 10.0
+
+
+@dataclass
+class Job:
+    """任务数据类"""
+    id: int
+    type: JobType
+    position: 'Vector3'
+    priority: int = 0
+    target: Optional[Tuple] = None
+    worker: Optional[int] = None
+    seq: int = 0
+
+    @property
+    def reservation_key(self) -> Tuple:
+        """预约键 - 同一目标同一时间只允许一个工人"""
+        if self.target is not None:
+            return self.target
+        return (self.type.value, int(math.floor(self.position.x)),
+                int(math.floor(self.position.z)))
+
+
+def _set_action(character: 'CharacterData', action: str):
+    """默认的动作修改方式"""
+    character.current_action = action
+
+
+def _can_reach(character: 'CharacterData', job: Job) -> bool:
+    """默认不过滤任务"""
+    return True
+
+
+class JobBoard:
+    """任务板 - 按类型的优先级堆 + 空间分桶
+
+    工人领取任务时持有目标预约，同一金矿不会被两个工人同时占用。
+    每次tick只匹配新空闲的工人和新发布的任务，不重新扫描全部工作。
+    set_action 用于修改工人的当前动作（由游戏逻辑传入以同步查询索引）。
+    can_reach 用于过滤工人走不到的任务（由游戏逻辑传入区域连通性查询）。
+    """
+
+    def __init__(self, set_action: Optional[Callable[['CharacterData', str], None]] = None,
+                 can_reach: Optional[Callable[['CharacterData', Job], bool]] = None):
+        self._set_action = set_action or _set_action
+        self._can_reach = can_reach or _can_reach
+        self.jobs: Dict[int, Job] = {}
+        self._open: Set[int] = set()
+        self._heaps: Dict[JobType, List[Tuple[int, int, int]]] = {
+            job_type: [] for job_type in JobType}
+        self._buckets: Dict[JobType, Dict[Tuple[int, int], Set[int]]] = {
+            job_type: {} for job_type in JobType}
+        self._reservations: Dict[Tuple, int] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+
+        # 工人状态（工人键按登记顺序分配，保证分配顺序可复现）
+        self.workers: Dict[int, 'CharacterData'] = {}
+        # 角色句柄 -> 工人键（句柄序列化后不变，世界迁移后仍然有效）
+        self._worker_keys: Dict[int, int] = {}
+        self._worker_ids = itertools.count(1)
+        self._capabilities: Dict[int, Tuple[JobType, ...]] = {}
+        self._assignments: Dict[int, int] = {}
+        self._newly_idle: Set[int] = set()
+        self._waiting: Set[int] = set()
+        self._has_new_jobs = False
+        self.unreachable_skips = 0
+
+    # ------------------------------------------------------------------
+    # 任务
+    # ------------------------------------------------------------------
+
+    def post_job(self, job_type: JobType, position: 'Vector3', priority: int = 0,
+                 target: Optional[Tuple] = None) -> int:
+        """发布任务，返回任务ID"""
+        job = Job(next(self._ids), job_type, position, priority, target)
+        self.jobs[job.id] = job
+        self._open_job(job)
+        return job.id
+
+    def complete_job(self, job_id: int) -> bool:
+        """完成任务，释放预约并让工人重新空闲"""
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        self._close_job(job)
+        if job.worker is not None:
+            self._release_worker(job.worker, job)
+        return True
+
+    def cancel_job(self, job_id: int) -> bool:
+        """取消任务"""
+        return self.complete_job(job_id)
+
+    def release_job(self, job_id: int) -> bool:
+        """工人放弃任务，任务重新进入队列"""
+        job = self.jobs.get(job_id)
+        if job is None or job.worker is None:
+            return False
+        self._release_worker(job.worker, job)
+        self._open_job(job)
+        return True
+
+    def _open_job(self, job: Job):
+        """任务进入待领取状态"""
+        job.worker = None
+        job.seq = next(self._seq)
+        self._open.add(job.id)
+        heapq.heappush(self._heaps[job.type], (-job.priority, job.seq, job.id))
+        self._buckets[job.type].setdefault(
+            self._bucket_of(job.position), set()).add(job.id)
+        self._has_new_jobs = True
+
+    def _close_job(self, job: Job):
+        """任务离开待领取状态（堆中条目延迟删除）"""
+        if job.id not in self._open:
+            return
+        self._open.discard(job.id)
+        bucket_key = self._bucket_of(job.position)
+        bucket = self._buckets[job.type].get(bucket_key)
+        if bucket is not None:
+            bucket.discard(job.id)
+            if not bucket:
+                del self._buckets[job.type][bucket_key]
+
+    # ------------------------------------------------------------------
+    # 工人
+    # ------------------------------------------------------------------
+
+    def add_worker(self, character: 'CharacterData', capabilities: Tuple[JobType, ...]):
+        """登记工人"""
+        key = next(self._worker_ids)
+        self._worker_keys[character.handle] = key
+        self.workers[key] = character
+        self._capabilities[key] = capabilities
+        self._newly_idle.add(key)
+
+    def remove_worker(self, character: 'CharacterData'):
+        """注销工人（死亡等），其任务重新进入队列"""
+        key = self._worker_keys.pop(character.handle, None)
+        if key is None:
+            return
+        job_id = self._assignments.get(key)
+        if job_id is not None:
+            self.release_job(job_id)
+        self.workers.pop(key, None)
+        self._capabilities.pop(key, None)
+        self._newly_idle.discard(key)
+        self._waiting.discard(key)
+
+    def get_worker_job(self, character: 'CharacterData') -> Optional[Job]:
+        """获取工人当前任务"""
+        job_id = self._assignments.get(self._worker_keys.get(character.handle))
+        return self.jobs.get(job_id) if job_id is not None else None
+
+    def wake_waiting(self):
+        """让等待中的工人在下次分配时重新找任务（地形变化后原本走不到的任务可能可达）"""
+        if self._waiting:
+            self._has_new_jobs = True
+
+    def _release_worker(self, worker_key: int, job: Job):
+        """释放工人和目标预约"""
+        if self._reservations.get(job.reservation_key) == job.id:
+            del self._reservations[job.reservation_key]
+            # 目标解除预约后，等待中的工人可能有新任务可做
+            self._has_new_jobs = True
+        self._assignments.pop(worker_key, None)
+        job.worker = None
+        character = self.workers.get(worker_key)
+        if character is not None:
+            self._set_action(character, "idle")
+            self._newly_idle.add(worker_key)
+
+    # ------------------------------------------------------------------
+    # 分配
+    # ------------------------------------------------------------------
+
+    def assign(self) -> List[Tuple['CharacterData', Job]]:
+        """增量分配：只匹配新空闲工人，以及有新任务时仍在等待的工人"""
+        candidates = self._newly_idle
+        if self._has_new_jobs:
+            candidates = candidates | self._waiting
+            self._waiting = set()
+        self._newly_idle = set()
+        self._has_new_jobs = False
+
+        assigned = []
+        for worker_key in sorted(candidates):
+            character = self.workers.get(worker_key)
+            if character is None or not character.is_alive:
+                continue
+            job = self._find_job(character, self._capabilities[worker_key])
+            if job is None:
+                self._waiting.add(worker_key)
+                continue
+            self._claim(worker_key, character, job)
+            assigned.append((character, job))
+        return assigned
+
+    def _claim(self, worker_key: int, character: 'CharacterData', job: Job):
+        """领取任务并持有目标预约"""
+        self._close_job(job)
+        job.worker = worker_key
+        self._reservations[job.reservation_key] = job.id
+        self._assignments[worker_key] = job.id
+        self._set_action(character, job.type.value)
+
+    def _is_claimable(self, job_id: int) -> bool:
+        """任务待领取且目标未被预约"""
+        if job_id not in self._open:
+            return False
+        return self.jobs[job_id].reservation_key not in self._reservations
+
+    def _find_job(self, character: 'CharacterData',
+                  capabilities: Tuple[JobType, ...]) -> Optional[Job]:
+        """先按空间分桶就近搜索，附近没有任务时回退到优先级堆顶"""
+        origin = self._bucket_of(character.position)
+        best: Optional[Job] = None
+        best_score = math.inf
+        found_ring = -1
+
+        for ring in range(MAX_SEARCH_RINGS + 1):
+            for bucket_key in self._ring(origin, ring):
+                for job_type in capabilities:
+                    for job_id in self._buckets[job_type].get(bucket_key, ()):
+                        if not self._is_claimable(job_id):
+                            continue
+                        job = self.jobs[job_id]
+                        if not self._can_reach(character, job):
+                            self.unreachable_skips += 1
+                            continue
+                        score = (character.position.distance_to(job.position)
+                                 - job.priority * PRIORITY_DISTANCE_WEIGHT)
+                        if score < best_score:
+                            best, best_score = job, score
+            # 找到候选后再多看一环，避免分桶边界造成的偏差
+            if best is not None:
+                if found_ring < 0:
+                    found_ring = ring
+                elif ring > found_ring:
+                    return best
+
+        if best is not None:
+            return best
+        return self._pop_top(character, capabilities)
+
+    def _pop_top(self, character: 'CharacterData',
+                 capabilities: Tuple[JobType, ...]) -> Optional[Job]:
+        """在可做且走得到的任务类型中取优先级最高的任务"""
+        best: Optional[Job] = None
+        best_entry = None
+        for job_type in capabilities:
+            heap = self._heaps[job_type]
+            # 清理已失效的堆顶条目
+            while heap and (heap[0][2] not in self._open
+                            or self.jobs[heap[0][2]].seq != heap[0][1]):
+                heapq.heappop(heap)
+            skipped = []
+            while heap and not (self._is_claimable(heap[0][2])
+                                and self._can_reach(character, self.jobs[heap[0][2]])):
+                skipped.append(heapq.heappop(heap))
+            if heap and (best_entry is None or heap[0] < best_entry):
+                best_entry = heap[0]
+                best = self.jobs[heap[0][2]]
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+        return best
+
+    @staticmethod
+    def _bucket_of(position: 'Vector3') -> Tuple[int, int]:
+        """位置所在的空间分桶"""
+        return (int(math.floor(position.x / BUCKET_SIZE)),
+                int(math.floor(position.z / BUCKET_SIZE)))
+
+    @staticmethod
+    def _ring(origin: Tuple[int, int], ring: int):
+        """以origin为中心第ring环的分桶"""
+        ox, oz = origin
+        if ring == 0:
+            yield origin
+            return
+        for dx in range(-ring, ring + 1):
+            yield (ox + dx, oz - ring)
+            yield (ox + dx, oz + ring)
+        for dz in range(-ring + 1, ring):
+            yield (ox - ring, oz + dz)
+            yield (ox + ring, oz + dz)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取任务统计"""
+        open_counts = {job_type.value: 0 for job_type in JobType}
+        for job_id in self._open:
+            open_counts[self.jobs[job_id].type.value] += 1
+        return {
+            "open_jobs": open_counts,
+            "claimed_jobs": len(self._assignments),
+            "workers": len(self.workers),
+            "waiting_workers": len(self._waiting),
+            "unreachable_skips": self.unreachable_skips
+        }
@@ -0,0 +1,221 @@
+"""
+Python桥接模块 - 金矿运输规划
+以金矿为供给、存储建筑剩余容量为需求，用最小费用流规划搬运
+"""
+
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
+
+from .tile_grid import TileGrid, UNREACHABLE
+
+if TYPE_CHECKING:
+    from .game_logic import BuildingData, ResourceType
+    from .storage import StorageLedger
+
+
+# 地精苦工单次携带金币上限（见 docs/MINING_SYSTEM.md）
+CARRY_CAPACITY = 60
+
+
+@dataclass
+class MineSupply:
+    """金矿供给数据类"""
+    mine_id: str
+    tile: Tuple[int, int]
+    amount: int
+
+
+@dataclass
+class HaulAssignment:
+    """搬运分配数据类"""
+    mine_id: str
+    building: 'BuildingData'
+    amount: int
+    distance: int
+    trips: int
+
+
+class MinCostFlow:
+    """最小费用流 - 逐次最短路 + Dijkstra势函数"""
+
+    def __init__(self, node_count: int):
+        self.node_count = node_count
+        # 边: [目标, 容量, 费用, 反向边下标]
+        self.graph: List[List[List[int]]] = [[] for _ in range(node_count)]
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: int) -> Tuple[int, int]:
+        """添加边，返回 (起点, 边下标) 用于读取流量"""
+        self.graph[u].append([v, capacity, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1
+
+    def flow_on(self, edge: Tuple[int, int]) -> int:
+        """读取边上的流量（反向边的剩余容量）"""
+        u, i = edge
+        v, _, _, rev = self.graph[u][i]
+        return self.graph[v][rev][1]
+
+    def solve(self, source: int, sink: int) -> Tuple[int, int]:
+        """求最大流下的最小费用，返回 (总流量, 总费用)"""
+        n = self.node_count
+        potential = [0] * n
+        total_flow = 0
+        total_cost = 0
+
+        while True:
+            dist = [math.inf] * n
+            prev: List[Optional[Tuple[int, int]]] = [None] * n
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for i, (v, capacity, cost, _) in enumerate(self.graph[u]):
+                    if capacity <= 0:
+                        continue
+                    nd = d + cost + potential[u] - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, i)
+                        heapq.heappush(heap, (nd, v))
+
+            if dist[sink] == math.inf:
+                break
+            for v in range(n):
+                if dist[v] < math.inf:
+                    potential[v] += dist[v]
+
+            # 沿最短路找瓶颈容量
+            push = math.inf
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                push = min(push, self.graph[u][i][1])
+                v = u
+
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                edge = self.graph[u][i]
+                edge[1] -= push
+                self.graph[v][edge[3]][1] += push
+                total_cost += push * edge[2]
+                v = u
+            total_flow += push
+
+        return total_flow, total_cost
+
+
+class LogisticsPlanner:
+    """运输规划器 - 最小化搬运总行程
+
+    到各存储建筑的距离场按建筑缓存，地图版本不变时复用；
+    供给、容量和地图均未变化时直接返回上一次的规划结果。
+    """
+
+    def __init__(self, grid: TileGrid, storage: 'StorageLedger',
+                 resource_type: 'ResourceType', carry_capacity: int = CARRY_CAPACITY):
+        self.grid = grid
+        self.storage = storage
+        self.resource_type = resource_type
+        self.carry_capacity = carry_capacity
+        self.mines: Dict[str, MineSupply] = {}
+        self.assignments: List[HaulAssignment] = []
+        self.total_cost = 0
+        self._dirty = True
+        self._signature: Optional[Tuple] = None
+        # 建筑id -> (地图版本, 建筑瓦片, 距离场)
+        self._distance_cache: Dict[int, Tuple[int, Tuple[int, int], Any]] = {}
+
+    def set_mine_supply(self, mine_id: str, tile: Tuple[int, int], amount: int):
+        """更新金矿可搬运的数量，数量为0时移除"""
+        if amount <= 0:
+            self.remove_mine(mine_id)
+            return
+        mine = self.mines.get(mine_id)
+        if mine is not None and mine.tile == tile and mine.amount == amount:
+            return
+        self.mines[mine_id] = MineSupply(mine_id, tile, amount)
+        self._dirty = True
+
+    def remove_mine(self, mine_id: str):
+        """移除金矿"""
+        if self.mines.pop(mine_id, None) is not None:
+            self._dirty = True
+
+    def plan(self) -> List[HaulAssignment]:
+        """规划搬运，输入未变化时复用上次结果"""
+        sinks = [(b, self.storage.get_building_free_capacity(b, self.resource_type))
+                 for b in self.storage.get_storages(self.resource_type)]
+        sinks = [(b, free) for b, free in sinks if free > 0]
+        signature = (self.grid.version,
+                     tuple((id(b), free) for b, free in sinks))
+        if not self._dirty and signature == self._signature:
+            return self.assignments
+
+        self._dirty = False
+        self._signature = signature
+        self._solve(sinks)
+        return self.assignments
+
+    def _distance_field(self, building: 'BuildingData'):
+        """获取到建筑的距离场（带缓存）"""
+        tile = self.grid.world_to_tile(building.position)
+        cached = self._distance_cache.get(id(building))
+        if cached is not None and cached[0] == self.grid.version and cached[1] == tile:
+            return cached[2]
+        field = self.grid.distance_field([tile])
+        self._distance_cache[id(building)] = (self.grid.version, tile, field)
+        return field
+
+    def _solve(self, sinks: List[Tuple['BuildingData', int]]):
+        """构建供需图并求解最小费用流"""
+        mines = list(self.mines.values())
+        live = {id(b) for b, _ in sinks}
+        for key in list(self._distance_cache):
+            if key not in live:
+                del self._distance_cache[key]
+
+        # 节点: 0=源点, 1..M=金矿, M+1..M+K=存储建筑, M+K+1=汇点
+        source = 0
+        sink = len(mines) + len(sinks) + 1
+        flow = MinCostFlow(sink + 1)
+        routes = []
+        for j, (building, free) in enumerate(sinks):
+            flow.add_edge(len(mines) + 1 + j, sink, free, 0)
+            field = self._distance_field(building)
+            for i, mine in enumerate(mines):
+                x, z = mine.tile
+                if not self.grid.in_bounds(x, z):
+                    continue
+                distance = field[self.grid.index(x, z)]
+                if distance == UNREACHABLE:
+                    continue
+                edge = flow.add_edge(i + 1, len(mines) + 1 + j,
+                                     mine.amount, distance)
+                routes.append((edge, mine, building, distance))
+        for i, mine in enumerate(mines):
+            flow.add_edge(source, i + 1, mine.amount, 0)
+
+        _, self.total_cost = flow.solve(source, sink)
+
+        self.assignments = []
+        for edge, mine, building, distance in routes:
+            amount = flow.flow_on(edge)
+            if amount > 0:
+                trips = (amount + self.carry_capacity - 1) // self.carry_capacity
+                self.assignments.append(
+                    HaulAssignment(mine.mine_id, building, amount, distance, trips))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取规划统计"""
+        return {
+            "mines": len(self.mines),
+            "total_supply": sum(m.amount for m in self.mines.values()),
+            "planned_amount": sum(a.amount for a in self.assignments),
+            "total_trips": sum(a.trips for a in self.assignments),
+            "total_cost": self.total_cost
+        }
@@ -0,0 +1,418 @@
+"""
+Python桥接模块 - 多世界对局托管
+将多个互相独立的无界面世界分片到多个工作进程中并行推进，
+每个世界按固定步长推进并有单步耗时预算，调度器按负载在分片间均衡世界
+
+用法: python -m python_bridge.match_host --worlds 24 --workers 4 --seconds 60
+迁移自检: python -m python_bridge.match_host --check-migration
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bridge import GodotBridge
+
+
+# 世界固定步长（秒）
+DEFAULT_TICK_DELTA = 1.0 / 30.0
+# 每次推进单个世界的耗时预算（毫秒），超出后剩余时间留到下一步追帧
+DEFAULT_TICK_BUDGET_MS = 8.0
+# 负载平滑系数（指数移动平均）
+LOAD_SMOOTHING = 0.2
+# 最重分片负载超过平均值的该倍数时迁移世界
+REBALANCE_THRESHOLD = 1.25
+# 平均分片负载低于该值（毫秒/步）时不迁移，避免计时噪声引起来回迁移
+MIN_REBALANCE_LOAD_MS = 1.0
+# 浮点累积误差容忍
+_EPSILON = 1e-9
+
+
+# ---------------- 工作进程端 ----------------
+
+@dataclass
+class _ShardWorld:
+    """工作进程内的世界"""
+    bridge: 'GodotBridge'
+    tick_delta: float
+    budget_ns: int
+    backlog: float = 0.0
+
+
+# 当前工作进程托管的世界
+_shard_worlds: Dict[str, _ShardWorld] = {}
+
+
+def _shard_init(quiet: bool):
+    """工作进程初始化"""
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+
+
+def _shard_create(world_id: str, tick_delta: float, budget_ms: float) -> bool:
+    """在工作进程中创建并初始化世界"""
+    from .bridge import GodotBridge
+    from .sim_host import MODE_IN_PROCESS
+
+    bridge = GodotBridge(mode=MODE_IN_PROCESS, world_id=world_id)
+    bridge.initialize()
+    _shard_worlds[world_id] = _ShardWorld(bridge, tick_delta, int(budget_ms * 1e6))
+    return True
+
+
+def _shard_destroy(world_id: str) -> bool:
+    """销毁工作进程中的世界"""
+    from .game_logic import destroy_world
+
+    if _shard_worlds.pop(world_id, None) is None:
+        return False
+    return destroy_world(world_id)
+
+
+def _shard_step(batches: Dict[str, Tuple[float, List[Dict[str, Any]]]]) -> Dict[str, Dict[str, Any]]:
+    """推进工作进程中的世界
+
+    每个世界先处理排队的命令，再按固定步长推进，
+    超出耗时预算时停止，未推进的时间计入积压留到下一步。
+    """
+    reports = {}
+    for world_id, (delta, commands) in batches.items():
+        world = _shard_worlds.get(world_id)
+        if world is None:
+            continue
+        bridge = world.bridge
+        results = [bridge.process_input(command) for command in commands]
+
+        world.backlog += delta
+        start = time.perf_counter_ns()
+        deadline = start + world.budget_ns
+        ticks = 0
+        while world.backlog + _EPSILON >= world.tick_delta:
+            if ticks and time.perf_counter_ns() >= deadline:
+                break
+            bridge.update_game(world.tick_delta)
+            world.backlog -= world.tick_delta
+            ticks += 1
+        elapsed_ns = time.perf_counter_ns() - start
+
+        reports[world_id] = {
+            "ticks": ticks,
+            "elapsed_ms": elapsed_ns * 1e-6,
+            "backlog": world.backlog,
+            "over_budget": world.backlog + _EPSILON >= world.tick_delta,
+            "game_time": bridge.logic.game_time,
+            "results": results
+        }
+    return reports
+
+
+def _shard_call(world_id: str, method: str, args: tuple, kwargs: dict) -> Any:
+    """调用世界桥接的方法"""
+    return getattr(_shard_worlds[world_id].bridge, method)(*args, **kwargs)
+
+
+def _shard_export(world_id: str) -> bytes:
+    """导出世界（迁移用），导出后从本进程移除"""
+    from .game_logic import destroy_world
+
+    world = _shard_worlds.pop(world_id)
+    blob = pickle.dumps((world.bridge.logic, world.tick_delta, world.budget_ns, world.backlog),
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    destroy_world(world_id)
+    return blob
+
+
+def _shard_import(blob: bytes) -> bool:
+    """导入迁移来的世界"""
+    from .bridge import GodotBridge
+    from .game_logic import attach_world
+    from .sim_host import MODE_IN_PROCESS
+
+    logic, tick_delta, budget_ns, backlog = pickle.loads(blob)
+    attach_world(logic)
+    bridge = GodotBridge(mode=MODE_IN_PROCESS, world_id=logic.world_id)
+    bridge.is_initialized = logic.is_initialized
+    _shard_worlds[logic.world_id] = _ShardWorld(bridge, tick_delta, budget_ns, backlog)
+    return True
+
+
+def check_migration() -> List[str]:
+    """迁移自检: 在本进程内导出再导入一个世界，检查账本和任务板在迁移后仍可用
+
+    返回发现的问题（空列表表示通过）
+    """
+    from .game_logic import BuildingType, ResourceType, get_world
+
+    world_id = "migration-check"
+    _shard_create(world_id, DEFAULT_TICK_DELTA, DEFAULT_TICK_BUDGET_MS)
+    bridge = _shard_worlds[world_id].bridge
+    bridge.process_input({"type": "build_building", "building_type": "treasury", "x": 4.0, "z": 4.0})
+    bridge.process_input({"type": "summon_character",
+                          "character_type": "goblin_worker", "x": 2.0, "z": 2.0})
+    _shard_import(_shard_export(world_id))
+
+    logic = get_world(world_id)
+    problems = []
+    try:
+        gold = ResourceType.GOLD
+        treasury = next(b for b in logic.buildings if b.type == BuildingType.TREASURY)
+        before = logic.get_resource(gold)
+        accepted = logic.storage.deposit(gold, 100, treasury.position)
+        if accepted != 100 or logic.get_resource(gold) != before + 100:
+            problems.append(f"迁移后存入资源失败: 入库 {accepted}")
+
+        workers = list(logic.jobs.workers.values())
+        if len(workers) != 1:
+            problems.append(f"迁移后工人数量错误: {len(workers)}")
+        for worker in workers:
+            logic.despawn_character(worker)
+        if logic.jobs.workers:
+            problems.append("迁移后移除的工人仍在任务板上")
+
+        capacity = logic.storage.get_capacity(gold)
+        logic.destroy_building(treasury)
+        if logic.storage.get_capacity(gold) >= capacity:
+            problems.append("迁移后摧毁的存储建筑未释放容量")
+    except Exception as e:
+        problems.append(f"迁移后出错: {e!r}")
+    finally:
+        _shard_destroy(world_id)
+    return problems
+
+
+# ---------------- 主进程端 ----------------
+
+@dataclass
+class WorldInfo:
+    """托管世界的调度信息"""
+    world_id: str
+    shard: int
+    tick_delta: float
+    tick_budget_ms: float
+    load_ms: float = 0.0
+    ticks: int = 0
+    game_time: float = 0.0
+    backlog: float = 0.0
+    overruns: int = 0
+    migrations: int = 0
+    pending: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class MatchHost:
+    """多世界对局托管
+
+    每个分片是一个单工作进程的 ProcessPoolExecutor，世界常驻在所属分片的进程中，
+    每步所有分片并行推进。新世界放到负载最低的分片，负载失衡时把世界
+    序列化迁移到最空闲的分片。
+    """
+
+    def __init__(self, workers: Optional[int] = None, quiet: bool = True):
+        self.worker_count = max(1, workers or os.cpu_count() or 1)
+        self.quiet = quiet
+        self.shards: List[ProcessPoolExecutor] = []
+        self.worlds: Dict[str, WorldInfo] = {}
+        self.steps = 0
+        self.total_migrations = 0
+        self._world_counter = itertools.count(1)
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self.shards)
+
+    def start(self):
+        """启动工作进程"""
+        if self.shards:
+            return
+        context = multiprocessing.get_context("spawn")
+        self.shards = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                initializer=_shard_init, initargs=(self.quiet,))
+            for _ in range(self.worker_count)
+        ]
+        print(f"对局托管启动: {self.worker_count} 个工作进程")
+
+    def stop(self):
+        """停止所有工作进程"""
+        for shard in self.shards:
+            shard.shutdown(wait=True, cancel_futures=True)
+        self.shards = []
+        self.worlds = {}
+        print("对局托管已停止")
+
+    def _shard_loads(self) -> List[float]:
+        """各分片负载（世界负载之和，毫秒/步）"""
+        loads = [0.0] * len(self.shards)
+        for info in self.worlds.values():
+            loads[info.shard] += info.load_ms
+        return loads
+
+    def _pick_shard(self) -> int:
+        """选择负载最低的分片（负载相同时选世界最少的）"""
+        counts = [0] * len(self.shards)
+        for info in self.worlds.values():
+            counts[info.shard] += 1
+        loads = self._shard_loads()
+        return min(range(len(self.shards)), key=lambda i: (loads[i], counts[i], i))
+
+    def create_world(self, world_id: Optional[str] = None,
+                     tick_delta: float = DEFAULT_TICK_DELTA,
+                     tick_budget_ms: float = DEFAULT_TICK_BUDGET_MS) -> str:
+        """创建世界，返回世界ID"""
+        if not self.shards:
+            self.start()
+        if world_id is None:
+            world_id = f"match-{next(self._world_counter)}"
+        if world_id in self.worlds:
+            raise ValueError(f"世界已存在: {world_id}")
+        shard = self._pick_shard()
+        self.shards[shard].submit(_shard_create, world_id, tick_delta, tick_budget_ms).result()
+        # 新世界的负载先取已有世界的平均值，避免连续分配到同一分片
+        peers = [info.load_ms for info in self.worlds.values()]
+        self.worlds[world_id] = WorldInfo(
+            world_id, shard, tick_delta, tick_budget_ms,
+            load_ms=sum(peers) / len(peers) if peers else 0.0)
+        return world_id
+
+    def destroy_world(self, world_id: str) -> bool:
+        """销毁世界"""
+        info = self.worlds.pop(world_id, None)
+        if info is None:
+            return False
+        return self.shards[info.shard].submit(_shard_destroy, world_id).result()
+
+    def submit(self, world_id: str, input_data: Dict[str, Any]):
+        """排队一条输入命令，在下一步推进前执行"""
+        self.worlds[world_id].pending.append(input_data)
+
+    def step(self, delta: float) -> Dict[str, Dict[str, Any]]:
+        """所有世界推进 delta 秒，返回每个世界的推进报告"""
+        batches: List[Dict[str, Tuple[float, List[Dict[str, Any]]]]] = [{} for _ in self.shards]
+        for info in self.worlds.values():
+            batches[info.shard][info.world_id] = (delta, info.pending)
+            info.pending = []
+
+        futures = [shard.submit(_shard_step, batch)
+                   for shard, batch in zip(self.shards, batches) if batch]
+        reports: Dict[str, Dict[str, Any]] = {}
+        for future in futures:
+            reports.update(future.result())
+
+        for world_id, report in reports.items():
+            info = self.worlds[world_id]
+            info.load_ms += LOAD_SMOOTHING * (report["elapsed_ms"] - info.load_ms)
+            info.ticks += report["ticks"]
+            info.game_time = report["game_time"]
+            info.backlog = report["backlog"]
+            if report["over_budget"]:
+                info.overruns += 1
+
+        self.steps += 1
+        self.rebalance()
+        return reports
+
+    def rebalance(self) -> bool:
+        """负载失衡时把一个世界从最重分片迁移到最轻分片"""
+        if len(self.shards) < 2 or not self.worlds:
+            return False
+        loads = self._shard_loads()
+        average = sum(loads) / len(loads)
+        heaviest = max(range(len(loads)), key=loads.__getitem__)
+        lightest = min(range(len(loads)), key=loads.__getitem__)
+        if average < MIN_REBALANCE_LOAD_MS or loads[heaviest] <= average * REBALANCE_THRESHOLD:
+            return False
+
+        # 只迁移能让最重分片变轻、且不会让目标分片变成新的最重分片的世界
+        gap = loads[heaviest] - loads[lightest]
+        candidates = [info for info in self.worlds.values()
+                      if info.shard == heaviest and 0 < info.load_ms < gap]
+        if not candidates:
+            return False
+        info = min(candidates, key=lambda c: abs(gap / 2 - c.load_ms))
+
+        blob = self.shards[heaviest].submit(_shard_export, info.world_id).result()
+        self.shards[lightest].submit(_shard_import, blob).result()
+        info.shard = lightest
+        info.migrations += 1
+        self.total_migrations += 1
+        return True
+
+    def call(self, world_id: str, method: str, *args, **kwargs) -> Any:
+        """调用指定世界桥接的方法（如 get_game_statistics、build_state_snapshot）"""
+        info = self.worlds[world_id]
+        return self.shards[info.shard].submit(_shard_call, world_id, method, args, kwargs).result()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取托管统计"""
+        loads = self._shard_loads()
+        return {
+            "workers": len(self.shards),
+            "worlds": len(self.worlds),
+            "steps": self.steps,
+            "migrations": self.total_migrations,
+            "shard_loads_ms": loads,
+            "shard_worlds": [sum(1 for info in self.worlds.values() if info.shard == i)
+                             for i in range(len(self.shards))],
+            "total_ticks": sum(info.ticks for info in self.worlds.values()),
+            "overruns": sum(info.overruns for info in self.worlds.values()),
+            "lagging_worlds": [info.world_id for info in self.worlds.values()
+                               if info.backlog + _EPSILON >= info.tick_delta]
+        }
+
+
+def main(argv=None) -> int:
+    """命令行入口 - 并行运行多个无界面对局并报告吞吐量"""
+    parser = argparse.ArgumentParser(description="并行运行多个无界面对局")
+    parser.add_argument("--worlds", type=int, default=8, help="世界数量")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数量")
+    parser.add_argument("--seconds", type=float, default=60.0, help="每个世界模拟的游戏时长")
+    parser.add_argument("--step", type=float, default=0.5, help="每步推进的游戏时间")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_TICK_BUDGET_MS,
+                        help="单个世界每步的耗时预算")
+    parser.add_argument("--check-migration", action="store_true",
+                        help="只运行世界迁移自检（序列化往返后存取资源、移除工人）")
+    args = parser.parse_args(argv)
+
+    if args.check_migration:
+        problems = check_migration()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print("✅ 世界迁移后状态正常")
+        return 0
+
+    host = MatchHost(workers=args.workers)
+    host.start()
+    try:
+        for _ in range(args.worlds):
+            world_id = host.create_world(tick_budget_ms=args.budget_ms)
+            host.submit(world_id, {"type": "summon_character",
+                                   "character_type": "goblin_worker", "x": 2.0, "z": 2.0})
+
+        wall_start = time.perf_counter()
+        simulated = 0.0
+        while simulated < args.seconds:
+            host.step(args.step)
+            simulated += args.step
+        elapsed = time.perf_counter() - wall_start
+
+        stats = host.get_statistics()
+        for key, value in stats.items():
+            print(f"{key}: {value}")
+        print(f"wall_s: {elapsed:.3f}")
+        print(f"ticks_per_second: {stats['total_ticks'] / elapsed:.0f}")
+    finally:
+        host.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""
+Python桥接模块 - 静态地形网格烘焙
+把瓦片数组按区块（默认16x16）烘焙为合并后的网格: 同一区块内同材质的共面面片
+用贪心算法合并为尽量大的矩形（顶面二维合并，侧面沿扫描线合并），被遮挡的侧面不输出。
+每个区块写出一个紧凑的二进制网格文件（顶点/法线/UV/索引缓冲），
+Godot端可直接读入 PackedFloat32Array 并用 ArrayMesh.add_surface_from_arrays 创建网格。
+
+瓦片几何与 TileMeshFactory.gd 一致: 墙体/金矿/未挖掘为 1.0 高的方块，
+可行走地面为 0.05 厚的地板，其他瓦片（建筑、水晶、地牢之心等）仍由运行时渲染器负责。
+顶点坐标为瓦片坐标（瓦片 (x, z) 覆盖 [x, x+1] x [z, z+1]）。
+
+区块内容（含一圈相邻瓦片）哈希未变化的区块跳过烘焙；运行时登记为网格监听者后，
+瓦片变化只标记所在区块（位于区块边缘时连同相邻区块）需要重新烘焙。
+
+用法: python -m python_bridge.meshing tiles.bin --width 200 --height 200 --out meshes/ [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+
+from .tile_grid import TileGrid, TileType, WALKABLE_TILES
+
+
+MESH_MAGIC = b"MMCH"
+MESH_VERSION = 1
+MANIFEST_FILE = "chunks.json"
+
+# 区块边长（瓦片）
+CHUNK_SIZE = 16
+
+# 瓦片高度
+WALL_HEIGHT = 1.0
+FLOOR_HEIGHT = 0.05
+
+# 全高方块（TileMeshFactory._is_full_fill_type）
+FULL_TILES = frozenset([TileType.STONE_WALL, TileType.GOLD_MINE, TileType.UNEXCAVATED])
+# 薄地板（可行走地面，地牢之心由专门的对象渲染）
+FLOOR_TILES = WALKABLE_TILES - frozenset([TileType.DUNGEON_HEART])
+
+_HEIGHTS = tuple(WALL_HEIGHT if t in FULL_TILES else FLOOR_HEIGHT if t in FLOOR_TILES else 0.0
+                 for t in range(256))
+
+_HEADER = struct.Struct("<4sHHhhH")   # 魔数, 版本, 区块边长, 区块x, 区块z, 表面数
+_SURFACE = struct.Struct("<HII")      # 材质（瓦片类型）, 顶点数, 索引数
+
+# 侧面方向: (法线x, 法线z)
+_SIDES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+@dataclass
+class MeshSurface:
+    """单一材质的网格表面"""
+    material: int
+    positions: array = field(default_factory=lambda: array('f'))
+    normals: array = field(default_factory=lambda: array('f'))
+    uvs: array = field(default_factory=lambda: array('f'))
+    indices: array = field(default_factory=lambda: array('I'))
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.positions) // 3
+
+    def add_quad(self, origin: Tuple[float, float, float], u: Tuple[float, float, float],
+                 v: Tuple[float, float, float], normal: Tuple[float, float, float],
+                 uv_size: Tuple[float, float]):
+        """添加矩形面片: origin + s*u + t*v，正面朝向 normal（Godot 顺时针为正面）"""
+        cross = (u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0])
+        if cross[0] * normal[0] + cross[1] * normal[1] + cross[2] * normal[2] > 0:
+            u, v = v, u
+            uv_size = (uv_size[1], uv_size[0])
+        base = self.vertex_count
+        ox, oy, oz = origin
+        for s, t in ((0, 0), (1, 0), (1, 1), (0, 1)):
+            self.positions.extend((ox + s * u[0] + t * v[0],
+                                   oy + s * u[1] + t * v[1],
+                                   oz + s * u[2] + t * v[2]))
+            self.normals.extend(normal)
+            # UV按瓦片重复（材质贴图每瓦片一份）
+            self.uvs.extend((s * uv_size[0], t * uv_size[1]))
+        self.indices.extend((base, base + 1, base + 2, base, base + 2, base + 3))
+
+
+@dataclass
+class ChunkMesh:
+    """区块网格"""
+    cx: int
+    cz: int
+    surfaces: Dict[int, MeshSurface] = field(default_factory=dict)
+
+    def surface(self, material: int) -> MeshSurface:
+        surface = self.surfaces.get(material)
+        if surface is None:
+            surface = self.surfaces[material] = MeshSurface(material)
+        return surface
+
+    @property
+    def triangle_count(self) -> int:
+        return sum(len(s.indices) // 3 for s in self.surfaces.values())
+
+    def encode(self, chunk_size: int) -> bytes:
+        """编码为二进制: 头部 + 每个表面 (头部, 位置, 法线, UV, 索引)
+
+        顶点数不超过65535时索引为 uint16，否则为 uint32。
+        """
+        parts = [_HEADER.pack(MESH_MAGIC, MESH_VERSION, chunk_size, self.cx, self.cz,
+                              len(self.surfaces))]
+        for material in sorted(self.surfaces):
+            surface = self.surfaces[material]
+            parts.append(_SURFACE.pack(material, surface.vertex_count, len(surface.indices)))
+            parts.append(surface.positions.tobytes())
+            parts.append(surface.normals.tobytes())
+            parts.append(surface.uvs.tobytes())
+            index_type = 'H' if surface.vertex_count <= 0xFFFF else 'I'
+            parts.append(array(index_type, surface.indices).tobytes())
+        return b"".join(parts)
+
+
+def _greedy_rects(cells: List[int], width: int, height: int) -> Iterator[Tuple[int, int, int, int, int]]:
+    """二维贪心合并: cells 为行优先的材质（-1为空），产出 (x, z, 宽, 高, 材质)"""
+    used = bytearray(width * height)
+    for z in range(height):
+        for x in range(width):
+            i = z * width + x
+            material = cells[i]
+            if material < 0 or used[i]:
+                continue
+            w = 1
+            while x + w < width and cells[i + w] == material and not used[i + w]:
+                w += 1
+            h = 1
+            while z + h < height:
+                row = (z + h) * width + x
+                if any(cells[row + k] != material or used[row + k] for k in range(w)):
+                    break
+                h += 1
+            for dz in range(h):
+                row = (z + dz) * width + x
+                used[row:row + w] = b"\x01" * w
+            yield x, z, w, h, material
+
+
+class ChunkMeshBaker:
+    """区块网格烘焙器"""
+
+    def __init__(self, grid: TileGrid, chunk_size: int = CHUNK_SIZE):
+        self.grid = grid
+        self.chunk_size = chunk_size
+        self.chunks_x = (grid.width + chunk_size - 1) // chunk_size
+        self.chunks_z = (grid.height + chunk_size - 1) // chunk_size
+        self.dirty: Set[Tuple[int, int]] = set(self.all_chunks())
+        grid.add_listener(self._on_tile_changed)
+
+    def all_chunks(self) -> Iterator[Tuple[int, int]]:
+        for cz in range(self.chunks_z):
+            for cx in range(self.chunks_x):
+                yield (cx, cz)
+
+    def _on_tile_changed(self, x: int, z: int, old: int, new: int):
+        """标记需要重新烘焙的区块（侧面取决于相邻瓦片，边缘瓦片连同相邻区块）"""
+        if x < 0:
+            self.dirty.update(self.all_chunks())
+            return
+        size = self.chunk_size
+        self.dirty.add((x // size, z // size))
+        if _HEIGHTS[old] == _HEIGHTS[new]:
+            # 高度不变时相邻瓦片的侧面不受影响
+            return
+        for nx, nz in ((x - 1, z), (x + 1, z), (x, z - 1), (x, z + 1)):
+            if self.grid.in_bounds(nx, nz):
+                self.dirty.add((nx // size, nz // size))
+
+    def _height(self, x: int, z: int) -> float:
+        """瓦片高度，地图外为0"""
+        if not self.grid.in_bounds(x, z):
+            return 0.0
+        return _HEIGHTS[self.grid.tiles[z * self.grid.width + x]]
+
+    # ------------------------------------------------------------------
+    # 烘焙
+    # ------------------------------------------------------------------
+
+    def chunk_bounds(self, cx: int, cz: int) -> Tuple[int, int, int, int]:
+        """区块覆盖的瓦片范围 [x0, x1) x [z0, z1)"""
+        size = self.chunk_size
+        return (cx * size, cz * size,
+                min(self.grid.width, (cx + 1) * size), min(self.grid.height, (cz + 1) * size))
+
+    def chunk_hash(self, cx: int, cz: int) -> str:
+        """区块内容哈希（含一圈相邻瓦片，侧面可见性取决于它们）"""
+        x0, z0, x1, z1 = self.chunk_bounds(cx, cz)
+        width, tiles = self.grid.width, self.grid.tiles
+        digest = hashlib.sha256(struct.pack("<iiii", x0, z0, x1, z1))
+        bx0, bx1 = max(0, x0 - 1), min(width, x1 + 1)
+        for z in range(max(0, z0 - 1), min(self.grid.height, z1 + 1)):
+            digest.update(tiles[z * width + bx0:z * width + bx1])
+        return digest.hexdigest()
+
+    def bake_chunk(self, cx: int, cz: int) -> ChunkMesh:
+        """烘焙一个区块"""
+        x0, z0, x1, z1 = self.chunk_bounds(cx, cz)
+        w, h = x1 - x0, z1 - z0
+        width, tiles = self.grid.width, self.grid.tiles
+        mesh = ChunkMesh(cx, cz)
+
+        # 顶面: 同材质同高度的矩形合并
+        cells = [-1] * (w * h)
+        for z in range(h):
+            row = (z0 + z) * width + x0
+            for x in range(w):
+                tile = tiles[row + x]
+                if _HEIGHTS[tile] > 0.0:
+                    cells[z * w + x] = tile
+        for x, z, rw, rh, tile in _greedy_rects(cells, w, h):
+            mesh.surface(tile).add_quad(
+                (x0 + x, _HEIGHTS[tile], z0 + z), (rw, 0, 0), (0, 0, rh), (0, 1, 0), (rw, rh))
+
+        # 侧面: 相邻瓦片更低时可见，沿面片所在的扫描线合并材质和上下沿相同的连续面
+        for nx, nz in _SIDES:
+            along_x = nx == 0
+            lines = range(z0, z1) if along_x else range(x0, x1)
+            for line in lines:
+                run_start = None
+                run_key = None
+                steps = range(x0, x1) if along_x else range(z0, z1)
+                for step in list(steps) + [None]:
+                    key = None
+                    if step is not None:
+                        x, z = (step, line) if along_x else (line, step)
+                        tile = tiles[z * width + x]
+                        top = _HEIGHTS[tile]
+                        bottom = self._height(x + nx, z + nz)
+                        if top > bottom:
+                            key = (tile, bottom)
+                    if key != run_key:
+                        if run_key is not None:
+                            self._side_quad(mesh, nx, nz, line, run_start, step if step is not None
+                                            else (x1 if along_x else z1), run_key)
+                        run_start, run_key = step, key
+        return mesh
+
+    @staticmethod
+    def _side_quad(mesh: ChunkMesh, nx: int, nz: int, line: int, start: int, end: int,
+                   key: Tuple[int, float]):
+        """输出一段合并后的侧面 [start, end)"""
+        tile, bottom = key
+        top = _HEIGHTS[tile]
+        length = end - start
+        if nz != 0:
+            # 面在 z = line (+1) 平面上，沿x延伸
+            plane = line + 1 if nz > 0 else line
+            origin = (start, bottom, plane)
+            u = (length, 0, 0)
+        else:
+            plane = line + 1 if nx > 0 else line
+            origin = (plane, bottom, start)
+            u = (0, 0, length)
+        mesh.surface(tile).add_quad(origin, u, (0, top - bottom, 0), (nx, 0, nz),
+                                    (length, top - bottom))
+
+    def bake_dirty(self) -> Dict[Tuple[int, int], ChunkMesh]:
+        """烘焙所有待更新的区块并清空待更新集合"""
+        baked = {key: self.bake_chunk(*key) for key in sorted(self.dirty)}
+        self.dirty = set()
+        return baked
+
+    def naive_triangle_count(self) -> int:
+        """逐瓦片方块渲染的三角形数（对比用: 每个有几何的瓦片12个三角形）"""
+        return sum(12 for tile in self.grid.tiles if _HEIGHTS[tile] > 0.0)
+
+    # ------------------------------------------------------------------
+    # 文件输出
+    # ------------------------------------------------------------------
+
+    def bake_to_directory(self, out_dir: Path, force: bool = False) -> Dict[str, int]:
+        """烘焙到目录: 每区块一个 chunk_x_z.mesh，内容哈希未变化的区块跳过"""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = out_dir / MANIFEST_FILE
+        previous: Dict[str, dict] = {}
+        if not force:
+            try:
+                data = json.loads(manifest_path.read_text(encoding="utf-8"))
+                if (data.get("version") == MESH_VERSION
+                        and data.get("chunk_size") == self.chunk_size
+                        and data.get("map") == [self.grid.width, self.grid.height]):
+                    previous = data.get("chunks", {})
+            except (OSError, ValueError):
+                pass
+
+        chunks: Dict[str, dict] = {}
+        baked = 0
+        for cx, cz in self.all_chunks():
+            name = f"chunk_{cx}_{cz}.mesh"
+            digest = self.chunk_hash(cx, cz)
+            entry = previous.get(name)
+            if entry is not None and entry["hash"] == digest and (out_dir / name).exists():
+                chunks[name] = entry
+                continue
+            mesh = self.bake_chunk(cx, cz)
+            data = mesh.encode(self.chunk_size)
+            (out_dir / name).write_bytes(data)
+            chunks[name] = {"hash": digest, "triangles": mesh.triangle_count, "bytes": len(data)}
+            baked += 1
+        self.dirty = set()
+
+        manifest_path.write_text(json.dumps({
+            "version": MESH_VERSION,
+            "chunk_size": self.chunk_size,
+            "map": [self.grid.width, self.grid.height],
+            "chunks": chunks
+        }, indent=2), encoding="utf-8")
+        return {
+            "chunks": len(chunks),
+            "baked": baked,
+            "triangles": sum(entry["triangles"] for entry in chunks.values()),
+            "naive_triangles": self.naive_triangle_count(),
+            "bytes": sum(entry["bytes"] for entry in chunks.values())
+        }
+
+
+def main(argv=None) -> int:
+    """命令行入口 - 离线烘焙瓦片数组（uint8 行优先，与 load_tile_data 相同）"""
+    parser = argparse.ArgumentParser(description="烘焙静态地形区块网格")
+    parser.add_argument("tiles", help="瓦片数据文件")
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--height", type=int, default=200)
+    parser.add_argument("--out", default="meshes", help="输出目录")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--force", action="store_true", help="忽略哈希重建所有区块")
+    args = parser.parse_args(argv)
+
+    grid = TileGrid(args.width, args.height)
+    try:
+        grid.load_tiles(Path(args.tiles).read_bytes())
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法载入瓦片数据: {e}")
+        return 1
+
+    start = time.perf_counter()
+    report = ChunkMeshBaker(grid, args.chunk_size).bake_to_directory(Path(args.out), args.force)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    print(f"✅ 烘焙完成: {report['baked']}/{report['chunks']} 个区块，"
+          f"三角形 {report['naive_triangles']} -> {report['triangles']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
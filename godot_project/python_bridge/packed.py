@@ -0,0 +1,117 @@
+"""
+Python桥接模块 - 打包数组导出
+以连续的 float32/int32 缓冲区保存实体变换，布局与Godot的
+PackedFloat32Array/PackedInt32Array 及 MultiMesh.buffer 一致
+"""
+
+from array import array
+from typing import Dict, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game_logic import Vector3
+
+
+# 每个实例的分量数
+POSITION_STRIDE = 3
+# MultiMesh 3D变换: 3x4 行优先 [bx.x, by.x, bz.x, o.x, bx.y, by.y, bz.y, o.y, bx.z, by.z, bz.z, o.z]
+TRANSFORM_STRIDE = 12
+# 隐藏实例（已死亡）的类型ID
+HIDDEN_TYPE_ID = -1
+
+_IDENTITY_TRANSFORM = array('f', [1.0, 0.0, 0.0, 0.0,
+                                  0.0, 1.0, 0.0, 0.0,
+                                  0.0, 0.0, 1.0, 0.0])
+
+
+class TransformBuffer:
+    """实体变换缓冲 - 按槽位增量更新，导出时整块拷贝
+
+    槽位在实体创建时分配，位置和生命值变化时只改写对应槽位，
+    导出不再为每个实体构建字典。
+    """
+
+    def __init__(self):
+        self.positions = array('f')
+        self.transforms = array('f')
+        self.health_ratios = array('f')
+        self.type_ids = array('i')
+        self.count = 0
+        self.version = 0
+
+    def allocate(self, position: 'Vector3', health_ratio: float, type_id: int) -> int:
+        """分配新槽位，返回槽位下标"""
+        slot = self.count
+        self.positions.extend((position.x, position.y, position.z))
+        self.transforms.extend(_IDENTITY_TRANSFORM)
+        self.health_ratios.append(health_ratio)
+        self.type_ids.append(type_id)
+        self.count += 1
+        self._write_origin(slot, position)
+        self.version += 1
+        return slot
+
+    def assign(self, slot: int, position: 'Vector3', health_ratio: float, type_id: int):
+        """写入指定槽位，槽位等于当前数量时追加（用于复用已释放的槽位）"""
+        if slot == self.count:
+            self.allocate(position, health_ratio, type_id)
+            return
+        base = slot * TRANSFORM_STRIDE
+        self.transforms[base:base + TRANSFORM_STRIDE] = _IDENTITY_TRANSFORM
+        self.health_ratios[slot] = health_ratio
+        self.type_ids[slot] = type_id
+        self.set_position(slot, position)
+
+    def set_position(self, slot: int, position: 'Vector3'):
+        """更新槽位位置"""
+        base = slot * POSITION_STRIDE
+        self.positions[base] = position.x
+        self.positions[base + 1] = position.y
+        self.positions[base + 2] = position.z
+        self._write_origin(slot, position)
+        self.version += 1
+
+    def set_health_ratio(self, slot: int, health_ratio: float):
+        """更新槽位生命比例"""
+        self.health_ratios[slot] = health_ratio
+        self.version += 1
+
+    def set_type_id(self, slot: int, type_id: int):
+        """更新槽位类型ID"""
+        self.type_ids[slot] = type_id
+        self.version += 1
+
+    def _write_origin(self, slot: int, position: 'Vector3'):
+        """写入变换矩阵的平移分量"""
+        base = slot * TRANSFORM_STRIDE
+        self.transforms[base + 3] = position.x
+        self.transforms[base + 7] = position.y
+        self.transforms[base + 11] = position.z
+
+    def clear(self):
+        """清空所有槽位"""
+        self.positions = array('f')
+        self.transforms = array('f')
+        self.health_ratios = array('f')
+        self.type_ids = array('i')
+        self.count = 0
+        self.version += 1
+
+    def export(self, zero_copy: bool = False) -> Dict[str, Any]:
+        """导出打包数组
+
+        默认每个数组一次整块拷贝为 bytes；zero_copy=True 时返回 memoryview，
+        调用方用完必须 release()，否则缓冲区无法扩容。
+        """
+        if zero_copy:
+            pack = memoryview
+        else:
+            def pack(data: array) -> bytes:
+                return data.tobytes()
+        return {
+            "count": self.count,
+            "version": self.version,
+            "positions": pack(self.positions),
+            "transforms": pack(self.transforms),
+            "health_ratios": pack(self.health_ratios),
+            "type_ids": pack(self.type_ids)
+        }
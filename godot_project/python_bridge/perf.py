@@ -0,0 +1,167 @@
+"""
+Python桥接模块 - 性能统计
+记录各子系统每帧耗时、调用次数和内存块分配，使用固定大小的对数线性直方图
+"""
+
+import sys
+import time
+from array import array
+from typing import Callable, Dict, Any
+
+
+# 每个2的幂区间细分的子桶位数（32个子桶，相对误差约3%）
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+# 可记录的最大值为 2^MAX_EXPONENT 纳秒（约18分钟）
+MAX_EXPONENT = 40
+BUCKET_COUNT = (MAX_EXPONENT - SUB_BUCKET_BITS + 2) * SUB_BUCKET_COUNT
+
+
+class Histogram:
+    """对数线性直方图（HDR风格）- 固定内存，记录O(1)，分位数查询O(桶数)"""
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    @staticmethod
+    def _bucket(value: int) -> int:
+        """数值所在的桶下标"""
+        if value < SUB_BUCKET_COUNT:
+            return value
+        exponent = value.bit_length() - 1
+        if exponent > MAX_EXPONENT:
+            return BUCKET_COUNT - 1
+        shift = exponent - SUB_BUCKET_BITS
+        return ((exponent - SUB_BUCKET_BITS + 1) << SUB_BUCKET_BITS) + ((value >> shift) & (SUB_BUCKET_COUNT - 1))
+
+    @staticmethod
+    def _bucket_value(index: int) -> int:
+        """桶代表的数值（桶上界）"""
+        if index < SUB_BUCKET_COUNT:
+            return index
+        group = (index >> SUB_BUCKET_BITS) - 1
+        sub = index & (SUB_BUCKET_COUNT - 1)
+        return ((SUB_BUCKET_COUNT + sub + 1) << group) - 1
+
+    def record(self, value: int):
+        """记录一个非负整数"""
+        if value < 0:
+            value = 0
+        self.counts[self._bucket(value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> int:
+        """求分位数（p取0~100）"""
+        if self.total == 0:
+            return 0
+        target = max(1, int(self.total * p / 100.0 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return min(self._bucket_value(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        """平均值"""
+        return self.sum / self.total if self.total else 0.0
+
+    def reset(self):
+        """清空"""
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+
+class SubsystemStats:
+    """单个子系统的统计"""
+
+    def __init__(self):
+        self.time_ns = Histogram()
+        self.alloc_blocks = Histogram()
+        self.calls = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        ms = 1e-6
+        return {
+            "calls": self.calls,
+            "mean_ms": self.time_ns.mean() * ms,
+            "p50_ms": self.time_ns.percentile(50) * ms,
+            "p95_ms": self.time_ns.percentile(95) * ms,
+            "p99_ms": self.time_ns.percentile(99) * ms,
+            "max_ms": self.time_ns.max * ms,
+            "alloc_blocks_mean": self.alloc_blocks.mean(),
+            "alloc_blocks_p99": self.alloc_blocks.percentile(99)
+        }
+
+
+class TickProfiler:
+    """帧性能分析器
+
+    关闭时调用方直接走未计时的路径，开销只有一次布尔判断。
+    分配数为子系统执行前后 sys.getallocatedblocks() 的净增量（负数记为0），
+    已扣除计时本身产生的分配。
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.subsystems: Dict[str, SubsystemStats] = {}
+        self._alloc_overhead = self._calibrate()
+
+    @staticmethod
+    def _calibrate() -> int:
+        """用空函数测量计时代码自身的分配块数"""
+        def noop(*args):
+            return None
+
+        def probe() -> int:
+            blocks = sys.getallocatedblocks()
+            time.perf_counter_ns()
+            noop(0.0)
+            time.perf_counter_ns()
+            return sys.getallocatedblocks() - blocks
+
+        return max(0, min(probe() for _ in range(8)))
+
+    def measure(self, name: str, func: Callable, *args) -> Any:
+        """计时执行一个子系统"""
+        stats = self.subsystems.get(name)
+        if stats is None:
+            stats = self.subsystems[name] = SubsystemStats()
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        result = func(*args)
+        elapsed = time.perf_counter_ns() - start
+        stats.time_ns.record(elapsed)
+        stats.alloc_blocks.record(
+            sys.getallocatedblocks() - blocks - self._alloc_overhead)
+        stats.calls += 1
+        return result
+
+    def record(self, name: str, elapsed_ns: int, alloc_blocks: int = 0):
+        """记录外部测得的耗时"""
+        stats = self.subsystems.get(name)
+        if stats is None:
+            stats = self.subsystems[name] = SubsystemStats()
+        stats.time_ns.record(elapsed_ns)
+        stats.alloc_blocks.record(alloc_blocks)
+        stats.calls += 1
+
+    def reset(self):
+        """清空统计"""
+        self.subsystems = {}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取各子系统统计"""
+        return {
+            "enabled": self.enabled,
+            "subsystems": {name: stats.to_dict() for name, stats in self.subsystems.items()}
+        }
@@ -0,0 +1,189 @@
+"""
+Python桥接模块 - 建筑放置
+维护建筑占地位图和瓦片可建造性，在其上建立二维前缀和（summed-area table），
+任意大小的占地矩形能否放下只需读取四个前缀和，为 O(1)。
+另提供整张地图的可放置掩码，供 BuildingPreview 一次性高亮所有可建造位置。
+"""
+
+from array import array
+from itertools import accumulate
+from typing import Dict, Tuple, TYPE_CHECKING
+
+from .tile_grid import TileGrid, TileType, WALKABLE_TILES
+
+if TYPE_CHECKING:
+    from .game_logic import BuildingData, BuildingType, Vector3
+
+
+# 可建造瓦片: 可行走且不是金矿/地牢之心等特殊瓦片
+BUILDABLE_TILES = WALKABLE_TILES - frozenset([TileType.GOLD_MINE, TileType.DUNGEON_HEART])
+
+# 建筑占地边长（瓦片，与 Unified*.gd 的 building_size 一致），未列出的为 1x1
+FOOTPRINT_SIZES = {
+    "dungeon_heart": 2,
+}
+
+_BLOCKED_LOOKUP = bytes(0 if t in BUILDABLE_TILES else 1 for t in range(256))
+
+
+def footprint_size(building_type: 'BuildingType') -> int:
+    """建筑占地边长"""
+    return FOOTPRINT_SIZES.get(building_type.value, 1)
+
+
+class PlacementGrid:
+    """建筑放置网格
+
+    blocked[i] 为1表示瓦片不可建造或已被建筑占用；occupancy 记录每个瓦片上的建筑数。
+    前缀和表按行延迟重建: 瓦片变化只记录最小的变化行，下次查询时从该行开始重算。
+    占地以锚点瓦片（建筑位置所在瓦片）为中心: 起点 = 锚点 - (边长 - 1) // 2。
+    """
+
+    def __init__(self, grid: TileGrid):
+        self.grid = grid
+        size = grid.width * grid.height
+        self.occupancy = array('H', [0]) * size
+        self.blocked = bytearray(grid.tiles.translate(_BLOCKED_LOOKUP))
+        # (width + 1) * (height + 1)，第0行和第0列为0
+        self._sat = array('i', [0]) * ((grid.width + 1) * (grid.height + 1))
+        self._dirty_row = 0
+        self._masks: Dict[int, bytes] = {}
+        self.version = 0
+        grid.add_listener(self._on_tile_changed)
+
+    # ------------------------------------------------------------------
+    # 占地
+    # ------------------------------------------------------------------
+
+    def footprint_origin(self, building_type: 'BuildingType',
+                         position: 'Vector3') -> Tuple[int, int, int]:
+        """建筑占地 (起点x, 起点z, 边长)，瓦片坐标"""
+        n = footprint_size(building_type)
+        x, z = self.grid.world_to_tile(position)
+        return (x - (n - 1) // 2, z - (n - 1) // 2, n)
+
+    def occupy(self, building: 'BuildingData'):
+        """登记建筑占地（地图外的部分忽略）"""
+        self._stamp(*self.footprint_origin(building.type, building.position), 1)
+
+    def release(self, building: 'BuildingData'):
+        """释放建筑占地"""
+        self._stamp(*self.footprint_origin(building.type, building.position), -1)
+
+    def _stamp(self, x0: int, z0: int, n: int, delta: int):
+        width, height = self.grid.width, self.grid.height
+        tiles = self.grid.tiles
+        for z in range(max(0, z0), min(height, z0 + n)):
+            for x in range(max(0, x0), min(width, x0 + n)):
+                i = z * width + x
+                self.occupancy[i] = max(0, self.occupancy[i] + delta)
+                self._set_blocked(i, self.occupancy[i] > 0 or _BLOCKED_LOOKUP[tiles[i]])
+
+    def _set_blocked(self, i: int, blocked: bool):
+        value = 1 if blocked else 0
+        if self.blocked[i] == value:
+            return
+        self.blocked[i] = value
+        self._dirty_row = min(self._dirty_row, i // self.grid.width)
+        self._masks.clear()
+        self.version += 1
+
+    def _on_tile_changed(self, x: int, z: int, old: int, new: int):
+        if x < 0:
+            blocked = self.grid.tiles.translate(_BLOCKED_LOOKUP)
+            self.blocked[:] = bytes(
+                1 if b or o else 0 for b, o in zip(blocked, self.occupancy))
+            self._dirty_row = 0
+            self._masks.clear()
+            self.version += 1
+            return
+        i = z * self.grid.width + x
+        self._set_blocked(i, self.occupancy[i] > 0 or _BLOCKED_LOOKUP[new])
+
+    # ------------------------------------------------------------------
+    # 前缀和
+    # ------------------------------------------------------------------
+
+    def _refresh(self):
+        """从最小的变化行开始重建前缀和表"""
+        width, height = self.grid.width, self.grid.height
+        if self._dirty_row >= height:
+            return
+        stride = width + 1
+        sat = self._sat
+        blocked = self.blocked
+        for z in range(self._dirty_row, height):
+            above = z * stride
+            row = (z + 1) * stride
+            prefix = accumulate(blocked[z * width:(z + 1) * width])
+            sat[row + 1:row + stride] = array(
+                'i', [p + a for p, a in zip(prefix, sat[above + 1:above + stride])])
+        self._dirty_row = height
+
+    def _rect_sum(self, x0: int, z0: int, x1: int, z1: int) -> int:
+        """[x0, x1) x [z0, z1) 内的阻挡瓦片数（调用前需 _refresh）"""
+        stride = self.grid.width + 1
+        sat = self._sat
+        return (sat[z1 * stride + x1] - sat[z0 * stride + x1]
+                - sat[z1 * stride + x0] + sat[z0 * stride + x0])
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def fits(self, x0: int, z0: int, n: int) -> bool:
+        """以 (x0, z0) 为起点的 n x n 占地是否完全在地图内且无阻挡"""
+        if x0 < 0 or z0 < 0 or x0 + n > self.grid.width or z0 + n > self.grid.height:
+            return False
+        self._refresh()
+        return self._rect_sum(x0, z0, x0 + n, z0 + n) == 0
+
+    def can_place(self, building_type: 'BuildingType', position: 'Vector3') -> bool:
+        """建筑能否放在该世界坐标"""
+        return self.fits(*self.footprint_origin(building_type, position))
+
+    def valid_mask(self, n: int) -> bytes:
+        """n x n 占地的可放置掩码: 按起点瓦片索引（行优先），1为可放置"""
+        mask = self._masks.get(n)
+        if mask is not None:
+            return mask
+        width, height = self.grid.width, self.grid.height
+        self._refresh()
+        stride = width + 1
+        sat = self._sat
+        out = bytearray(width * height)
+        span = width - n + 1
+        for z in range(height - n + 1):
+            top = z * stride
+            bottom = (z + n) * stride
+            out[z * width:z * width + span] = bytes(
+                1 if d - b - c + a == 0 else 0
+                for a, b, c, d in zip(sat[top:top + span], sat[top + n:top + n + span],
+                                      sat[bottom:bottom + span], sat[bottom + n:bottom + n + span]))
+        mask = bytes(out)
+        self._masks[n] = mask
+        return mask
+
+    def anchor_mask(self, building_type: 'BuildingType') -> bytes:
+        """按锚点瓦片（建筑位置所在瓦片）索引的可放置掩码"""
+        n = footprint_size(building_type)
+        shift = (n - 1) // 2
+        mask = self.valid_mask(n)
+        if shift == 0:
+            return mask
+        # 起点 (x, z) 对应锚点 (x + shift, z + shift)
+        width = self.grid.width
+        out = bytearray(len(mask))
+        for z in range(self.grid.height - shift):
+            out[(z + shift) * width + shift:(z + shift + 1) * width] = \
+                mask[z * width:(z + 1) * width - shift]
+        return bytes(out)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取放置网格统计"""
+        return {
+            "occupied_tiles": sum(1 for count in self.occupancy if count),
+            "blocked_tiles": sum(self.blocked),
+            "cached_masks": len(self._masks),
+            "version": self.version
+        }
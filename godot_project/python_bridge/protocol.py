@@ -0,0 +1,287 @@
+"""
+Python桥接模块 - 整数ID通信协议
+枚举以小整数传输，位置以打包的 float32 传输，命令为固定布局的二进制记录。
+连接时先握手交换ID表（schema），双方哈希一致后即可直接使用整数ID。
+原有的字符串接口保留为兼容层。
+
+命令缓冲区由若干条命令顺序拼接，所有字段小端:
+    build_building     <BBfff  操作码, 建筑ID, x, y, z       -> 1个int32 (1成功/0失败)
+    summon_character   <BBfff  操作码, 角色ID, x, y, z       -> 1个int32 (1成功/0失败)
+    get_resource       <BB     操作码, 资源ID                -> 1个int32 (数量)
+    can_afford_*       <BB     操作码, 建筑ID/角色ID          -> 1个int32 (1/0)
+    get_*_cost         <BB     操作码, 建筑ID/角色ID          -> 资源数量个int32（按资源ID排列）
+无效ID的结果为 -1。结果依次拼接为 int32 数组，可直接转换为 PackedInt32Array。
+
+基准测试: python -m python_bridge.protocol
+"""
+
+import hashlib
+import json
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Any, Tuple, TYPE_CHECKING
+
+from .game_logic import ResourceType, BuildingType, CharacterType, Vector3
+from .events import EVENT_BUILDING_CREATED, EVENT_CHARACTER_CREATED
+
+if TYPE_CHECKING:
+    from .bridge import GodotBridge
+    from .stats import StatRegistry
+
+
+PROTOCOL_VERSION = 1
+
+# ID表（枚举定义顺序）
+RESOURCE_TYPES: Tuple[ResourceType, ...] = tuple(ResourceType)
+BUILDING_TYPES: Tuple[BuildingType, ...] = tuple(BuildingType)
+CHARACTER_TYPES: Tuple[CharacterType, ...] = tuple(CharacterType)
+RESOURCE_COUNT = len(RESOURCE_TYPES)
+
+# 字符串兼容层使用的名称查找表
+RESOURCES_BY_NAME = {rt.value: rt for rt in RESOURCE_TYPES}
+BUILDINGS_BY_NAME = {bt.value: bt for bt in BUILDING_TYPES}
+CHARACTERS_BY_NAME = {ct.value: ct for ct in CHARACTER_TYPES}
+RESOURCE_IDS = {rt: i for i, rt in enumerate(RESOURCE_TYPES)}
+
+# 操作码
+OP_BUILD_BUILDING = 1
+OP_SUMMON_CHARACTER = 2
+OP_GET_RESOURCE = 3
+OP_GET_BUILDING_COST = 4
+OP_GET_CHARACTER_COST = 5
+OP_CAN_AFFORD_BUILDING = 6
+OP_CAN_AFFORD_CHARACTER = 7
+
+# 无效ID的结果
+RESULT_INVALID = -1
+_INVALID_ROW = [RESULT_INVALID] * RESOURCE_COUNT
+
+_SPAWN = struct.Struct("<BBfff")
+_QUERY = struct.Struct("<BB")
+
+# 操作码 -> (名称, 布局, 结果int32个数)
+COMMAND_LAYOUTS = {
+    OP_BUILD_BUILDING: ("build_building", _SPAWN, 1),
+    OP_SUMMON_CHARACTER: ("summon_character", _SPAWN, 1),
+    OP_GET_RESOURCE: ("get_resource", _QUERY, 1),
+    OP_GET_BUILDING_COST: ("get_building_cost", _QUERY, RESOURCE_COUNT),
+    OP_GET_CHARACTER_COST: ("get_character_cost", _QUERY, RESOURCE_COUNT),
+    OP_CAN_AFFORD_BUILDING: ("can_afford_building", _QUERY, 1),
+    OP_CAN_AFFORD_CHARACTER: ("can_afford_character", _QUERY, 1),
+}
+
+
+def _build_schema() -> Dict[str, Any]:
+    schema = {
+        "version": PROTOCOL_VERSION,
+        "resources": [rt.value for rt in RESOURCE_TYPES],
+        "buildings": [bt.value for bt in BUILDING_TYPES],
+        "characters": [ct.value for ct in CHARACTER_TYPES],
+        "commands": {
+            name: {"opcode": opcode, "layout": layout.format, "size": layout.size, "results": results}
+            for opcode, (name, layout, results) in COMMAND_LAYOUTS.items()
+        }
+    }
+    encoded = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    schema["hash"] = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+    return schema
+
+
+SCHEMA = _build_schema()
+
+
+def handshake(client_hash: str = "") -> Dict[str, Any]:
+    """握手: 返回ID表，accepted 表示客户端缓存的表与服务端一致"""
+    return {"accepted": client_hash == SCHEMA["hash"], **SCHEMA}
+
+
+def _cost_row(costs: Dict[ResourceType, int]) -> List[int]:
+    row = [0] * RESOURCE_COUNT
+    for resource_type, amount in costs.items():
+        row[RESOURCE_IDS[resource_type]] = amount
+    return row
+
+
+# 按属性表路径缓存的成本行: 路径 -> (表版本, 建筑成本行, 角色成本行)
+_cost_cache: Dict[str, Tuple[int, List[List[int]], List[List[int]]]] = {}
+
+
+def _cost_tables(stats: 'StatRegistry') -> Tuple[int, List[List[int]], List[List[int]]]:
+    """按ID排列的成本行，属性表重载后重建"""
+    cached = _cost_cache.get(stats.path)
+    if cached is None or cached[0] != stats.version:
+        cached = (
+            stats.version,
+            [_cost_row(stats.building_costs.get(bt, {})) for bt in BUILDING_TYPES],
+            [_cost_row(stats.character_costs.get(ct, {})) for ct in CHARACTER_TYPES]
+        )
+        _cost_cache[stats.path] = cached
+    return cached
+
+
+def run_commands(bridge: 'GodotBridge', data: bytes) -> bytes:
+    """执行命令缓冲区，返回 int32 结果数组的字节"""
+    logic = bridge.logic
+    results = array('i')
+    view = memoryview(data)
+    offset = 0
+    end = len(view)
+    while offset < end:
+        opcode = view[offset]
+        if opcode == OP_BUILD_BUILDING or opcode == OP_SUMMON_CHARACTER:
+            if offset + _SPAWN.size > end:
+                print(f"命令缓冲区截断: 偏移 {offset}")
+                break
+            _, type_id, x, y, z = _SPAWN.unpack_from(view, offset)
+            offset += _SPAWN.size
+            if opcode == OP_BUILD_BUILDING:
+                if type_id >= len(BUILDING_TYPES):
+                    results.append(RESULT_INVALID)
+                    continue
+                building_type = BUILDING_TYPES[type_id]
+                ok = logic.build_building(building_type, Vector3(x, y, z))
+                if ok:
+                    bridge.call_godot_function(EVENT_BUILDING_CREATED, building_type.value, x, y, z)
+            else:
+                if type_id >= len(CHARACTER_TYPES):
+                    results.append(RESULT_INVALID)
+                    continue
+                character_type = CHARACTER_TYPES[type_id]
+                ok = logic.summon_character(character_type, Vector3(x, y, z))
+                if ok:
+                    bridge.call_godot_function(EVENT_CHARACTER_CREATED, character_type.value, x, y, z)
+            results.append(1 if ok else 0)
+            continue
+
+        if opcode not in COMMAND_LAYOUTS or offset + _QUERY.size > end:
+            print(f"无效命令: 操作码 {opcode}, 偏移 {offset}")
+            break
+        type_id = view[offset + 1]
+        offset += _QUERY.size
+
+        if opcode == OP_GET_RESOURCE:
+            if type_id >= RESOURCE_COUNT:
+                results.append(RESULT_INVALID)
+            else:
+                results.append(logic.get_resource(RESOURCE_TYPES[type_id]))
+        elif opcode == OP_CAN_AFFORD_BUILDING:
+            if type_id >= len(BUILDING_TYPES):
+                results.append(RESULT_INVALID)
+            else:
+                results.append(1 if logic.can_afford_building(BUILDING_TYPES[type_id]) else 0)
+        elif opcode == OP_CAN_AFFORD_CHARACTER:
+            if type_id >= len(CHARACTER_TYPES):
+                results.append(RESULT_INVALID)
+            else:
+                results.append(1 if logic.can_afford_character(CHARACTER_TYPES[type_id]) else 0)
+        elif opcode == OP_GET_BUILDING_COST:
+            if type_id >= len(BUILDING_TYPES):
+                results.extend(_INVALID_ROW)
+            else:
+                results.extend(_cost_tables(logic.stats)[1][type_id])
+        else:
+            if type_id >= len(CHARACTER_TYPES):
+                results.extend(_INVALID_ROW)
+            else:
+                results.extend(_cost_tables(logic.stats)[2][type_id])
+    return results.tobytes()
+
+
+def encode_spawn(opcode: int, type_id: int, x: float, y: float, z: float) -> bytes:
+    """编码建造/召唤命令"""
+    return _SPAWN.pack(opcode, type_id, x, y, z)
+
+
+def encode_query(opcode: int, type_id: int) -> bytes:
+    """编码查询命令"""
+    return _QUERY.pack(opcode, type_id)
+
+
+def benchmark(iterations: int = 20000, repeats: int = 5) -> Dict[str, float]:
+    """比较字符串接口与整数ID接口每次调用的耗时（微秒，取多次重复的最小值）
+
+    direct 为直接调用游戏逻辑的耗时，两种接口减去它即为分发开销。
+    """
+    import contextlib
+    import io
+    from .bridge import GodotBridge
+    from .game_logic import create_world, destroy_world
+    from .sim_host import MODE_IN_PROCESS
+
+    world = create_world()
+    bridge = GodotBridge(mode=MODE_IN_PROCESS, world_id=world.world_id)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bridge.initialize()
+    logic = bridge.logic
+
+    # 只读查询，避免建造/召唤的日志输出干扰测量
+    string_inputs = [
+        {"type": "get_resource", "resource_type": "gold"},
+        {"type": "get_resource", "resource_type": "mana"},
+    ]
+    string_calls = [
+        (bridge.get_building_cost, "orc_lair"),
+        (bridge.can_afford_character, "imp"),
+    ]
+    buffer = b"".join([
+        encode_query(OP_GET_RESOURCE, RESOURCE_IDS[ResourceType.GOLD]),
+        encode_query(OP_GET_RESOURCE, RESOURCE_IDS[ResourceType.MANA]),
+        encode_query(OP_GET_BUILDING_COST, BUILDING_TYPES.index(BuildingType.ORC_LAIR)),
+        encode_query(OP_CAN_AFFORD_CHARACTER, CHARACTER_TYPES.index(CharacterType.IMP)),
+    ])
+    calls_per_round = 4
+
+    def timed(func) -> float:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            best = min(best, time.perf_counter() - start)
+        return best * 1e6 / (iterations * calls_per_round)
+
+    def direct_round():
+        logic.get_resource(ResourceType.GOLD)
+        logic.get_resource(ResourceType.MANA)
+        logic.building_costs.get(BuildingType.ORC_LAIR)
+        logic.can_afford_character(CharacterType.IMP)
+
+    def string_round():
+        for input_data in string_inputs:
+            bridge.process_input(input_data)
+        for method, name in string_calls:
+            method(name)
+
+    def packed_round():
+        bridge.execute_commands(buffer)
+
+    try:
+        direct = timed(direct_round)
+        string = timed(string_round)
+        packed = timed(packed_round)
+        return {
+            "direct_us_per_call": direct,
+            "string_us_per_call": string,
+            "packed_us_per_call": packed,
+            "string_overhead_us": string - direct,
+            "packed_overhead_us": packed - direct
+        }
+    finally:
+        destroy_world(world.world_id)
+
+
+def main() -> int:
+    """命令行入口 - 运行微基准"""
+    result = benchmark()
+    print(f"直接调用游戏逻辑: {result['direct_us_per_call']:.2f} us/调用")
+    print(f"字符串接口: {result['string_us_per_call']:.2f} us/调用 "
+          f"(分发开销 {result['string_overhead_us']:.2f} us)")
+    print(f"整数ID接口: {result['packed_us_per_call']:.2f} us/调用 "
+          f"(分发开销 {result['packed_overhead_us']:.2f} us)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
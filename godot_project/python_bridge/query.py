@@ -0,0 +1,162 @@
+"""
+Python桥接模块 - 实体查询
+按角色类型、建筑类型、当前动作和建造状态增量维护二级索引，
+计数 O(1)，筛选迭代只与结果数量有关
+"""
+
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game_logic import BuildingData, BuildingType, CharacterData, CharacterType
+
+
+class EntityIndex:
+    """实体二级索引
+
+    角色按句柄索引（死亡角色已从实体池移除，索引中只有存活角色）；
+    建筑不会被移除，按对象标识索引。每个索引桶是保持插入顺序的字典，
+    删除为 O(1)，迭代顺序稳定（回放确定）。
+    """
+
+    def __init__(self):
+        self._characters: Dict[int, 'CharacterData'] = {}
+        self._characters_by_type: Dict['CharacterType', Dict[int, 'CharacterData']] = {}
+        self._characters_by_action: Dict[str, Dict[int, 'CharacterData']] = {}
+        self._characters_by_type_action: Dict[Tuple['CharacterType', str], Dict[int, 'CharacterData']] = {}
+
+        self._buildings: Dict[int, 'BuildingData'] = {}
+        self._buildings_by_type: Dict['BuildingType', Dict[int, 'BuildingData']] = {}
+        self._buildings_by_built: Dict[bool, Dict[int, 'BuildingData']] = {True: {}, False: {}}
+        self._buildings_by_type_built: Dict[Tuple['BuildingType', bool], Dict[int, 'BuildingData']] = {}
+
+    def __setstate__(self, state):
+        # 反序列化（世界迁移）后对象标识改变，按原顺序重建建筑索引
+        self.__dict__.update(state)
+        buildings = list(self._buildings.values())
+        self._buildings = {}
+        self._buildings_by_type = {}
+        self._buildings_by_built = {True: {}, False: {}}
+        self._buildings_by_type_built = {}
+        for building in buildings:
+            self.add_building(building)
+
+    @staticmethod
+    def _insert(index: Dict, key, entity_key: int, entity):
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = {}
+        bucket[entity_key] = entity
+
+    @staticmethod
+    def _discard(index: Dict, key, entity_key: int):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(entity_key, None)
+
+    # ------------------------------------------------------------------
+    # 角色
+    # ------------------------------------------------------------------
+
+    def add_character(self, character: 'CharacterData'):
+        """登记角色"""
+        handle = character.handle
+        self._characters[handle] = character
+        self._insert(self._characters_by_type, character.type, handle, character)
+        self._insert(self._characters_by_action, character.current_action, handle, character)
+        self._insert(self._characters_by_type_action,
+                     (character.type, character.current_action), handle, character)
+
+    def remove_character(self, character: 'CharacterData'):
+        """移除角色"""
+        handle = character.handle
+        if self._characters.pop(handle, None) is None:
+            return
+        self._discard(self._characters_by_type, character.type, handle)
+        self._discard(self._characters_by_action, character.current_action, handle)
+        self._discard(self._characters_by_type_action,
+                      (character.type, character.current_action), handle)
+
+    def set_character_action(self, character: 'CharacterData', action: str):
+        """修改角色当前动作并更新索引（未登记的角色只修改属性）"""
+        old = character.current_action
+        character.current_action = action
+        handle = character.handle
+        if old == action or handle not in self._characters:
+            return
+        self._discard(self._characters_by_action, old, handle)
+        self._discard(self._characters_by_type_action, (character.type, old), handle)
+        self._insert(self._characters_by_action, action, handle, character)
+        self._insert(self._characters_by_type_action, (character.type, action), handle, character)
+
+    def _character_bucket(self, character_type: Optional['CharacterType'],
+                          action: Optional[str]) -> Dict[int, 'CharacterData']:
+        if character_type is not None and action is not None:
+            return self._characters_by_type_action.get((character_type, action), {})
+        if character_type is not None:
+            return self._characters_by_type.get(character_type, {})
+        if action is not None:
+            return self._characters_by_action.get(action, {})
+        return self._characters
+
+    def count_characters(self, character_type: Optional['CharacterType'] = None,
+                         action: Optional[str] = None) -> int:
+        """按类型/动作统计角色数量（O(1)）"""
+        return len(self._character_bucket(character_type, action))
+
+    def find_characters(self, character_type: Optional['CharacterType'] = None,
+                        action: Optional[str] = None) -> List['CharacterData']:
+        """按类型/动作查找角色（返回副本，遍历时可修改实体）"""
+        return list(self._character_bucket(character_type, action).values())
+
+    # ------------------------------------------------------------------
+    # 建筑
+    # ------------------------------------------------------------------
+
+    def add_building(self, building: 'BuildingData'):
+        """登记建筑"""
+        key = id(building)
+        self._buildings[key] = building
+        self._insert(self._buildings_by_type, building.type, key, building)
+        self._buildings_by_built[building.is_built][key] = building
+        self._insert(self._buildings_by_type_built, (building.type, building.is_built), key, building)
+
+    def set_building_built(self, building: 'BuildingData', built: bool):
+        """修改建筑建造状态并更新索引"""
+        old = building.is_built
+        building.is_built = built
+        key = id(building)
+        if old == built or key not in self._buildings:
+            return
+        self._buildings_by_built[old].pop(key, None)
+        self._discard(self._buildings_by_type_built, (building.type, old), key)
+        self._buildings_by_built[built][key] = building
+        self._insert(self._buildings_by_type_built, (building.type, built), key, building)
+
+    def _building_bucket(self, building_type: Optional['BuildingType'],
+                         built: Optional[bool]) -> Dict[int, 'BuildingData']:
+        if building_type is not None and built is not None:
+            return self._buildings_by_type_built.get((building_type, built), {})
+        if building_type is not None:
+            return self._buildings_by_type.get(building_type, {})
+        if built is not None:
+            return self._buildings_by_built[built]
+        return self._buildings
+
+    def count_buildings(self, building_type: Optional['BuildingType'] = None,
+                        built: Optional[bool] = None) -> int:
+        """按类型/建造状态统计建筑数量（O(1)）"""
+        return len(self._building_bucket(building_type, built))
+
+    def find_buildings(self, building_type: Optional['BuildingType'] = None,
+                       built: Optional[bool] = None) -> List['BuildingData']:
+        """按类型/建造状态查找建筑（返回副本）"""
+        return list(self._building_bucket(building_type, built).values())
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取索引统计"""
+        return {
+            "characters": len(self._characters),
+            "buildings": len(self._buildings),
+            "built_buildings": len(self._buildings_by_built[True]),
+            "actions": sum(1 for bucket in self._characters_by_action.values() if bucket)
+        }
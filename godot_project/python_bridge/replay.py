@@ -0,0 +1,202 @@
+"""
+Python桥接模块 - 命令录制与回放
+录制 process_input 命令和 update(delta) 调用为紧凑的二进制轨迹，
+无界面回放后校验最终状态哈希，并统计每帧耗时，用作性能回归基准
+
+用法: python -m python_bridge.replay trace.mmtr [trace2.mmtr ...] [--quiet]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import struct
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from .perf import Histogram
+
+if TYPE_CHECKING:
+    from .game_logic import GameLogic
+    from .bridge import GodotBridge
+
+
+TRACE_MAGIC = b"MMTR"
+TRACE_VERSION = 1
+
+# 记录类型
+REC_UPDATE = 1
+REC_COMMAND = 2
+REC_END = 3
+
+_HEADER = struct.Struct("<4sHH")      # 魔数, 版本, 保留
+_UPDATE = struct.Struct("<Bd")        # 类型, delta
+_COMMAND = struct.Struct("<BI")       # 类型, JSON长度
+_END = struct.Struct("<BQ32s")        # 类型, 帧数, 状态哈希
+
+
+def compute_state_hash(logic: 'GameLogic') -> bytes:
+    """计算游戏状态哈希（SHA-256，与对象地址无关）"""
+    state = {
+        "game_time": repr(logic.game_time),
+        "resources": sorted((rt.value, rd.amount, rd.storage_capacity)
+                            for rt, rd in logic.resources.items()),
+        "buildings": [
+            [b.type.value, repr(b.position.x), repr(b.position.y), repr(b.position.z),
+             b.health, b.is_built,
+             sorted((rt.value, amount) for rt, amount in b.stored_resources.items())]
+            for b in logic.buildings
+        ],
+        "characters": [
+            [c.type.value, repr(c.position.x), repr(c.position.y), repr(c.position.z),
+             c.health, c.is_alive, c.current_action]
+            for c in logic.characters
+        ]
+    }
+    encoded = json.dumps(state, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).digest()
+
+
+class TraceRecorder:
+    """轨迹录制器 - 从初始化开始记录所有输入"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frames = 0
+        self.commands = 0
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, 0))
+
+    def record_update(self, delta: float):
+        """记录一次 update(delta)"""
+        self._file.write(_UPDATE.pack(REC_UPDATE, delta))
+        self.frames += 1
+
+    def record_command(self, input_data: Dict[str, Any]):
+        """记录一条 process_input 命令"""
+        payload = json.dumps(input_data, separators=(",", ":"),
+                             sort_keys=True, ensure_ascii=False).encode("utf-8")
+        self._file.write(_COMMAND.pack(REC_COMMAND, len(payload)))
+        self._file.write(payload)
+        self.commands += 1
+
+    def close(self, logic: 'GameLogic') -> str:
+        """写入结束记录和最终状态哈希，返回哈希的十六进制"""
+        digest = compute_state_hash(logic)
+        self._file.write(_END.pack(REC_END, self.frames, digest))
+        self._file.close()
+        print(f"轨迹录制完成: {self.path} ({self.frames} 帧, {self.commands} 条命令)")
+        return digest.hex()
+
+
+def read_trace(path: str) -> Iterator[Tuple[int, Any]]:
+    """逐条读取轨迹记录"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, _ = _HEADER.unpack_from(data, 0)
+    if magic != TRACE_MAGIC:
+        raise ValueError(f"不是轨迹文件: {path}")
+    if version != TRACE_VERSION:
+        raise ValueError(f"不支持的轨迹版本: {version}")
+
+    offset = _HEADER.size
+    while offset < len(data):
+        kind = data[offset]
+        if kind == REC_UPDATE:
+            _, delta = _UPDATE.unpack_from(data, offset)
+            offset += _UPDATE.size
+            yield REC_UPDATE, delta
+        elif kind == REC_COMMAND:
+            _, length = _COMMAND.unpack_from(data, offset)
+            offset += _COMMAND.size
+            yield REC_COMMAND, json.loads(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        elif kind == REC_END:
+            _, frames, digest = _END.unpack_from(data, offset)
+            offset += _END.size
+            yield REC_END, (frames, digest)
+        else:
+            raise ValueError(f"轨迹记录损坏: 偏移 {offset}")
+
+
+class TraceReplayer:
+    """轨迹回放器 - 需要尚未初始化的桥接（全新世界）"""
+
+    def __init__(self, bridge: 'GodotBridge'):
+        self.bridge = bridge
+
+    def run(self, path: str, quiet: bool = False) -> Dict[str, Any]:
+        """回放轨迹，返回校验结果和每帧耗时统计"""
+        if self.bridge.is_initialized:
+            raise RuntimeError("回放需要全新的游戏世界")
+
+        frame_times = Histogram()
+        expected: Optional[Tuple[int, bytes]] = None
+        commands = 0
+        output = io.StringIO() if quiet else sys.stdout
+        wall_start = time.perf_counter()
+
+        with contextlib.redirect_stdout(output):
+            self.bridge.initialize()
+            for kind, payload in read_trace(path):
+                if kind == REC_UPDATE:
+                    start = time.perf_counter_ns()
+                    self.bridge.update_game(payload)
+                    frame_times.record(time.perf_counter_ns() - start)
+                elif kind == REC_COMMAND:
+                    self.bridge.process_input(payload)
+                    commands += 1
+                elif kind == REC_END:
+                    expected = payload
+
+        digest = compute_state_hash(self.bridge.logic)
+        ms = 1e-6
+        return {
+            "path": path,
+            "frames": frame_times.total,
+            "commands": commands,
+            "complete": expected is not None,
+            "hash_match": expected is not None and expected[1] == digest,
+            "state_hash": digest.hex(),
+            "total_s": time.perf_counter() - wall_start,
+            "frame_mean_ms": frame_times.mean() * ms,
+            "frame_p50_ms": frame_times.percentile(50) * ms,
+            "frame_p95_ms": frame_times.percentile(95) * ms,
+            "frame_p99_ms": frame_times.percentile(99) * ms,
+            "frame_max_ms": frame_times.max * ms
+        }
+
+
+def main(argv=None) -> int:
+    """命令行入口 - 每条轨迹在独立的新世界中回放"""
+    parser = argparse.ArgumentParser(description="回放录制的游戏轨迹并校验状态哈希")
+    parser.add_argument("traces", nargs="+", help="轨迹文件")
+    parser.add_argument("--quiet", action="store_true", help="屏蔽游戏日志输出")
+    args = parser.parse_args(argv)
+
+    from .bridge import GodotBridge
+    from .game_logic import create_world, destroy_world
+    from .sim_host import MODE_IN_PROCESS
+
+    failed = 0
+    for trace in args.traces:
+        world = create_world()
+        try:
+            report = TraceReplayer(
+                GodotBridge(mode=MODE_IN_PROCESS, world_id=world.world_id)).run(trace, args.quiet)
+        finally:
+            destroy_world(world.world_id)
+        for key, value in report.items():
+            print(f"{key}: {value}")
+        if report["hash_match"]:
+            print("✅ 状态哈希一致")
+        else:
+            print("❌ 状态哈希不一致")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Python桥接模块 - 采样分析器
+后台线程定时采样所有线程的调用栈，输出火焰图工具使用的折叠栈文本
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Any, Optional
+
+
+# 默认采样间隔（秒）
+DEFAULT_INTERVAL = 0.005
+# 默认与最大采样时长（秒），超时自动停止
+DEFAULT_DURATION = 30.0
+MAX_DURATION = 300.0
+# 不同调用栈的数量上限，超出后归入 [truncated]
+MAX_UNIQUE_STACKS = 20000
+# 单个调用栈的最大深度
+MAX_STACK_DEPTH = 128
+
+
+class StackSampler:
+    """调用栈采样器
+
+    只在采样窗口内运行一个后台线程，读取 sys._current_frames()，
+    不安装 settrace/setprofile 钩子，未启动时没有任何开销，可保留在发布版本中。
+    """
+
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.interval = DEFAULT_INTERVAL
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = DEFAULT_INTERVAL,
+              duration: float = DEFAULT_DURATION) -> bool:
+        """开始采样"""
+        if self.is_running:
+            print("采样分析器已在运行")
+            return False
+        self.interval = max(0.001, interval)
+        duration = min(max(duration, self.interval), MAX_DURATION)
+        with self._lock:
+            self.stacks = Counter()
+            self.sample_count = 0
+        self._stop_event.clear()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration,), name="StackSampler", daemon=True)
+        self._thread.start()
+        print(f"采样分析开始: 间隔 {self.interval * 1000:.1f}ms, 最长 {duration:.0f}s")
+        return True
+
+    def stop(self) -> bool:
+        """停止采样"""
+        if self._thread is None:
+            return False
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        return True
+
+    def _run(self, duration: float):
+        """采样线程主循环"""
+        own_id = threading.get_ident()
+        deadline = self.started_at + duration
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            self._sample(own_id)
+            self._stop_event.wait(self.interval)
+        self.elapsed = time.monotonic() - self.started_at
+
+    def _sample(self, own_id: int):
+        """采样一次所有线程"""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        frames = sys._current_frames()
+        collected = []
+        for thread_id, frame in frames.items():
+            if thread_id == own_id:
+                continue
+            parts = []
+            depth = 0
+            while frame is not None and depth < MAX_STACK_DEPTH:
+                code = frame.f_code
+                parts.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+                depth += 1
+            parts.append(names.get(thread_id, f"thread-{thread_id}"))
+            parts.reverse()
+            collected.append(";".join(parts))
+        del frames
+
+        with self._lock:
+            for stack in collected:
+                if stack not in self.stacks and len(self.stacks) >= MAX_UNIQUE_STACKS:
+                    stack = "[truncated]"
+                self.stacks[stack] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """折叠栈文本（每行: 帧1;帧2;...;帧N 次数），可直接用于 flamegraph.pl / speedscope"""
+        with self._lock:
+            items = sorted(self.stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """按自身采样数排序的热点函数"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        with self._lock:
+            items = list(self.stacks.items())
+        total = sum(count for _, count in items) or 1
+        for stack, count in items:
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        return [
+            {
+                "function": function,
+                "self_samples": count,
+                "self_percent": count * 100.0 / total,
+                "total_samples": total_counts[function],
+                "total_percent": total_counts[function] * 100.0 / total
+            }
+            for function, count in self_counts.most_common(limit)
+        ]
+
+    def write_collapsed(self, path: str):
+        """写出折叠栈文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+
+    def get_summary(self, limit: int = 20) -> Dict[str, Any]:
+        """获取采样摘要"""
+        return {
+            "running": self.is_running,
+            "samples": self.sample_count,
+            "unique_stacks": len(self.stacks),
+            "interval_ms": self.interval * 1000,
+            "duration_s": self.elapsed if not self.is_running else time.monotonic() - self.started_at,
+            "top_functions": self.top_functions(limit)
+        }
@@ -0,0 +1,144 @@
+"""
+Python桥接模块 - 帧更新调度
+每个子系统阶段声明读写的状态集合，按声明顺序建立依赖: 后声明的阶段与先声明的阶段
+存在写-写、读-写或写-读冲突时必须在其之后执行。无依赖的阶段分到同一批，
+并行模式下同一批阶段交给线程池同时执行（NumPy等释放GIL的阶段才有实际收益）。
+每个阶段只在其所有依赖完成后才开始，结果与按声明顺序串行执行一致。
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+    from .perf import TickProfiler
+
+
+# 并行工作线程数，0或1为串行执行，可通过环境变量切换
+DEFAULT_TICK_WORKERS = int(os.environ.get("MAZEMASTER_TICK_WORKERS", "0") or 0)
+
+
+@dataclass
+class Phase:
+    """更新阶段"""
+    name: str
+    func: Callable[[float], Any]
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+    wave: int = 0
+
+    def conflicts_with(self, other: 'Phase') -> bool:
+        """两个阶段是否不能同时执行"""
+        return bool(self.writes & (other.reads | other.writes) or self.reads & other.writes)
+
+
+class TickScheduler:
+    """帧更新调度器
+
+    阶段按声明顺序登记，登记时即算出所在批次（依赖阶段的最大批次 + 1）。
+    并行模式下批次内的阶段提交到线程池，整批完成后再执行下一批；
+    异常在整批结束后按声明顺序抛出第一个。
+    """
+
+    def __init__(self, workers: int = DEFAULT_TICK_WORKERS):
+        self.phases: List[Phase] = []
+        self._waves: List[List[Phase]] = []
+        self.workers = max(0, workers)
+        self._executor: Optional['ThreadPoolExecutor'] = None
+        # 上一帧各阶段耗时（纳秒）
+        self.last_ns: Dict[str, int] = {}
+        self.ticks = 0
+
+    def __getstate__(self):
+        # 线程池属于原进程，迁移后首次并行执行时重建
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    @property
+    def parallel(self) -> bool:
+        """是否并行执行"""
+        return self.workers > 1
+
+    def add_phase(self, name: str, func: Callable[[float], Any],
+                  reads: Iterable[str] = (), writes: Iterable[str] = ()) -> Phase:
+        """登记阶段（func 接受 delta）"""
+        phase = Phase(name, func, frozenset(reads), frozenset(writes))
+        phase.wave = 1 + max((p.wave for p in self.phases if phase.conflicts_with(p)),
+                             default=-1)
+        self.phases.append(phase)
+        while len(self._waves) <= phase.wave:
+            self._waves.append([])
+        self._waves[phase.wave].append(phase)
+        return phase
+
+    def set_workers(self, workers: int):
+        """设置并行工作线程数（0或1切回串行）"""
+        workers = max(0, workers)
+        if workers == self.workers:
+            return
+        self.shutdown()
+        self.workers = workers
+
+    def shutdown(self):
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def run(self, delta: float, profiler: Optional['TickProfiler'] = None):
+        """执行一帧: 性能统计开启时把各阶段耗时记入 profiler"""
+        start = time.perf_counter_ns()
+        if self.parallel:
+            self._run_parallel(delta)
+            if profiler is not None:
+                # 并行时进程级的分配块计数无法归属到单个阶段，只记录耗时
+                for phase in self.phases:
+                    profiler.record(phase.name, self.last_ns[phase.name])
+        else:
+            for phase in self.phases:
+                t = time.perf_counter_ns()
+                if profiler is not None:
+                    profiler.measure(phase.name, phase.func, delta)
+                else:
+                    phase.func(delta)
+                self.last_ns[phase.name] = time.perf_counter_ns() - t
+        if profiler is not None:
+            profiler.record("tick", time.perf_counter_ns() - start)
+        self.ticks += 1
+
+    def _run_parallel(self, delta: float):
+        if self._executor is None:
+            # 线程池只在并行模式下使用，首次并行执行时再导入
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="tick")
+        for wave in self._waves:
+            if len(wave) == 1:
+                self._run_phase(wave[0], delta)
+                continue
+            futures = [self._executor.submit(self._run_phase, phase, delta)
+                       for phase in wave]
+            errors = [future.exception() for future in futures]
+            for error in errors:
+                if error is not None:
+                    raise error
+
+    def _run_phase(self, phase: Phase, delta: float):
+        t = time.perf_counter_ns()
+        try:
+            phase.func(delta)
+        finally:
+            self.last_ns[phase.name] = time.perf_counter_ns() - t
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取调度统计: 批次划分和上一帧各阶段耗时"""
+        return {
+            "parallel": self.parallel,
+            "workers": self.workers,
+            "ticks": self.ticks,
+            "waves": [[phase.name for phase in wave] for wave in self._waves],
+            "last_ms": {name: ns * 1e-6 for name, ns in self.last_ns.items()}
+        }
@@ -0,0 +1,462 @@
+"""
+Python桥接模块 - 独立进程模拟宿主
+GameLogic 在子进程中运行，命令通过共享内存环形缓冲区传入，
+实体状态通过共享内存双缓冲传出，渲染端直接读取最近完成的一帧。
+状态帧布局: [帧头][角色打包数组 positions/transforms/health_ratios/type_ids][其余状态的pickle]，
+角色数组直接以 memoryview 读取，不经过 pickle。
+multiprocessing 只在创建共享内存/子进程时导入，桥接读取模式常量不会加载它。
+"""
+
+import pickle
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 模拟模式
+MODE_IN_PROCESS = "in_process"
+MODE_OUT_OF_PROCESS = "out_of_process"
+
+# 默认缓冲区大小
+COMMAND_RING_SIZE = 1 << 20
+REPLY_RING_SIZE = 1 << 20
+STATE_BUFFER_SIZE = 8 << 20
+
+# 同步调用等待超时（秒）
+CALL_TIMEOUT = 5.0
+
+# 只读查询的方法名前缀（不改变状态帧内容，调用后无需重新发布状态）
+READ_ONLY_PREFIXES = ("get_", "is_", "are_", "can_", "count_", "query_")
+
+# 状态帧头: 打包数组版本号, 角色槽位数, 其余状态的字节数
+FRAME_HEADER = struct.Struct("<QII")
+# 帧内角色打包数组: (名称, 每槽位分量数, 元素格式)，与 packed.TransformBuffer 一致
+FRAME_ARRAYS = (
+    ("positions", 3, 'f'),
+    ("transforms", 12, 'f'),
+    ("health_ratios", 1, 'f'),
+    ("type_ids", 1, 'i')
+)
+# 数组元素字节数（float32/int32）
+FRAME_ITEM_SIZE = 4
+
+# 消息类型
+MSG_UPDATE = 0
+MSG_CALL = 1
+MSG_STOP = 2
+MSG_REPLY = 3
+MSG_EVENT = 4
+
+
+def _u64_view(buf: memoryview, offset: int, count: int) -> memoryview:
+    """共享内存中 count 个 u64 的视图（offset 需8字节对齐）"""
+    return buf[offset:offset + 8 * count].cast('Q')
+
+
+class SharedRing:
+    """共享内存单生产者单消费者环形缓冲区
+
+    读写位置都是单调递增的64位计数，分别只由消费者和生产者写入，
+    先写消息体再发布写位置，因此无需加锁。消息格式为 [u32长度][数据]。
+    """
+
+    _POSITIONS = struct.Struct("<QQ")
+    _LENGTH = struct.Struct("<I")
+    _HEAD = 0
+    _TAIL = 1
+
+    def __init__(self, name: Optional[str] = None, size: int = COMMAND_RING_SIZE):
+        from multiprocessing import shared_memory
+        create = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=self._POSITIONS.size + size if create else 0)
+        self.capacity = self.shm.size - self._POSITIONS.size
+        self.buf = self.shm.buf
+        # 读写位置按 u64 视图逐个赋值，每次是一次对齐的8字节写入；
+        # struct.pack_into 会先把目标区域清零再写，另一端可能读到0
+        self._words = _u64_view(self.buf, 0, 2)
+        if create:
+            self._words[self._HEAD] = 0
+            self._words[self._TAIL] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _positions(self) -> Tuple[int, int]:
+        return self._words[self._HEAD], self._words[self._TAIL]
+
+    def _copy_in(self, offset: int, data: bytes):
+        """写入数据，处理环绕"""
+        base = self._POSITIONS.size
+        start = offset % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.buf[base + start:base + start + first] = data[:first]
+        if first < len(data):
+            self.buf[base:base + len(data) - first] = data[first:]
+
+    def _copy_out(self, offset: int, length: int) -> bytes:
+        """读取数据，处理环绕"""
+        base = self._POSITIONS.size
+        start = offset % self.capacity
+        first = min(length, self.capacity - start)
+        data = bytes(self.buf[base + start:base + start + first])
+        if first < length:
+            data += bytes(self.buf[base:base + length - first])
+        return data
+
+    def push(self, payload: bytes) -> bool:
+        """生产者写入一条消息，空间不足时返回False"""
+        head, tail = self._positions()
+        needed = self._LENGTH.size + len(payload)
+        if needed > self.capacity - (tail - head):
+            return False
+        self._copy_in(tail, self._LENGTH.pack(len(payload)))
+        self._copy_in(tail + self._LENGTH.size, payload)
+        # 最后发布写位置
+        self._words[self._TAIL] = tail + needed
+        return True
+
+    def is_empty(self) -> bool:
+        """是否没有待读取的消息"""
+        head, tail = self._positions()
+        return head == tail
+
+    def pop(self) -> Optional[bytes]:
+        """消费者读取一条消息，无消息时返回None"""
+        head, tail = self._positions()
+        if head == tail:
+            return None
+        (length,) = self._LENGTH.unpack(self._copy_out(head, self._LENGTH.size))
+        payload = self._copy_out(head + self._LENGTH.size, length)
+        self._words[self._HEAD] = head + self._LENGTH.size + length
+        return payload
+
+    def close(self, unlink: bool = False):
+        """释放共享内存"""
+        self._words.release()
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class StateDoubleBuffer:
+    """共享内存双缓冲 - 模拟端写后台缓冲后翻转，渲染端读取已发布的一帧
+
+    每个缓冲带序号（顺序锁），写入期间序号为奇数；读取方完成使用后
+    调用 is_valid 确认该帧未被覆盖，读取本身不拷贝数据。
+    """
+
+    # 控制区: [已发布帧号, 已发布缓冲下标]；每个缓冲头: [缓冲序号, 数据长度]，均为u64
+    _HEADER_SIZE = 16
+    _FRAME = 0
+    _INDEX = 1
+    _SEQ = 0
+    _LENGTH = 1
+
+    def __init__(self, name: Optional[str] = None, size: int = STATE_BUFFER_SIZE):
+        from multiprocessing import shared_memory
+        create = name is None
+        total = self._HEADER_SIZE + 2 * (self._HEADER_SIZE + size)
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=total if create else 0)
+        # 缓冲容量按8字节对齐，保证两个缓冲头都是对齐的u64
+        self.slot_capacity = ((self.shm.size - self._HEADER_SIZE) // 2
+                              - self._HEADER_SIZE) & ~7
+        self.buf = self.shm.buf
+        self._control = _u64_view(self.buf, 0, 2)
+        self._slots = [_u64_view(self.buf, self._slot_offset(index), 2) for index in (0, 1)]
+        if create:
+            for words in (self._control, *self._slots):
+                words[0] = 0
+                words[1] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _slot_offset(self, index: int) -> int:
+        return self._HEADER_SIZE + index * (self._HEADER_SIZE + self.slot_capacity)
+
+    def write(self, *parts) -> bool:
+        """按顺序写入各部分（bytes/array等缓冲对象）组成的新一帧并发布"""
+        views = [memoryview(part).cast('B') for part in parts]
+        try:
+            length = sum(view.nbytes for view in views)
+            if length > self.slot_capacity:
+                print(f"状态帧过大: {length} > {self.slot_capacity}")
+                return False
+            frame = self._control[self._FRAME]
+            index = 1 - self._control[self._INDEX]
+            slot = self._slots[index]
+            seq = slot[self._SEQ]
+
+            # 序号置为奇数表示正在写入
+            slot[self._SEQ] = seq + 1
+            slot[self._LENGTH] = length
+            offset = self._slot_offset(index) + self._HEADER_SIZE
+            for view in views:
+                self.buf[offset:offset + view.nbytes] = view
+                offset += view.nbytes
+            slot[self._SEQ] = seq + 2
+        finally:
+            # 释放对打包数组的引用，否则数组无法扩容
+            for view in views:
+                view.release()
+
+        # 先切换下标再增加帧号: 读到新帧号时下标一定已是新的
+        self._control[self._INDEX] = index
+        self._control[self._FRAME] = frame + 1
+        return True
+
+    def read(self) -> Tuple[int, Optional[memoryview], Tuple[int, int]]:
+        """读取最近发布的一帧，返回 (帧号, 数据视图, 校验令牌)"""
+        frame = self._control[self._FRAME]
+        index = self._control[self._INDEX]
+        if frame == 0:
+            return 0, None, (index, 0)
+        slot = self._slots[index]
+        seq = slot[self._SEQ]
+        length = slot[self._LENGTH]
+        if seq % 2 == 1 or length > self.slot_capacity:
+            return frame, None, (index, seq)
+        data_offset = self._slot_offset(index) + self._HEADER_SIZE
+        return frame, self.buf[data_offset:data_offset + length], (index, seq)
+
+    def is_valid(self, token: Tuple[int, int]) -> bool:
+        """检查读取的帧在使用期间是否被覆盖"""
+        index, seq = token
+        return self._slots[index][self._SEQ] == seq and seq % 2 == 0
+
+    def close(self, unlink: bool = False):
+        """释放共享内存"""
+        for words in (self._control, *self._slots):
+            words.release()
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _frame_parts(local) -> tuple:
+    """构建状态帧的各部分: 帧头、角色打包数组（直接引用，不拷贝）、其余状态"""
+    packed = local.logic.character_transforms
+    meta = pickle.dumps(local.build_state_snapshot(include_characters=False),
+                        pickle.HIGHEST_PROTOCOL)
+    header = FRAME_HEADER.pack(packed.version, packed.count, len(meta))
+    return (header,) + tuple(getattr(packed, name) for name, _, _ in FRAME_ARRAYS) + (meta,)
+
+
+def _meta_offset(count: int) -> int:
+    """帧内其余状态的起始位置"""
+    return FRAME_HEADER.size + sum(
+        count * stride * FRAME_ITEM_SIZE for _, stride, _ in FRAME_ARRAYS)
+
+
+def _host_main(command_name: str, reply_name: str, state_name: str):
+    """子进程入口 - 运行进程内模式的桥接并发布状态"""
+    from .bridge import GodotBridge
+
+    # 共享内存由父进程创建和回收，子进程只挂载
+    commands = SharedRing(command_name)
+    replies = SharedRing(reply_name)
+    state = StateDoubleBuffer(state_name)
+
+    local = GodotBridge(mode=MODE_IN_PROCESS)
+    outbox: List[bytes] = []
+
+    def forward_event(name: str, *args, **kwargs):
+        outbox.append(pickle.dumps((MSG_EVENT, name, args, kwargs),
+                                   pickle.HIGHEST_PROTOCOL))
+
+    forwarding = False
+
+    running = True
+    state_dirty = False
+    while running:
+        payload = commands.pop()
+        if payload is None:
+            time.sleep(0.0005)
+            continue
+
+        message = pickle.loads(payload)
+        kind = message[0]
+        if kind == MSG_UPDATE:
+            local.update_game(message[1])
+            state_dirty = True
+        elif kind == MSG_CALL:
+            _, seq, method, args, kwargs = message
+            if method == "register_callback":
+                # Godot回调留在父进程，子进程把合并后的全部事件转发，由父进程匹配订阅
+                if not forwarding:
+                    local.events.subscribe("*", forward_event, with_topic=True)
+                    forwarding = True
+                result = None
+            else:
+                try:
+                    result = getattr(local, method)(*args, **kwargs)
+                except Exception as e:
+                    print(f"模拟进程执行 {method} 时发生错误: {e}")
+                    result = None
+            if method != "register_callback" and not method.startswith(READ_ONLY_PREFIXES):
+                # 修改状态的调用先发布状态帧再回复，调用返回后读取的状态帧已包含本次修改
+                state.write(*_frame_parts(local))
+                state_dirty = False
+            outbox.append(pickle.dumps((MSG_REPLY, seq, result),
+                                       pickle.HIGHEST_PROTOCOL))
+        elif kind == MSG_STOP:
+            running = False
+
+        # 只读调用的回复不必等待状态帧的构建
+        while outbox:
+            if not replies.push(outbox[0]):
+                time.sleep(0.0005)
+                continue
+            outbox.pop(0)
+
+        # 积压的命令处理完后再发布一帧，落后时合并多次更新
+        if state_dirty and commands.is_empty():
+            state.write(*_frame_parts(local))
+            state_dirty = False
+
+    commands.close()
+    replies.close()
+    state.close()
+
+
+class SimulationHost:
+    """父进程侧的模拟宿主 - 启动子进程并收发命令与状态"""
+
+    def __init__(self, command_size: int = COMMAND_RING_SIZE,
+                 reply_size: int = REPLY_RING_SIZE, state_size: int = STATE_BUFFER_SIZE,
+                 python_executable: Optional[str] = None):
+        self.commands = SharedRing(size=command_size)
+        self.replies = SharedRing(size=reply_size)
+        self.state = StateDoubleBuffer(size=state_size)
+        self.events: List[Tuple[str, tuple, dict]] = []
+        self._results: Dict[int, Any] = {}
+        self._seq = 0
+        self._cached_frame = -1
+        self._cached_state: Dict[str, Any] = {}
+
+        import multiprocessing
+        context = multiprocessing.get_context("spawn")
+        if python_executable:
+            # 嵌入Godot时 sys.executable 不是Python解释器，需要显式指定
+            context.set_executable(python_executable)
+        self.process = context.Process(
+            target=_host_main,
+            args=(self.commands.name, self.replies.name, self.state.name),
+            daemon=True)
+
+    def start(self):
+        """启动模拟进程"""
+        self.process.start()
+        print(f"模拟进程已启动: pid={self.process.pid}")
+
+    def stop(self):
+        """停止模拟进程并释放共享内存"""
+        if self.process.is_alive():
+            self._send((MSG_STOP,))
+            self.process.join(timeout=CALL_TIMEOUT)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.commands.close(unlink=True)
+        self.replies.close(unlink=True)
+        self.state.close(unlink=True)
+        print("模拟进程已停止")
+
+    def _send(self, message: tuple) -> bool:
+        payload = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+        if not self.commands.push(payload):
+            print("模拟命令队列已满，命令被丢弃")
+            return False
+        return True
+
+    def send_update(self, delta: float) -> bool:
+        """提交一帧更新，不等待完成"""
+        return self._send((MSG_UPDATE, delta))
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """同步调用模拟进程中桥接的方法"""
+        self._seq += 1
+        seq = self._seq
+        if not self._send((MSG_CALL, seq, method, args, kwargs)):
+            return None
+        deadline = time.monotonic() + CALL_TIMEOUT
+        while seq not in self._results:
+            if not self.poll():
+                if time.monotonic() > deadline or not self.process.is_alive():
+                    print(f"模拟进程调用超时: {method}")
+                    return None
+                time.sleep(0.0002)
+        return self._results.pop(seq)
+
+    def poll(self) -> bool:
+        """读取回复和事件，返回是否读到消息"""
+        received = False
+        while True:
+            payload = self.replies.pop()
+            if payload is None:
+                return received
+            received = True
+            message = pickle.loads(payload)
+            if message[0] == MSG_REPLY:
+                self._results[message[1]] = message[2]
+            elif message[0] == MSG_EVENT:
+                self.events.append(message[1:])
+
+    def take_events(self) -> List[Tuple[str, tuple, dict]]:
+        """取出待派发的事件"""
+        events, self.events = self.events, []
+        return events
+
+    def read_frame(self) -> Tuple[int, Optional[memoryview], Tuple[int, int]]:
+        """零拷贝读取最近完成的一帧，使用完后用 state.is_valid(token) 校验"""
+        return self.state.read()
+
+    def read_entities(self) -> Tuple[Optional[Dict[str, Any]], Tuple[int, int]]:
+        """零拷贝读取最近完成一帧的角色打包数组，返回 (数组, 校验令牌)
+
+        positions/transforms/health_ratios 为 float32 的 memoryview，type_ids 为 int32，
+        直接指向共享内存。调用方用完后必须逐个 release()（否则共享内存无法关闭），
+        并用 state.is_valid(token) 确认读取期间该帧未被覆盖。
+        """
+        frame, view, token = self.state.read()
+        if view is None:
+            return None, token
+        try:
+            version, count, _ = FRAME_HEADER.unpack_from(view)
+            entities: Dict[str, Any] = {"frame": frame, "count": count, "version": version}
+            offset = FRAME_HEADER.size
+            for name, stride, fmt in FRAME_ARRAYS:
+                size = count * stride * FRAME_ITEM_SIZE
+                entities[name] = view[offset:offset + size].cast(fmt)
+                offset += size
+        finally:
+            view.release()
+        return entities, token
+
+    def read_state(self) -> Dict[str, Any]:
+        """读取并解码最近完成一帧的其余状态（不含角色数组），同一帧只解码一次"""
+        for _ in range(3):
+            frame, view, token = self.state.read()
+            if frame == self._cached_frame:
+                return self._cached_state
+            if view is None:
+                return self._cached_state
+            try:
+                _, count, meta_length = FRAME_HEADER.unpack_from(view)
+                offset = _meta_offset(count)
+                snapshot = pickle.loads(view[offset:offset + meta_length])
+            except Exception:
+                # 读取期间该帧被覆盖，重试
+                snapshot = None
+            finally:
+                view.release()
+            if snapshot is not None and self.state.is_valid(token):
+                self._cached_frame = frame
+                self._cached_state = snapshot
+                return snapshot
+        return self._cached_state
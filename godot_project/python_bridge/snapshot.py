@@ -0,0 +1,298 @@
+"""
+Python桥接模块 - 世界快照与后台存档
+存档需要的建筑/角色数据以不可变记录保存在分页的写时复制表中:
+角色和建筑在修改处（移动、受伤、建造等）标记为脏，拍快照时只重算脏记录，
+再复制页表（每页256条记录）；快照引用的页在下次写入时才复制。
+主线程的停顿为 O(脏记录 + 页数)，与世界规模基本无关。
+快照按提交顺序交给后台线程编码JSON、fsync并原子替换存档文件，完成结果由主线程在帧边界取回。
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from .entities import handle_index
+
+if TYPE_CHECKING:
+    from .entities import EntityPool
+    from .game_logic import BuildingData, CharacterData
+
+
+# 每页记录数 = 1 << PAGE_SHIFT
+PAGE_SHIFT = 8
+
+Page = Dict[int, tuple]
+Pages = Dict[int, Page]
+
+
+class CowTable:
+    """分页写时复制表: 非负整数键 -> 不可变记录"""
+
+    def __init__(self):
+        self._pages: Pages = {}
+        # 被快照引用的页，写入前先复制
+        self._shared: Set[int] = set()
+        self.copied_pages = 0
+
+    def _writable_page(self, page_id: int) -> Page:
+        page = self._pages.get(page_id)
+        if page is None:
+            page = self._pages[page_id] = {}
+        elif page_id in self._shared:
+            page = self._pages[page_id] = dict(page)
+            self._shared.discard(page_id)
+            self.copied_pages += 1
+        return page
+
+    def get(self, key: int) -> Optional[tuple]:
+        page = self._pages.get(key >> PAGE_SHIFT)
+        return page.get(key) if page is not None else None
+
+    def set(self, key: int, row: tuple):
+        self._writable_page(key >> PAGE_SHIFT)[key] = row
+
+    def delete(self, key: int):
+        page_id = key >> PAGE_SHIFT
+        if key in self._pages.get(page_id, ()):
+            del self._writable_page(page_id)[key]
+
+    def freeze(self) -> Pages:
+        """冻结当前内容: 只复制页表，O(页数)"""
+        self._shared = set(self._pages)
+        return dict(self._pages)
+
+
+def iter_rows(pages: Pages) -> Iterator[tuple]:
+    """按键顺序遍历冻结的页"""
+    for page_id in sorted(pages):
+        page = pages[page_id]
+        for key in sorted(page):
+            yield page[key]
+
+
+@dataclass
+class WorldSnapshot:
+    """世界快照（只含不可变数据，可安全地交给后台线程）"""
+    game_time: float
+    resources: Dict[str, int]
+    buildings: Pages
+    characters: Pages
+    dirty_rows: int = 0
+    stall_seconds: float = 0.0
+
+    def to_save_data(self) -> Dict[str, Any]:
+        """转换为存档格式（与 GameLogic.save_game 一致）"""
+        return {
+            "game_time": self.game_time,
+            "resources": self.resources,
+            "buildings": [
+                {
+                    "type": building_type,
+                    "position": {"x": x, "y": y, "z": z},
+                    "health": health,
+                    "is_built": is_built
+                }
+                for building_type, x, y, z, health, is_built in iter_rows(self.buildings)
+            ],
+            "characters": [
+                {
+                    "type": character_type,
+                    "position": {"x": x, "y": y, "z": z},
+                    "health": health,
+                    "is_alive": is_alive
+                }
+                for _, character_type, x, y, z, health, is_alive in iter_rows(self.characters)
+            ]
+        }
+
+
+class SnapshotTracker:
+    """存档记录的写屏障
+
+    角色记录按句柄槽位为键（与打包缓冲一致），建筑记录按登记顺序为键。
+    """
+
+    def __init__(self):
+        self.characters = CowTable()
+        self.buildings = CowTable()
+        self._dirty_characters: Set[int] = set()
+        self._building_objects: Dict[int, 'BuildingData'] = {}
+        self._building_keys: Dict[int, int] = {}
+        self._dirty_buildings: Set[int] = set()
+
+    def __setstate__(self, state):
+        # 反序列化（世界迁移）后对象标识改变，重建建筑的对象 -> 键映射
+        self.__dict__.update(state)
+        self._building_keys = {id(b): key for key, b in self._building_objects.items()}
+
+    def mark_character(self, handle: int):
+        """角色存档数据变化（召唤、移除、移动、受伤）"""
+        self._dirty_characters.add(handle)
+
+    def mark_building(self, building: 'BuildingData'):
+        """建筑存档数据变化（首次标记时登记）"""
+        key = self._building_keys.get(id(building))
+        if key is None:
+            key = len(self._building_objects)
+            self._building_keys[id(building)] = key
+            self._building_objects[key] = building
+        self._dirty_buildings.add(key)
+
+    def take(self, game_time: float, resources: Dict[str, int],
+             characters: 'EntityPool[CharacterData]') -> WorldSnapshot:
+        """重算脏记录并冻结，返回快照"""
+        start = time.perf_counter()
+        dirty = len(self._dirty_characters) + len(self._dirty_buildings)
+
+        for handle in self._dirty_characters:
+            slot = handle_index(handle)
+            character = characters.get(handle)
+            if character is not None:
+                p = character.position
+                self.characters.set(slot, (handle, character.type.value, p.x, p.y, p.z,
+                                           character.health, character.is_alive))
+            else:
+                # 槽位可能已被新角色复用，只删除属于该句柄的记录
+                row = self.characters.get(slot)
+                if row is not None and row[0] == handle:
+                    self.characters.delete(slot)
+        self._dirty_characters = set()
+
+        for key in self._dirty_buildings:
+            b = self._building_objects[key]
+            p = b.position
+            self.buildings.set(key, (b.type.value, p.x, p.y, p.z, b.health, b.is_built))
+        self._dirty_buildings = set()
+
+        return WorldSnapshot(
+            game_time=game_time,
+            resources=dict(resources),
+            buildings=self.buildings.freeze(),
+            characters=self.characters.freeze(),
+            dirty_rows=dirty,
+            stall_seconds=time.perf_counter() - start)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取快照统计"""
+        return {
+            "dirty_characters": len(self._dirty_characters),
+            "dirty_buildings": len(self._dirty_buildings),
+            "copied_pages": self.characters.copied_pages + self.buildings.copied_pages
+        }
+
+
+def write_save(data: Dict[str, Any], filename: str):
+    """写入存档: 先写同目录下的唯一临时文件并 fsync，再原子替换，中途崩溃不会留下半个存档"""
+    # tempfile 会连带导入 random/shutil，只在存档时导入
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp = tempfile.mkstemp(prefix=os.path.basename(filename) + ".", suffix=".tmp",
+                                dir=directory)
+    try:
+        # mkstemp 创建的文件只有属主可读写，沿用原存档（或普通新文件）的权限
+        try:
+            mode = os.stat(filename).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # json.dump 分块编码，后台线程编码时主线程仍按GIL切换间隔运行
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, filename)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class SaveWriter:
+    """后台存档: 存档按提交顺序排队，由一个后台线程依次写入，完成结果由主线程取回
+
+    队列为空时后台线程退出，下次提交时再启动，同一时间最多一个写入线程。
+    """
+
+    def __init__(self, writer: Callable[[Dict[str, Any], str], None] = write_save):
+        self._writer = writer
+        self._ids = 0
+        self._pending: Dict[int, str] = {}
+        self._completed: Deque[Dict[str, Any]] = deque()
+        self._queue: Deque[Tuple[int, WorldSnapshot, str]] = deque()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def __getstate__(self):
+        # 进行中的存档属于原进程，不随世界迁移
+        state = self.__dict__.copy()
+        state["_pending"] = {}
+        state["_completed"] = deque()
+        state["_queue"] = deque()
+        state["_running"] = False
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def start(self, snapshot: WorldSnapshot, filename: str) -> int:
+        """提交后台写入，返回存档ID"""
+        self._ids += 1
+        save_id = self._ids
+        self._pending[save_id] = filename
+        with self._lock:
+            self._queue.append((save_id, snapshot, filename))
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._drain, name="save-writer", daemon=True).start()
+        return save_id
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._running = False
+                    return
+                save_id, snapshot, filename = self._queue.popleft()
+            self._run(save_id, snapshot, filename)
+
+    def _run(self, save_id: int, snapshot: WorldSnapshot, filename: str):
+        start = time.perf_counter()
+        result = {"id": save_id, "filename": filename, "ok": True, "error": "",
+                  "stall_ms": snapshot.stall_seconds * 1000.0}
+        try:
+            self._writer(snapshot.to_save_data(), filename)
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = str(e)
+        result["write_ms"] = (time.perf_counter() - start) * 1000.0
+        # deque.append 是原子操作，主线程在 poll 中取走
+        self._completed.append(result)
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """取回已完成的存档"""
+        results = []
+        while self._completed:
+            result = self._completed.popleft()
+            self._pending.pop(result["id"], None)
+            results.append(result)
+        return results
+
+    @property
+    def pending(self) -> int:
+        """进行中的存档数"""
+        return len(self._pending)
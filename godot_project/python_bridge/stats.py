@@ -0,0 +1,160 @@
+"""
+Python桥接模块 - 属性与成本表
+从配置文件加载建筑/角色的属性和成本，加载时编译为按枚举下标索引的行，
+生成实体时只需一次整行拷贝。配置文件修改后按修改时间自动热重载，
+所有 GameLogic 实例共享同一份表。
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game_logic import ResourceType, BuildingType, CharacterType
+
+
+# 默认配置文件，可通过环境变量指定其他文件
+DEFAULT_STATS_PATH = os.environ.get(
+    "MAZEMASTER_STATS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats.json"))
+# 检查配置文件修改时间的最小间隔（秒）
+RELOAD_CHECK_INTERVAL = 1.0
+
+# 未配置的属性使用的默认值（与数据类默认值一致）
+_BUILDING_DEFAULTS = {"health": 100}
+_CHARACTER_DEFAULTS = {"health": 100, "speed": 2.0, "attack_damage": 10, "defense": 5}
+_BUILDING_KEYS = {"cost", "health", "production", "storage"}
+_CHARACTER_KEYS = {"cost", "health", "speed", "attack_damage", "defense"}
+
+# 角色属性行: (health, max_health, speed, attack_damage, defense)
+CharacterRow = Tuple[int, int, float, int, int]
+# 建筑属性行: (health, max_health, ((资源, 产出速率), ...), ((资源, 容量), ...))
+BuildingRow = Tuple[int, int, Tuple[Tuple['ResourceType', float], ...], Tuple[Tuple['ResourceType', int], ...]]
+
+
+class StatRegistry:
+    """属性与成本表
+
+    building_rows / character_rows 按枚举定义顺序索引；
+    building_costs / character_costs 与原先的成本字典结构相同，只读共享。
+    重载时整体替换这些属性，读取方不会看到半更新的表。
+    """
+
+    def __init__(self, path: str = DEFAULT_STATS_PATH):
+        self.path = path
+        self.version = 0
+        self.building_rows: List[BuildingRow] = []
+        self.character_rows: List[CharacterRow] = []
+        self.building_costs: Dict['BuildingType', Dict['ResourceType', int]] = {}
+        self.character_costs: Dict['CharacterType', Dict['ResourceType', int]] = {}
+        self._mtime: Optional[int] = None
+        self._next_check = 0.0
+        self.load()
+
+    def __reduce__(self):
+        # 序列化（世界迁移）后仍指向目标进程中共享的表
+        return get_stat_registry, (self.path,)
+
+    def load(self):
+        """加载并编译配置文件，格式错误时抛出 ValueError"""
+        mtime = os.stat(self.path).st_mtime_ns
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"属性配置格式错误: {e}") from None
+        compiled = self._compile(config)
+        (self.building_rows, self.character_rows,
+         self.building_costs, self.character_costs) = compiled
+        self._mtime = mtime
+        self.version += 1
+
+    def poll(self) -> bool:
+        """配置文件修改后重新加载（限频检查），返回是否已重载"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + RELOAD_CHECK_INTERVAL
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        # 记录本次看到的修改时间，重载失败时不会每秒重复报错
+        self._mtime = mtime
+        return self.reload()
+
+    def reload(self) -> bool:
+        """立即重新加载，失败时保留旧表"""
+        try:
+            self.load()
+        except (OSError, ValueError) as e:
+            print(f"属性配置重载失败，继续使用旧表: {e}")
+            return False
+        print(f"属性配置已重载: {self.path} (版本 {self.version})")
+        return True
+
+    @staticmethod
+    def _compile(config: Dict[str, Any]) -> tuple:
+        """将配置编译为枚举下标索引的行和成本字典"""
+        from .game_logic import ResourceType, BuildingType, CharacterType
+
+        def resources(section: Dict[str, Any], where: str, cast) -> Dict['ResourceType', Any]:
+            try:
+                return {ResourceType(name): cast(value) for name, value in section.items()}
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{where}: {e}") from None
+
+        def entries(key: str, enum, allowed: set) -> Dict[Any, Dict[str, Any]]:
+            result = {}
+            for name, entry in config.get(key, {}).items():
+                try:
+                    member = enum(name)
+                except ValueError:
+                    raise ValueError(f"未知类型: {key}.{name}") from None
+                unknown = set(entry) - allowed
+                if unknown:
+                    raise ValueError(f"未知属性: {key}.{name}.{sorted(unknown)[0]}")
+                result[member] = entry
+            return result
+
+        buildings = entries("buildings", BuildingType, _BUILDING_KEYS)
+        characters = entries("characters", CharacterType, _CHARACTER_KEYS)
+
+        building_rows = []
+        building_costs = {}
+        for bt in BuildingType:
+            entry = {**_BUILDING_DEFAULTS, **buildings.get(bt, {})}
+            where = f"buildings.{bt.value}"
+            health = int(entry["health"])
+            production = resources(entry.get("production", {}), where, float)
+            storage = resources(entry.get("storage", {}), where, int)
+            building_rows.append((health, health, tuple(production.items()), tuple(storage.items())))
+            if "cost" in entry:
+                building_costs[bt] = resources(entry["cost"], where, int)
+
+        character_rows = []
+        character_costs = {}
+        for ct in CharacterType:
+            entry = {**_CHARACTER_DEFAULTS, **characters.get(ct, {})}
+            health = int(entry["health"])
+            character_rows.append((health, health, float(entry["speed"]),
+                                   int(entry["attack_damage"]), int(entry["defense"])))
+            if "cost" in entry:
+                character_costs[ct] = resources(entry["cost"], f"characters.{ct.value}", int)
+
+        return building_rows, character_rows, building_costs, character_costs
+
+
+# 按配置文件路径共享的表
+_registries: Dict[str, StatRegistry] = {}
+
+
+def get_stat_registry(path: str = DEFAULT_STATS_PATH) -> StatRegistry:
+    """获取共享的属性表（同一路径只加载一次）"""
+    registry = _registries.get(path)
+    if registry is None:
+        registry = _registries[path] = StatRegistry(path)
+    return registry
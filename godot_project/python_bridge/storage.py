@@ -0,0 +1,287 @@
+"""
+Python桥接模块 - 存储容量系统
+增量维护各资源的总容量与存量，执行建筑存储上限
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Dict, List, Any, Optional, Deque, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game_logic import ResourceType, ResourceData, BuildingData, Vector3
+
+
+class OverflowPolicy(Enum):
+    """溢出策略枚举"""
+    DROP = "drop"      # 目标建筑已满时丢弃多余资源
+    QUEUE = "queue"    # 多余资源进入等待队列，有空位时自动入库
+    SPILL = "spill"    # 多余资源溢出到最近的其他存储建筑
+
+
+class StorageLedger:
+    """存储账本 - 建筑存储容量的增量聚合
+
+    每个存储建筑的有效容量贡献单独记录，建造、摧毁、受损时只调整该建筑的贡献，
+    各资源总容量以O(1)更新，查询容量时无需遍历建筑列表。
+    """
+
+    def __init__(self, policy: OverflowPolicy = OverflowPolicy.SPILL):
+        self.policy = policy
+        self.resources: Dict['ResourceType', 'ResourceData'] = {}
+        # 建筑id -> 该建筑当前的有效容量贡献
+        self._contributions: Dict[int, Dict['ResourceType', int]] = {}
+        # 资源类型 -> {建筑id: 建筑}，按登记顺序保存
+        self._storages: Dict['ResourceType', Dict[int, 'BuildingData']] = {}
+        # 资源类型 -> 等待入库的资源数量
+        self._pending: Dict['ResourceType', Deque[int]] = {}
+
+    def bind(self, resources: Dict['ResourceType', 'ResourceData']):
+        """绑定游戏逻辑的资源表"""
+        self.resources = resources
+        for resource_type in self._storages:
+            if resource_type in self.resources:
+                self.resources[resource_type].storage_capacity = self.get_capacity(
+                    resource_type)
+
+    def is_limited(self, resource_type: 'ResourceType') -> bool:
+        """资源是否受建筑容量限制"""
+        return resource_type in self._storages
+
+    def get_capacity(self, resource_type: 'ResourceType') -> int:
+        """获取资源总容量"""
+        resource_data = self.resources.get(resource_type)
+        if resource_data is None:
+            return 0
+        return resource_data.storage_capacity
+
+    def get_free_capacity(self, resource_type: 'ResourceType') -> int:
+        """获取资源剩余容量"""
+        resource_data = self.resources.get(resource_type)
+        if resource_data is None:
+            return 0
+        return max(0, resource_data.storage_capacity - resource_data.amount)
+
+    def get_storages(self, resource_type: 'ResourceType') -> List['BuildingData']:
+        """获取存放该资源的建筑"""
+        return list(self._storages.get(resource_type, {}).values())
+
+    def get_building_free_capacity(self, building: 'BuildingData',
+                                   resource_type: 'ResourceType') -> int:
+        """获取单个建筑的剩余容量"""
+        contribution = self._contributions.get(building.id)
+        if contribution is None:
+            return 0
+        stored = building.stored_resources.get(resource_type, 0)
+        return max(0, contribution.get(resource_type, 0) - stored)
+
+    def get_pending(self, resource_type: 'ResourceType') -> int:
+        """获取等待入库的资源数量"""
+        return sum(self._pending.get(resource_type, ()))
+
+    # ------------------------------------------------------------------
+    # 建筑生命周期
+    # ------------------------------------------------------------------
+
+    def register_building(self, building: 'BuildingData'):
+        """登记已建成的存储建筑"""
+        if not building.storage_capacity:
+            return
+        key = building.id
+        if key in self._contributions:
+            return
+
+        self._contributions[key] = {}
+        for resource_type in building.storage_capacity:
+            self._storages.setdefault(resource_type, {})[key] = building
+            building.stored_resources.setdefault(resource_type, 0)
+        self._apply_contribution(building)
+
+        for resource_type in building.storage_capacity:
+            self._drain_pending(resource_type)
+
+    def unregister_building(self, building: 'BuildingData'):
+        """注销被摧毁的存储建筑，建筑内的存量一并损失"""
+        key = building.id
+        contribution = self._contributions.pop(key, None)
+        if contribution is None:
+            return
+
+        for resource_type, capacity in contribution.items():
+            self._storages[resource_type].pop(key, None)
+            resource_data = self.resources.get(resource_type)
+            if resource_data is None:
+                continue
+            resource_data.storage_capacity -= capacity
+            lost = building.stored_resources.get(resource_type, 0)
+            if lost > 0:
+                resource_data.amount -= lost
+                print(f"存储建筑被摧毁，损失 {resource_type.value}: -{lost}")
+            building.stored_resources[resource_type] = 0
+
+    def update_building_health(self, building: 'BuildingData'):
+        """建筑生命值变化后重新计算其容量贡献"""
+        if building.id not in self._contributions:
+            return
+        self._apply_contribution(building)
+
+    def _effective_capacity(self, building: 'BuildingData', capacity: int) -> int:
+        """受损建筑按生命比例提供容量"""
+        if building.health <= 0 or building.max_health <= 0:
+            return 0
+        if building.health >= building.max_health:
+            return capacity
+        return capacity * building.health // building.max_health
+
+    def _apply_contribution(self, building: 'BuildingData'):
+        """更新单个建筑的容量贡献并调整总量"""
+        contribution = self._contributions[building.id]
+        for resource_type, capacity in building.storage_capacity.items():
+            effective = self._effective_capacity(building, capacity)
+            previous = contribution.get(resource_type, 0)
+            contribution[resource_type] = effective
+
+            resource_data = self.resources.get(resource_type)
+            if resource_data is None:
+                continue
+            resource_data.storage_capacity += effective - previous
+
+            stored = building.stored_resources.get(resource_type, 0)
+            if stored > effective:
+                # 容量缩减，超出部分按溢出策略处理
+                excess = stored - effective
+                building.stored_resources[resource_type] = effective
+                resource_data.amount -= excess
+                self._handle_overflow(
+                    resource_type, excess, building.position, building)
+            elif effective > previous:
+                self._drain_pending(resource_type)
+
+    # ------------------------------------------------------------------
+    # 存取
+    # ------------------------------------------------------------------
+
+    def deposit(self, resource_type: 'ResourceType', amount: int,
+                position: Optional['Vector3'] = None) -> int:
+        """存入资源，返回实际入库数量"""
+        if amount <= 0:
+            return 0
+        storages = self._ordered_storages(resource_type, position)
+        if not storages:
+            return self._handle_overflow(resource_type, amount, position, None)
+
+        accepted = self._fill(resource_type, storages[0], amount)
+        remaining = amount - accepted
+        if remaining > 0:
+            accepted += self._handle_overflow(
+                resource_type, remaining, position, storages[0], storages[1:])
+        return accepted
+
+    def withdraw(self, resource_type: 'ResourceType', amount: int) -> int:
+        """从存储建筑中取出资源，返回实际取出数量"""
+        taken = 0
+        storages = self._storages.get(resource_type, {})
+        # 从最后登记的建筑开始取，优先保留地牢之心的存量
+        for building in reversed(list(storages.values())):
+            if taken >= amount:
+                break
+            stored = building.stored_resources.get(resource_type, 0)
+            part = min(stored, amount - taken)
+            if part > 0:
+                building.stored_resources[resource_type] = stored - part
+                taken += part
+
+        resource_data = self.resources.get(resource_type)
+        if resource_data is not None:
+            resource_data.amount -= taken
+        if taken > 0:
+            self._drain_pending(resource_type)
+        return taken
+
+    def reset_amount(self, resource_type: 'ResourceType', amount: int):
+        """按总量重新分配存量（加载存档时使用）"""
+        for building in self._storages.get(resource_type, {}).values():
+            building.stored_resources[resource_type] = 0
+        self._pending.pop(resource_type, None)
+        resource_data = self.resources.get(resource_type)
+        if resource_data is not None:
+            resource_data.amount = 0
+        self.deposit(resource_type, amount)
+
+    def _fill(self, resource_type: 'ResourceType', building: 'BuildingData',
+              amount: int) -> int:
+        """向单个建筑存入资源，返回实际存入数量"""
+        capacity = self._contributions[building.id].get(resource_type, 0)
+        stored = building.stored_resources.get(resource_type, 0)
+        part = min(amount, capacity - stored)
+        if part <= 0:
+            return 0
+        building.stored_resources[resource_type] = stored + part
+        self.resources[resource_type].amount += part
+        return part
+
+    def _handle_overflow(self, resource_type: 'ResourceType', amount: int,
+                         position: Optional['Vector3'],
+                         source: Optional['BuildingData'],
+                         candidates: Optional[List['BuildingData']] = None) -> int:
+        """按溢出策略处理放不下的资源，返回溢出后入库的数量"""
+        if self.policy == OverflowPolicy.SPILL:
+            if candidates is None:
+                candidates = [b for b in self._ordered_storages(resource_type, position)
+                              if b is not source]
+            accepted = 0
+            for building in candidates:
+                if accepted >= amount:
+                    break
+                accepted += self._fill(resource_type,
+                                       building, amount - accepted)
+            dropped = amount - accepted
+            if dropped > 0:
+                print(f"存储已满，丢弃 {resource_type.value}: {dropped}")
+            return accepted
+
+        if self.policy == OverflowPolicy.QUEUE:
+            self._pending.setdefault(resource_type, deque()).append(amount)
+            print(f"存储已满，{resource_type.value} 进入等待队列: {amount}")
+            return 0
+
+        print(f"存储已满，丢弃 {resource_type.value}: {amount}")
+        return 0
+
+    def _drain_pending(self, resource_type: 'ResourceType'):
+        """有空余容量时处理等待队列"""
+        queue = self._pending.get(resource_type)
+        if not queue:
+            return
+        storages = list(self._storages.get(resource_type, {}).values())
+        while queue and self.get_free_capacity(resource_type) > 0:
+            amount = queue.popleft()
+            accepted = 0
+            for building in storages:
+                if accepted >= amount:
+                    break
+                accepted += self._fill(resource_type,
+                                       building, amount - accepted)
+            if accepted < amount:
+                queue.appendleft(amount - accepted)
+                break
+
+    def _ordered_storages(self, resource_type: 'ResourceType',
+                          position: Optional['Vector3']) -> List['BuildingData']:
+        """按到指定位置的距离排序存储建筑"""
+        storages = list(self._storages.get(resource_type, {}).values())
+        if position is not None and len(storages) > 1:
+            storages.sort(key=lambda b: b.position.distance_to(position))
+        return storages
+
+    def get_storage_info(self, resource_type: 'ResourceType') -> Dict[str, Any]:
+        """获取资源存储信息"""
+        resource_data = self.resources.get(resource_type)
+        amount = resource_data.amount if resource_data else 0
+        return {
+            "amount": amount,
+            "capacity": self.get_capacity(resource_type),
+            "free": self.get_free_capacity(resource_type),
+            "pending": self.get_pending(resource_type),
+            "limited": self.is_limited(resource_type),
+            "storage_buildings": len(self._storages.get(resource_type, {}))
+        }
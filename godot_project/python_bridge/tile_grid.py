@@ -0,0 +1,235 @@
+"""
+Python桥接模块 - 瓦片网格
+镜像Godot端 TileTypes/MapConfig 的地图数据，供寻路代价等逻辑使用
+"""
+
+import math
+from array import array
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game_logic import Vector3
+
+
+class TileType(IntEnum):
+    """瓦片类型枚举（与 autoload/TileTypes.gd 保持一致）"""
+    EMPTY = 0
+    STONE_FLOOR = 1
+    STONE_WALL = 2
+    DIRT_FLOOR = 3
+    MAGIC_FLOOR = 4
+    UNEXCAVATED = 5
+    CORRIDOR = 6
+    GOLD_MINE = 7
+    MANA_CRYSTAL = 8
+    LAVA = 9
+    WATER = 10
+    BRIDGE = 11
+    PORTAL = 12
+    TRAP = 13
+    SECRET_PASSAGE = 14
+    DUNGEON_HEART = 15
+    BARRACKS = 16
+    WORKSHOP = 17
+    MAGIC_LAB = 18
+    DEFENSE_TOWER = 19
+    FOOD_FARM = 20
+    FOREST = 21
+    WASTELAND = 22
+    SWAMP = 23
+    CAVE = 24
+    CAVITY_EMPTY = 25
+    CAVITY_BOUNDARY = 26
+    CAVITY_CENTER = 27
+    CAVITY_ENTRANCE = 28
+    FOREST_CLEARING = 29
+    DENSE_FOREST = 30
+    FOREST_EDGE = 31
+    ANCIENT_FOREST = 32
+    GRASSLAND_PLAINS = 33
+    GRASSLAND_HILLS = 34
+    GRASSLAND_WETLANDS = 35
+    GRASSLAND_FIELDS = 36
+    LAKE_SHALLOW = 37
+    LAKE_DEEP = 38
+    LAKE_SHORE = 39
+    LAKE_ISLAND = 40
+    CAVE_DEEP = 41
+    CAVE_CRYSTAL = 42
+    CAVE_UNDERGROUND_LAKE = 43
+    WASTELAND_DESERT = 44
+    WASTELAND_ROCKS = 45
+    WASTELAND_RUINS = 46
+    WASTELAND_TOXIC = 47
+    DEAD_LAND_SWAMP = 48
+    DEAD_LAND_GRAVEYARD = 49
+    PRIMITIVE_JUNGLE = 50
+    PRIMITIVE_VOLCANO = 51
+    PRIMITIVE_SWAMP = 52
+
+
+# 可行走瓦片（与 TileTypes.is_walkable 一致）
+WALKABLE_TILES = frozenset([
+    TileType.EMPTY, TileType.STONE_FLOOR, TileType.DIRT_FLOOR, TileType.MAGIC_FLOOR, TileType.CORRIDOR,
+    TileType.GOLD_MINE, TileType.BRIDGE, TileType.DUNGEON_HEART, TileType.SECRET_PASSAGE, TileType.TRAP,
+    TileType.FOREST, TileType.WASTELAND, TileType.SWAMP, TileType.CAVE,
+    TileType.CAVITY_EMPTY, TileType.CAVITY_CENTER, TileType.CAVITY_ENTRANCE,
+    TileType.FOREST_CLEARING, TileType.DENSE_FOREST, TileType.FOREST_EDGE, TileType.ANCIENT_FOREST,
+    TileType.GRASSLAND_PLAINS, TileType.GRASSLAND_HILLS, TileType.GRASSLAND_WETLANDS, TileType.GRASSLAND_FIELDS,
+    TileType.LAKE_SHALLOW, TileType.LAKE_SHORE, TileType.LAKE_ISLAND,
+    TileType.CAVE_DEEP, TileType.CAVE_CRYSTAL, TileType.CAVE_UNDERGROUND_LAKE,
+    TileType.WASTELAND_DESERT, TileType.WASTELAND_ROCKS, TileType.WASTELAND_RUINS, TileType.WASTELAND_TOXIC,
+    TileType.DEAD_LAND_SWAMP, TileType.DEAD_LAND_GRAVEYARD,
+    TileType.PRIMITIVE_JUNGLE, TileType.PRIMITIVE_VOLCANO, TileType.PRIMITIVE_SWAMP
+])
+
+# 可挖掘瓦片（与 TileTypes.is_diggable 一致）
+DIGGABLE_TILES = frozenset([TileType.UNEXCAVATED])
+
+# 标准地图尺寸（与 MapConfig.get_map_size 一致）
+MAP_WIDTH = 200
+MAP_HEIGHT = 200
+
+# 四邻域
+NEIGHBORS_4 = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# 不可达距离
+UNREACHABLE = -1
+
+
+class TileGrid:
+    """瓦片网格 - 一维字节数组存储，世界坐标原点对应地图中心"""
+
+    def __init__(self, width: int = MAP_WIDTH, height: int = MAP_HEIGHT,
+                 fill: TileType = TileType.EMPTY):
+        self.width = width
+        self.height = height
+        self.tiles = bytearray([int(fill)]) * (width * height)
+        self.walkable = bytearray(
+            [1 if fill in WALKABLE_TILES else 0]) * (width * height)
+        # 网格版本号，瓦片变化时递增，供缓存失效判断
+        self.version = 0
+        self._listeners: List[Callable[[int, int, int, int], None]] = []
+
+    # ------------------------------------------------------------------
+    # 坐标转换
+    # ------------------------------------------------------------------
+
+    def world_to_tile(self, position: 'Vector3') -> Tuple[int, int]:
+        """世界坐标转瓦片坐标"""
+        return (int(math.floor(position.x)) + self.width // 2,
+                int(math.floor(position.z)) + self.height // 2)
+
+    def tile_to_world(self, x: int, z: int) -> Tuple[float, float]:
+        """瓦片坐标转世界坐标（瓦片中心）"""
+        return (x - self.width // 2 + 0.5, z - self.height // 2 + 0.5)
+
+    def in_bounds(self, x: int, z: int) -> bool:
+        """瓦片坐标是否在地图内"""
+        return 0 <= x < self.width and 0 <= z < self.height
+
+    def index(self, x: int, z: int) -> int:
+        """瓦片坐标转一维索引"""
+        return z * self.width + x
+
+    # ------------------------------------------------------------------
+    # 瓦片读写
+    # ------------------------------------------------------------------
+
+    def get_tile(self, x: int, z: int) -> TileType:
+        """获取瓦片类型，地图外视为石墙"""
+        if not self.in_bounds(x, z):
+            return TileType.STONE_WALL
+        return TileType(self.tiles[z * self.width + x])
+
+    def is_walkable(self, x: int, z: int) -> bool:
+        """瓦片是否可行走"""
+        return self.in_bounds(x, z) and self.walkable[z * self.width + x] == 1
+
+    def set_tile(self, x: int, z: int, tile_type: TileType) -> bool:
+        """设置单个瓦片，通知监听者"""
+        if not self.in_bounds(x, z):
+            return False
+        i = z * self.width + x
+        old = self.tiles[i]
+        new = int(tile_type)
+        if old == new:
+            return False
+        self.tiles[i] = new
+        self.walkable[i] = 1 if new in WALKABLE_TILES else 0
+        self.version += 1
+        for listener in self._listeners:
+            listener(x, z, old, new)
+        return True
+
+    def load_tiles(self, data: bytes):
+        """整体载入瓦片数据（对应Godot端 PackedByteArray，按行优先）"""
+        if len(data) != self.width * self.height:
+            raise ValueError(
+                f"瓦片数据长度不匹配: {len(data)} != {self.width * self.height}")
+        self.tiles[:] = data
+        walkable_lookup = bytes(
+            1 if t in WALKABLE_TILES else 0 for t in range(256))
+        self.walkable[:] = self.tiles.translate(walkable_lookup)
+        self.version += 1
+        for listener in self._listeners:
+            listener(-1, -1, -1, -1)
+
+    def add_listener(self, listener: Callable[[int, int, int, int], None]):
+        """注册瓦片变化监听者，整体载入时以 (-1, -1, -1, -1) 通知"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int, int, int, int], None]):
+        """注销瓦片变化监听者"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    # ------------------------------------------------------------------
+    # 距离
+    # ------------------------------------------------------------------
+
+    def distance_field(self, sources: Iterable[Tuple[int, int]],
+                       max_distance: Optional[int] = None) -> array:
+        """从源瓦片出发的BFS步数场，不可达为 UNREACHABLE"""
+        width, height = self.width, self.height
+        walkable = self.walkable
+        dist = array('i', [UNREACHABLE]) * (width * height)
+        queue = deque()
+        for x, z in sources:
+            if self.in_bounds(x, z):
+                i = z * width + x
+                if dist[i] == UNREACHABLE:
+                    dist[i] = 0
+                    queue.append(i)
+
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            if max_distance is not None and d > max_distance:
+                continue
+            x = i % width
+            # 左右上下四邻域
+            if x + 1 < width and dist[i + 1] == UNREACHABLE and walkable[i + 1]:
+                dist[i + 1] = d
+                queue.append(i + 1)
+            if x > 0 and dist[i - 1] == UNREACHABLE and walkable[i - 1]:
+                dist[i - 1] = d
+                queue.append(i - 1)
+            if i + width < width * height and dist[i + width] == UNREACHABLE and walkable[i + width]:
+                dist[i + width] = d
+                queue.append(i + width)
+            if i >= width and dist[i - width] == UNREACHABLE and walkable[i - width]:
+                dist[i - width] = d
+                queue.append(i - width)
+        return dist
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取网格统计"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "walkable_tiles": sum(self.walkable),
+            "version": self.version
+        }
@@ -0,0 +1,270 @@
+"""
+Python桥接模块 - 视野与战争迷雾
+每个单位用递归阴影投射计算视野，瓦片可见性以引用计数维护，对外导出位数组。
+只有跨越瓦片边界的单位、或视野范围内瓦片遮挡发生变化的单位才重新计算，
+可见性发生变化的瓦片记录在脏列表中，Godot端只需重绘这些迷雾瓦片。
+"""
+
+from array import array
+from typing import Dict, Hashable, Set, Tuple
+
+from .tile_grid import TileGrid, TileType
+
+
+# 阻挡视线的瓦片
+OPAQUE_TILES = frozenset([TileType.STONE_WALL, TileType.UNEXCAVATED])
+
+# 默认视野半径（瓦片）
+DEFAULT_SIGHT_RADIUS = 8
+
+# 单位空间分桶大小（瓦片），用于查找受瓦片变化影响的单位
+BUCKET_SIZE = 8
+
+# 八个八分圆的坐标变换 (xx, xy, yx, yy)
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+_OPAQUE_LOOKUP = bytes(1 if t in OPAQUE_TILES else 0 for t in range(256))
+
+
+class _Viewer:
+    """单位视野"""
+    __slots__ = ("x", "z", "radius", "tiles")
+
+    def __init__(self, x: int, z: int, radius: int):
+        self.x = x
+        self.z = z
+        self.radius = radius
+        self.tiles: array = array('i')
+
+
+class VisibilityMap:
+    """视野图
+
+    visible_bits / explored_bits 为按瓦片索引（行优先）的位数组，
+    第 i 个瓦片对应字节 i >> 3 的第 i & 7 位，可直接作为 PackedByteArray 传给Godot。
+    """
+
+    def __init__(self, grid: TileGrid):
+        self.grid = grid
+        size = grid.width * grid.height
+        self.opaque = bytearray(grid.tiles.translate(_OPAQUE_LOOKUP))
+        # 每个瓦片被多少个单位看到
+        self._counts = array('H', [0]) * size
+        self.visible_bits = bytearray((size + 7) >> 3)
+        self.explored_bits = bytearray((size + 7) >> 3)
+        self._viewers: Dict[Hashable, _Viewer] = {}
+        self._buckets: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._stale: Set[Hashable] = set()
+        self._dirty: Set[int] = set()
+        self.recomputed = 0
+        grid.add_listener(self._on_tile_changed)
+
+    # ------------------------------------------------------------------
+    # 单位
+    # ------------------------------------------------------------------
+
+    def add_unit(self, key: Hashable, x: int, z: int, radius: int = DEFAULT_SIGHT_RADIUS):
+        """登记单位（瓦片坐标），视野在下次 update 时计算"""
+        if key in self._viewers:
+            self.remove_unit(key)
+        viewer = _Viewer(x, z, radius)
+        self._viewers[key] = viewer
+        self._buckets.setdefault(self._bucket_of(x, z), set()).add(key)
+        self._stale.add(key)
+
+    def move_unit(self, key: Hashable, x: int, z: int) -> bool:
+        """更新单位所在瓦片，跨越瓦片边界时才标记重算"""
+        viewer = self._viewers.get(key)
+        if viewer is None or (viewer.x == x and viewer.z == z):
+            return False
+        old_bucket = self._bucket_of(viewer.x, viewer.z)
+        new_bucket = self._bucket_of(x, z)
+        if old_bucket != new_bucket:
+            self._discard_from_bucket(old_bucket, key)
+            self._buckets.setdefault(new_bucket, set()).add(key)
+        viewer.x = x
+        viewer.z = z
+        self._stale.add(key)
+        return True
+
+    def remove_unit(self, key: Hashable):
+        """移除单位，其视野内的瓦片引用随即释放"""
+        viewer = self._viewers.pop(key, None)
+        if viewer is None:
+            return
+        self._discard_from_bucket(self._bucket_of(viewer.x, viewer.z), key)
+        self._stale.discard(key)
+        self._release(viewer.tiles)
+
+    def _bucket_of(self, x: int, z: int) -> Tuple[int, int]:
+        return (x // BUCKET_SIZE, z // BUCKET_SIZE)
+
+    def _discard_from_bucket(self, bucket_key: Tuple[int, int], key: Hashable):
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[bucket_key]
+
+    # ------------------------------------------------------------------
+    # 瓦片变化
+    # ------------------------------------------------------------------
+
+    def _on_tile_changed(self, x: int, z: int, old: int, new: int):
+        """瓦片遮挡变化时，只标记视野可能覆盖该瓦片的单位"""
+        if x < 0:
+            self.opaque[:] = self.grid.tiles.translate(_OPAQUE_LOOKUP)
+            self._stale.update(self._viewers)
+            return
+        opaque = _OPAQUE_LOOKUP[new]
+        i = z * self.grid.width + x
+        if self.opaque[i] == opaque:
+            return
+        self.opaque[i] = opaque
+        reach = max((v.radius for v in self._viewers.values()), default=0)
+        bx0, bz0 = self._bucket_of(x - reach, z - reach)
+        bx1, bz1 = self._bucket_of(x + reach, z + reach)
+        for bx in range(bx0, bx1 + 1):
+            for bz in range(bz0, bz1 + 1):
+                for key in self._buckets.get((bx, bz), ()):
+                    viewer = self._viewers[key]
+                    if max(abs(viewer.x - x), abs(viewer.z - z)) <= viewer.radius:
+                        self._stale.add(key)
+
+    # ------------------------------------------------------------------
+    # 计算
+    # ------------------------------------------------------------------
+
+    def update(self) -> int:
+        """重新计算所有需要更新的单位视野，返回重算的单位数"""
+        if not self._stale:
+            return 0
+        # 按登记顺序处理，结果与集合迭代顺序无关
+        stale = [key for key in self._viewers if key in self._stale]
+        self._stale = set()
+        for key in stale:
+            viewer = self._viewers[key]
+            tiles = self.compute_fov(viewer.x, viewer.z, viewer.radius)
+            # 先加新视野再释放旧视野，重叠部分不会产生多余的脏瓦片
+            self._acquire(tiles)
+            self._release(viewer.tiles)
+            viewer.tiles = tiles
+        self.recomputed += len(stale)
+        return len(stale)
+
+    def _acquire(self, tiles: array):
+        counts = self._counts
+        bits = self.visible_bits
+        explored = self.explored_bits
+        for i in tiles:
+            if counts[i] == 0:
+                bits[i >> 3] |= 1 << (i & 7)
+                explored[i >> 3] |= 1 << (i & 7)
+                self._dirty.add(i)
+            counts[i] += 1
+
+    def _release(self, tiles: array):
+        counts = self._counts
+        bits = self.visible_bits
+        for i in tiles:
+            counts[i] -= 1
+            if counts[i] == 0:
+                bits[i >> 3] &= ~(1 << (i & 7))
+                self._dirty.add(i)
+
+    def compute_fov(self, x: int, z: int, radius: int) -> array:
+        """递归阴影投射，返回可见瓦片索引（升序）"""
+        width = self.grid.width
+        if not self.grid.in_bounds(x, z):
+            return array('i')
+        seen = {z * width + x}
+        for xx, xy, yx, yy in _OCTANTS:
+            self._cast(x, z, 1, 1.0, 0.0, radius, xx, xy, yx, yy, seen)
+        return array('i', sorted(seen))
+
+    def _cast(self, cx: int, cz: int, row: int, start: float, end: float, radius: int,
+              xx: int, xy: int, yx: int, yy: int, seen: Set[int]):
+        """扫描一个八分圆，遇到遮挡时递归扫描遮挡前的部分"""
+        if start < end:
+            return
+        width, height = self.grid.width, self.grid.height
+        opaque = self.opaque
+        radius_sq = radius * radius
+        new_start = start
+        for distance in range(row, radius + 1):
+            dx = -distance - 1
+            dy = -distance
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                tx = cx + dx * xx + dy * xy
+                tz = cz + dx * yx + dy * yy
+                inside = 0 <= tx < width and 0 <= tz < height
+                # 地图外视为遮挡
+                wall = not inside or opaque[tz * width + tx]
+                if inside and dx * dx + dy * dy <= radius_sq:
+                    seen.add(tz * width + tx)
+                if blocked:
+                    if wall:
+                        new_start = right_slope
+                        continue
+                    blocked = False
+                    start = new_start
+                elif wall and distance < radius:
+                    blocked = True
+                    self._cast(cx, cz, distance + 1, start, left_slope, radius,
+                               xx, xy, yx, yy, seen)
+                    new_start = right_slope
+            if blocked:
+                break
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def is_visible(self, x: int, z: int) -> bool:
+        """瓦片当前是否可见"""
+        if not self.grid.in_bounds(x, z):
+            return False
+        i = z * self.grid.width + x
+        return bool(self.visible_bits[i >> 3] & (1 << (i & 7)))
+
+    def is_explored(self, x: int, z: int) -> bool:
+        """瓦片是否曾经可见"""
+        if not self.grid.in_bounds(x, z):
+            return False
+        i = z * self.grid.width + x
+        return bool(self.explored_bits[i >> 3] & (1 << (i & 7)))
+
+    def visible_tiles(self, key: Hashable) -> array:
+        """单位当前可见的瓦片索引"""
+        viewer = self._viewers.get(key)
+        return viewer.tiles if viewer is not None else array('i')
+
+    def take_dirty_tiles(self) -> Tuple[array, bytearray]:
+        """取出并清空可见性变化的瓦片: (瓦片索引 int32, 可见性 0/1)"""
+        if not self._dirty:
+            return array('i'), bytearray()
+        indices = array('i', sorted(self._dirty))
+        self._dirty = set()
+        bits = self.visible_bits
+        states = bytearray((bits[i >> 3] >> (i & 7)) & 1 for i in indices)
+        return indices, states
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取视野统计"""
+        return {
+            "units": len(self._viewers),
+            "pending_units": len(self._stale),
+            "dirty_tiles": len(self._dirty),
+            "recomputed_units": self.recomputed
+        }
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+头像图集烘焙工具
+将 img/Hero 和 img/Monster 下的角色头像打包为一张或几张图集（MaxRects 装箱），
+并输出按单位名索引的 UV 查找表，UI 只需绑定图集纹理，用 AtlasTexture 的 region 取头像。
+源图片内容哈希未变化时跳过烘焙（--force 强制重建）。
+
+用法（在 godot_project 目录下运行）:
+    python scripts/tools/bake_atlas.py [--force] [--max-size 2048] [--padding 2]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+# 源目录和输出位置
+SOURCE_DIRS = [Path("img/Hero"), Path("img/Monster")]
+OUTPUT_DIR = Path("img/Atlas")
+ATLAS_NAME = "portraits"
+MANIFEST_VERSION = 1
+
+# 图集尺寸上限（像素），超出时拆分为多张图集
+DEFAULT_MAX_SIZE = 2048
+# 头像之间的间距（像素），其中1像素用边缘像素外扩，避免过滤时串色
+DEFAULT_PADDING = 2
+
+
+class MaxRectsPacker:
+    """MaxRects 装箱 - 最短边最优（Best Short Side Fit）"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free_rects: List[Tuple[int, int, int, int]] = [(0, 0, width, height)]
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """放入一个矩形，返回左上角坐标（放不下时返回None）"""
+        best = None
+        best_score = None
+        for fx, fy, fw, fh in self.free_rects:
+            if width <= fw and height <= fh:
+                leftover = (min(fw - width, fh - height), max(fw - width, fh - height))
+                if best_score is None or leftover < best_score:
+                    best, best_score = (fx, fy), leftover
+        if best is None:
+            return None
+        self._split(best[0], best[1], width, height)
+        return best
+
+    def _split(self, x: int, y: int, width: int, height: int):
+        """从所有与新矩形相交的空闲矩形中切出剩余部分，再去掉被包含的空闲矩形"""
+        result = []
+        for fx, fy, fw, fh in self.free_rects:
+            if x >= fx + fw or x + width <= fx or y >= fy + fh or y + height <= fy:
+                result.append((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                result.append((fx, fy, x - fx, fh))
+            if x + width < fx + fw:
+                result.append((x + width, fy, fx + fw - x - width, fh))
+            if y > fy:
+                result.append((fx, fy, fw, y - fy))
+            if y + height < fy + fh:
+                result.append((fx, y + height, fw, fy + fh - y - height))
+        self.free_rects = [
+            rect for i, rect in enumerate(result)
+            if not any(j != i and _contains(other, rect) and (other != rect or j < i)
+                       for j, other in enumerate(result))
+        ]
+
+
+def _contains(outer: Tuple[int, int, int, int], inner: Tuple[int, int, int, int]) -> bool:
+    """outer 是否完全包含 inner"""
+    return (inner[0] >= outer[0] and inner[1] >= outer[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2]
+            and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def collect_sources() -> Dict[str, Path]:
+    """收集源图片: 单位名（文件名）-> 路径，按路径排序保证结果可复现"""
+    sources: Dict[str, Path] = {}
+    for source_dir in SOURCE_DIRS:
+        if not source_dir.exists():
+            print(f"WARNING: 源目录不存在: {source_dir}")
+            continue
+        for path in sorted(source_dir.rglob("*.png")):
+            name = path.stem
+            if name in sources:
+                print(f"WARNING: 单位名重复，已跳过: {path}（已有 {sources[name]}）")
+                continue
+            sources[name] = path
+    return sources
+
+
+def hash_sources(sources: Dict[str, Path]) -> Dict[str, str]:
+    """源图片内容哈希"""
+    return {name: hashlib.sha256(path.read_bytes()).hexdigest()
+            for name, path in sources.items()}
+
+
+def load_manifest(path: Path) -> Optional[dict]:
+    """读取上次烘焙的查找表"""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def is_up_to_date(manifest: Optional[dict], hashes: Dict[str, str],
+                  options: Dict[str, int]) -> bool:
+    """源图片哈希、烘焙参数均未变化且图集文件都在时无需重建"""
+    if manifest is None or manifest.get("version") != MANIFEST_VERSION:
+        return False
+    if manifest.get("options") != options or manifest.get("hashes") != hashes:
+        return False
+    return all(Path(atlas["file"]).exists() for atlas in manifest.get("atlases", []))
+
+
+def _atlas_sizes(max_size: int):
+    """候选图集尺寸: 从64开始的2的幂，宽优先增长"""
+    size = 64
+    while size <= max_size:
+        if size > 64:
+            yield size, size // 2
+        yield size, size
+        size *= 2
+
+
+def pack(images: Dict[str, Image.Image], max_size: int,
+         padding: int) -> List[Tuple[Tuple[int, int], Dict[str, Tuple[int, int]]]]:
+    """装箱: 返回 [(图集尺寸, {单位名: 左上角})]
+
+    每张图集取能放下剩余全部头像的最小尺寸；最大尺寸也放不下时，
+    尽量装满一张最大尺寸的图集，剩余头像进入下一张。
+    """
+    # 先放大图，同尺寸按名字排序
+    order = sorted(images, key=lambda n: (-max(images[n].size),
+                                          -images[n].width * images[n].height, n))
+    for name in order:
+        w, h = images[name].size
+        if w + padding * 2 > max_size or h + padding * 2 > max_size:
+            raise ValueError(f"图片 {name} ({w}x{h}) 超过图集尺寸上限 {max_size}")
+
+    atlases = []
+    remaining = order
+    while remaining:
+        placed = None
+        for width, height in _atlas_sizes(max_size):
+            packer = MaxRectsPacker(width, height)
+            positions = {}
+            for name in remaining:
+                w, h = images[name].size
+                spot = packer.insert(w + padding * 2, h + padding * 2)
+                if spot is None:
+                    break
+                positions[name] = (spot[0] + padding, spot[1] + padding)
+            else:
+                placed = ((width, height), positions)
+                break
+        if placed is None:
+            # 最大尺寸也放不下: 跳过放不下的头像，尽量装满一张
+            packer = MaxRectsPacker(max_size, max_size)
+            positions = {}
+            for name in remaining:
+                w, h = images[name].size
+                spot = packer.insert(w + padding * 2, h + padding * 2)
+                if spot is not None:
+                    positions[name] = (spot[0] + padding, spot[1] + padding)
+            placed = ((max_size, max_size), positions)
+        atlases.append(placed)
+        remaining = [name for name in remaining if name not in placed[1]]
+    return atlases
+
+
+def _extrude(atlas: Image.Image, image: Image.Image, x: int, y: int, amount: int):
+    """把头像边缘像素向外复制 amount 像素"""
+    w, h = image.size
+    for i in range(1, amount + 1):
+        atlas.paste(image.crop((0, 0, w, 1)), (x, y - i))
+        atlas.paste(image.crop((0, h - 1, w, h)), (x, y + h - 1 + i))
+        atlas.paste(image.crop((0, 0, 1, h)), (x - i, y))
+        atlas.paste(image.crop((w - 1, 0, w, h)), (x + w - 1 + i, y))
+
+
+def bake(sources: Dict[str, Path], hashes: Dict[str, str], max_size: int,
+         padding: int) -> dict:
+    """烘焙图集并返回查找表"""
+    images = {name: Image.open(path).convert("RGBA") for name, path in sources.items()}
+    layout = pack(images, max_size, padding)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # 清理上次多出来的图集
+    for old in OUTPUT_DIR.glob(f"{ATLAS_NAME}_*.png"):
+        old.unlink()
+
+    atlases = []
+    entries = {}
+    for atlas_id, ((width, height), positions) in enumerate(layout):
+        atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        for name, (x, y) in positions.items():
+            image = images[name]
+            atlas.paste(image, (x, y))
+            _extrude(atlas, image, x, y, min(1, padding))
+            w, h = image.size
+            entries[name] = {
+                "atlas": atlas_id,
+                "region": [x, y, w, h],
+                "uv": [x / width, y / height, (x + w) / width, (y + h) / height],
+                "source": "res://" + sources[name].as_posix()
+            }
+        file = OUTPUT_DIR / f"{ATLAS_NAME}_{atlas_id}.png"
+        atlas.save(file, optimize=True)
+        atlases.append({
+            "file": file.as_posix(),
+            "texture": "res://" + file.as_posix(),
+            "width": width,
+            "height": height,
+            "count": len(positions)
+        })
+        print(f"SUCCESS: 图集 {file} ({width}x{height}) 包含 {len(positions)} 张头像")
+
+    return {
+        "version": MANIFEST_VERSION,
+        "options": {"max_size": max_size, "padding": padding},
+        "hashes": hashes,
+        "atlases": atlases,
+        "entries": dict(sorted(entries.items()))
+    }
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="角色头像图集烘焙")
+    parser.add_argument("--force", action="store_true", help="忽略哈希强制重建")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="图集尺寸上限")
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING, help="头像间距")
+    args = parser.parse_args(argv)
+
+    sources = collect_sources()
+    if not sources:
+        print("ERROR: 未找到任何头像图片")
+        return 1
+
+    hashes = hash_sources(sources)
+    options = {"max_size": args.max_size, "padding": args.padding}
+    manifest_path = OUTPUT_DIR / f"{ATLAS_NAME}.json"
+    if not args.force and is_up_to_date(load_manifest(manifest_path), hashes, options):
+        print(f"SUCCESS: 源图片未变化，跳过烘焙 ({len(sources)} 张头像)")
+        return 0
+
+    try:
+        manifest = bake(sources, hashes, args.max_size, args.padding)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    manifest_path.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    total = sum(path.stat().st_size for path in sources.values())
+    baked = sum(Path(atlas["file"]).stat().st_size for atlas in manifest["atlases"])
+    print(f"\nSUCCESS: 烘焙完成: {len(sources)} 张头像 -> {len(manifest['atlases'])} 张图集"
+          f"（{total} -> {baked} 字节），查找表 {manifest_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())